@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("analytics.cache")
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class SnapshotCache:
+    """
+    In-process TTL cache for upstream snapshots.
+
+    Concurrent misses for the same key share a single loader call. Entries
+    older than `ttl` but younger than `ttl + stale_ttl` are served stale while
+    one background refresh replaces them. At most `max_entries` keys are kept,
+    least recently used first out. A `ttl` of 0 keeps nothing and only
+    coalesces concurrent calls.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 32):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.counters: dict[str, int] = {}
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refresh_errors": 0,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self.reset_counters()
+
+    async def get(self, key: str, loader: Loader) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                self._entries.move_to_end(key)
+                return value
+
+            if age < self.ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._start(key, loader, background=True)
+                return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["misses"] += 1
+            task = self._start(key, loader)
+
+        # Shield so one cancelled caller doesn't cancel the shared fetch.
+        return await asyncio.shield(task)
+
+    def _start(self, key: str, loader: Loader, background: bool = False) -> asyncio.Task:
+        async def run():
+            try:
+                value = await loader()
+                self._store(key, value)
+                return value
+            finally:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done, background))
+        return task
+
+    def _finished(self, key: str, task: asyncio.Task, background: bool) -> None:
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None and background:
+            self.counters["refresh_errors"] += 1
+            logger.warning("Background refresh failed for %s: %s", key, exc)
+
+    def _store(self, key: str, value: Any) -> None:
+        if self.ttl <= 0 and self.stale_ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+
+@dataclass
+class ValidatedEntry:
+    """A parsed upstream body and the validators it was served with."""
+
+    data: Any
+    etag: str | None
+    last_modified: str | None
+    # Values computed from `data` (e.g. the columnar batch), dropped with it.
+    derived: dict[str, Any] = field(default_factory=dict)
+
+    def request_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    """
+    Last ETag/Last-Modified and parsed body per upstream URL.
+
+    Lets fetches send conditional requests and reuse the stored body on 304,
+    so unchanged data costs neither transfer nor parsing. Like SnapshotCache,
+    stored bodies are shared and must be treated as read-only. At most
+    `max_entries` URLs are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, ValidatedEntry] = OrderedDict()
+        self.counters = {"revalidated": 0, "replaced": 0}
+
+    def get(self, key: str) -> ValidatedEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: str, data: Any, etag: str | None, last_modified: str | None) -> None:
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return
+        self.counters["replaced"] += 1
+        self._entries[key] = ValidatedEntry(data, etag, last_modified)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.counters = {"revalidated": 0, "replaced": 0}
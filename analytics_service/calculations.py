@@ -1,28 +1,439 @@
+import heapq
+import math
 from collections import Counter
 
+import numpy as np
+
+from analytics_service.core.metrics import timed_calculation
+
+@timed_calculation
 def average_delivery_time(orders: list[dict]) -> float:
     if not orders:
         return 0.0
     return sum(float(order.get("delivery_time", 0)) for order in orders) / len(orders)
 
+@timed_calculation
 def average_cost(orders: list[dict]) -> float:
     if not orders:
         return 0.0 
     return sum(float(order.get("cost", 0)) for order in orders) / len(orders)
 
+@timed_calculation
 def top_locations(orders: list[dict], top_n: int = 3) -> list[str]:
     locations = [order.get("location") for order in orders if order.get("location")]
     return [location for location, _ in Counter(locations).most_common(top_n)]
 
 
+@timed_calculation
 def status_breakdown(orders: list[dict]) -> dict[str, int]:
     statuses = [str(order.get("status")) for order in orders if order.get("status")]
     return dict(Counter(statuses))
 
 
+@timed_calculation
 def top_locations_with_counts(orders: list[dict], top_n: int = 3) -> list[dict]:
     locations = [order.get("location") for order in orders if order.get("location")]
     return [
         {"location": location, "count": count}
         for location, count in Counter(locations).most_common(top_n)
     ]
+
+
+class SpaceSavingCounter:
+    """
+    Approximate top-k counter over at most `capacity` keys (Space-Saving).
+
+    Once full, a new key replaces the key with the smallest count and
+    inherits that count as its `error`. Every reported count overestimates
+    the true count by at most its error, and any key not being tracked
+    occurred at most `max_error` times, which is never more than
+    total / capacity.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        self.counts: dict = {}
+        self.errors: dict = {}
+        # Min-heap of (count, key); entries go stale as counts grow and are
+        # skipped on pop, with a rebuild once stale entries pile up.
+        self._heap: list[tuple[int, object]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key, count: int = 1) -> None:
+        self.total += count
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor, evicted = self._pop_min()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, keys) -> None:
+        for key in keys:
+            self.add(key)
+
+    def _pop_min(self) -> tuple[int, object]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    @property
+    def max_error(self) -> int:
+        """Upper bound on the count of any key not currently tracked."""
+        if len(self.counts) < self.capacity:
+            return 0
+        while self.counts.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0]
+
+    def most_common(self, top_n: int) -> list[tuple[object, int, int]]:
+        """(key, count, error) for the `top_n` largest counts, ties in insertion order."""
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1])[:top_n]
+        return [(key, count, self.errors[key]) for key, count in ranked]
+
+
+@timed_calculation
+def top_locations_with_counts_approximate(orders: list[dict], top_n: int = 3, capacity: int = 1000) -> list[dict]:
+    """`top_locations_with_counts` in bounded memory, with per-location error."""
+    counter = SpaceSavingCounter(capacity)
+    counter.update(order.get("location") for order in orders if order.get("location"))
+    return [
+        {"location": location, "count": count, "error": error}
+        for location, count, error in counter.most_common(top_n)
+    ]
+
+
+# Aggregate mode: the same views computed from the pre-aggregated payload
+# returned by orders_service `GET /orders/aggregate`.
+
+def _ranked_locations(aggregate: dict, top_n: int) -> list[tuple[str, int]]:
+    counts = aggregate.get("by_location") or {}
+    # Ties are broken by name since the SQL grouping has no row order.
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+
+
+@timed_calculation
+def average_delivery_time_from_aggregate(aggregate: dict) -> float:
+    return float((aggregate.get("delivery_time") or {}).get("avg") or 0.0)
+
+
+@timed_calculation
+def average_cost_from_aggregate(aggregate: dict) -> float:
+    return float((aggregate.get("cost") or {}).get("avg") or 0.0)
+
+
+@timed_calculation
+def top_locations_from_aggregate(aggregate: dict, top_n: int = 3) -> list[str]:
+    return [location for location, _ in _ranked_locations(aggregate, top_n)]
+
+
+@timed_calculation
+def status_breakdown_from_aggregate(aggregate: dict) -> dict[str, int]:
+    return dict(aggregate.get("by_status") or {})
+
+
+@timed_calculation
+def top_locations_with_counts_from_aggregate(aggregate: dict, top_n: int = 3) -> list[dict]:
+    return [
+        {"location": location, "count": count}
+        for location, count in _ranked_locations(aggregate, top_n)
+    ]
+
+
+@timed_calculation
+def aggregate_from_rollups(rollups: list[dict]) -> dict:
+    """
+    Fold orders_service `GET /orders/rollups` rows into the aggregate payload.
+
+    Rollups carry sums rather than min/max, so only the averages are set.
+    """
+    count = 0
+    sum_cost = 0.0
+    sum_delivery_time = 0.0
+    statuses: Counter = Counter()
+    locations: Counter = Counter()
+    for row in rollups:
+        count += row["count"]
+        sum_cost += row["sum_cost"]
+        sum_delivery_time += row["sum_delivery_time"]
+        if row["status"]:
+            statuses[row["status"]] += row["count"]
+        if row["location"]:
+            locations[row["location"]] += row["count"]
+    return {
+        "count": count,
+        "cost": {"avg": sum_cost / count if count else None},
+        "delivery_time": {"avg": sum_delivery_time / count if count else None},
+        "by_status": dict(statuses),
+        "by_location": dict(locations),
+    }
+
+
+# Distribution mode: mergeable quantile sketches for delivery_time and cost.
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+DISTRIBUTION_FIELDS = ("delivery_time", "cost")
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram with a relative error bound (DDSketch-style).
+
+    A positive value v is counted in bucket ceil(log_gamma(v)), and every
+    quantile estimate is within `relative_accuracy` of a true value. Buckets
+    are plain counts, so sketches merge by adding counts and a value is
+    removed by adding it with count -1. Past `max_buckets` the lowest
+    buckets are collapsed into one, giving up accuracy at the very bottom
+    of the range to keep memory bounded. Values <= 0 are counted as 0.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        # Lowest bucket index still kept separately once collapsing starts.
+        self._floor: int | None = None
+
+    def bucket(self, value: float) -> int | None:
+        """Bucket index of `value` (None for the zero bucket), for `add_bucket`."""
+        return math.ceil(math.log(value) / self._log_gamma) if value > 0 else None
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add_bucket(self, index: int | None, count: int = 1) -> None:
+        """`add` for a value whose bucket was already computed with `bucket`."""
+        self.count += count
+        if index is None:
+            self.zero_count += count
+            return
+        if self._floor is not None and index < self._floor:
+            index = self._floor
+        total = self.buckets.get(index, 0) + count
+        if total:
+            self.buckets[index] = total
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            self.buckets.pop(index, None)
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.add_bucket(self.bucket(value), count)
+
+    def add_array(self, values: np.ndarray) -> None:
+        """Add every value of a float array in one vectorized pass."""
+        positive = values[values > 0]
+        self.count += len(values)
+        self.zero_count += len(values) - len(positive)
+        indices = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+        if self._floor is not None:
+            indices = np.maximum(indices, self._floor)
+        for index, count in zip(*(array.tolist() for array in np.unique(indices, return_counts=True))):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        if other._floor is not None:
+            self._floor = other._floor if self._floor is None else max(self._floor, other._floor)
+        for index, count in other.buckets.items():
+            index = index if self._floor is None else max(index, self._floor)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if other._floor is not None or len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        indices = sorted(self.buckets)
+        if len(indices) > self.max_buckets:
+            floor = indices[len(indices) - self.max_buckets]
+            self._floor = floor if self._floor is None else max(floor, self._floor)
+        collapsed = sum(self.buckets.pop(index) for index in indices if index < self._floor)
+        if collapsed:
+            self.buckets[self._floor] = self.buckets.get(self._floor, 0) + collapsed
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the q-quantile (0 <= q <= 1); None for an empty sketch."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.buckets))
+
+
+class OrderDistribution:
+    """
+    delivery_time and cost sketches overall, per location and per status.
+
+    Built from a full snapshot (`OrderBatch.distribution`) or kept current
+    by `RunningAggregates`; either way the parts merge with `merge`.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.overall = self._new_group()
+        self.by_location: dict[str, dict[str, QuantileSketch]] = {}
+        self.by_status: dict[str, dict[str, QuantileSketch]] = {}
+
+    def _new_group(self) -> dict[str, QuantileSketch]:
+        return {field: QuantileSketch(self.relative_accuracy) for field in DISTRIBUTION_FIELDS}
+
+    def group(self, dimension: str | None = None, key: str | None = None) -> dict[str, QuantileSketch]:
+        """Sketches for one location or status, or the overall ones."""
+        if dimension is None:
+            return self.overall
+        groups = self.by_location if dimension == "location" else self.by_status
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = self._new_group()
+        return group
+
+    def add(self, delivery_time: float, cost: float, location: str | None, status: str | None, count: int = 1) -> None:
+        # Every sketch shares one bucket layout, so each value is bucketed once.
+        delivery_bucket = self.overall["delivery_time"].bucket(delivery_time)
+        cost_bucket = self.overall["cost"].bucket(cost)
+        groups = [self.overall]
+        if location:
+            groups.append(self.group("location", location))
+        if status:
+            groups.append(self.group("status", status))
+        for group in groups:
+            group["delivery_time"].add_bucket(delivery_bucket, count)
+            group["cost"].add_bucket(cost_bucket, count)
+
+    def add_arrays(
+        self,
+        delivery_time: np.ndarray,
+        cost: np.ndarray,
+        dimension: str | None = None,
+        key: str | None = None,
+    ) -> None:
+        """Vectorized add into a single group (see `group`)."""
+        group = self.group(dimension, key)
+        group["delivery_time"].add_array(delivery_time)
+        group["cost"].add_array(cost)
+
+    def merge(self, other: "OrderDistribution") -> None:
+        for mine, theirs in [(self.overall, other.overall)] + [
+            (target.setdefault(key, self._new_group()), group)
+            for target, source in ((self.by_location, other.by_location), (self.by_status, other.by_status))
+            for key, group in source.items()
+        ]:
+            for field in DISTRIBUTION_FIELDS:
+                mine[field].merge(theirs[field])
+
+    @staticmethod
+    def _report(group: dict[str, QuantileSketch], quantiles) -> dict:
+        return {
+            "count": group["delivery_time"].count,
+            **{
+                field: {str(q): group[field].quantile(q) for q in quantiles}
+                for field in DISTRIBUTION_FIELDS
+            },
+        }
+
+    @timed_calculation
+    def report(self, quantiles=DEFAULT_QUANTILES) -> dict:
+        """Quantile estimates keyed by str(q), for every non-empty group."""
+        return {
+            "quantiles": list(quantiles),
+            "relative_accuracy": self.relative_accuracy,
+            "overall": self._report(self.overall, quantiles),
+            "by_location": {
+                key: self._report(group, quantiles)
+                for key, group in self.by_location.items()
+                if group["delivery_time"].count > 0
+            },
+            "by_status": {
+                key: self._report(group, quantiles)
+                for key, group in self.by_status.items()
+                if group["delivery_time"].count > 0
+            },
+        }
+
+
+class RunningAggregates:
+    """
+    Totals maintained from a stream of order upserts and deletes.
+
+    Each order's last contribution is remembered so an update or delete can
+    be backed out, which keeps the cost of applying a change O(1).
+    `to_aggregate` returns the aggregate-mode payload shape and
+    `distribution` holds the matching quantile sketches.
+    """
+
+    def __init__(self):
+        self._orders: dict[int, tuple[float, float, str | None, str | None]] = {}
+        self.sum_cost = 0.0
+        self.sum_delivery_time = 0.0
+        self.statuses: Counter = Counter()
+        self.locations: Counter = Counter()
+        self.distribution = OrderDistribution()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def upsert(self, order: dict) -> None:
+        self.delete(order["id"])
+        entry = (
+            float(order.get("cost") or 0),
+            float(order.get("delivery_time") or 0),
+            order.get("status") or None,
+            order.get("location") or None,
+        )
+        self._orders[order["id"]] = entry
+        self._add(entry, 1)
+
+    def delete(self, order_id: int) -> None:
+        entry = self._orders.pop(order_id, None)
+        if entry is not None:
+            self._add(entry, -1)
+
+    def _add(self, entry: tuple, sign: int) -> None:
+        cost, delivery_time, status, location = entry
+        self.sum_cost += sign * cost
+        self.sum_delivery_time += sign * delivery_time
+        self.distribution.add(delivery_time, cost, location, status, sign)
+        if status:
+            self.statuses[status] += sign
+            if not self.statuses[status]:
+                del self.statuses[status]
+        if location:
+            self.locations[location] += sign
+            if not self.locations[location]:
+                del self.locations[location]
+
+    def to_aggregate(self) -> dict:
+        count = len(self._orders)
+        return {
+            "count": count,
+            "cost": {"avg": self.sum_cost / count if count else None},
+            "delivery_time": {"avg": self.sum_delivery_time / count if count else None},
+            "by_status": dict(self.statuses),
+            "by_location": dict(self.locations),
+        }
@@ -0,0 +1,284 @@
+import struct
+from functools import cached_property
+
+import numpy as np
+import orjson
+
+from analytics_service.calculations import OrderDistribution, SpaceSavingCounter
+from analytics_service.core.metrics import timed_calculation
+
+try:
+    import pyarrow
+except ImportError:  # optional: without it the struct-packed format is used
+    pyarrow = None
+
+# Binary GET /orders formats; the layout is documented in
+# orders_service.columnar_wire.
+COLUMNAR_MEDIA_TYPE = "application/vnd.orders.columns"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+_HEADER = struct.Struct("<4sHHQ")
+_NUMERIC_COLUMNS = (("id", "<i8"), ("cost", "<f8"), ("delivery_time", "<i8"))
+_DICTIONARY_COLUMNS = ("item_name", "location", "status")
+
+
+def _encode(values) -> tuple[np.ndarray, list]:
+    """Dictionary-encode values into int32 codes assigned in first-seen order."""
+    index: dict = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.int32,
+    )
+    return codes, list(index)
+
+
+def _aligned(offset: int) -> int:
+    return offset + (-offset % 8)
+
+
+def decode_order_columns(body: bytes) -> dict:
+    """
+    Columns of a COLUMNAR_MEDIA_TYPE body.
+
+    Numeric columns and `<name>_codes` are read-only numpy views into `body`,
+    not copies; string columns come back as their small dictionaries.
+    """
+    try:
+        return _decode_order_columns(body)
+    except struct.error as exc:
+        raise ValueError(f"truncated orders columnar body: {exc}") from None
+
+
+def _decode_order_columns(body: bytes) -> dict:
+    magic, version, column_count, rows = _HEADER.unpack_from(body)
+    if magic != b"ORDC" or version != 1:
+        raise ValueError(f"not a version 1 orders columnar body: {magic!r} v{version}")
+    offset = _HEADER.size
+    columns = {}
+    for name, dtype in _NUMERIC_COLUMNS:
+        columns[name] = np.frombuffer(body, dtype=dtype, count=rows, offset=offset)
+        offset += rows * 8
+    view = memoryview(body)
+    for name in _DICTIONARY_COLUMNS:
+        (length,) = struct.unpack_from("<I", body, offset)
+        columns[name] = orjson.loads(view[offset + 4:offset + 4 + length])
+        offset = _aligned(offset + 4 + length)
+        columns[f"{name}_codes"] = np.frombuffer(body, dtype="<i4", count=rows, offset=offset)
+        offset = _aligned(offset + rows * 4)
+    if offset != len(body):
+        raise ValueError(f"orders columnar body has {len(body) - offset} trailing bytes")
+    return columns
+
+
+def decode_order_arrow(body: bytes) -> dict:
+    """The same columns as `decode_order_columns`, from an Arrow IPC stream."""
+    table = pyarrow.ipc.open_stream(body).read_all().unify_dictionaries().combine_chunks()
+    columns = {}
+    for name, _ in _NUMERIC_COLUMNS:
+        columns[name] = table.column(name).to_numpy()
+    for name in _DICTIONARY_COLUMNS:
+        column = table.column(name)
+        if column.num_chunks:
+            chunk = column.chunk(0)
+            columns[name] = chunk.dictionary.to_pylist()
+            columns[f"{name}_codes"] = chunk.indices.to_numpy()
+        else:
+            columns[name], columns[f"{name}_codes"] = [], np.zeros(0, dtype=np.int32)
+    return columns
+
+
+def concat_order_columns(parts: list[dict]) -> dict:
+    """
+    Decoded columns of consecutive id ranges, joined into one set.
+
+    Each part has its own string dictionaries; codes are mapped onto one
+    merged dictionary per column, still in first-seen order when the parts
+    are in id order, so the result equals decoding the whole range at once.
+    """
+    columns = {
+        name: np.concatenate([part[name] for part in parts]) if parts else np.zeros(0, dtype=dtype)
+        for name, dtype in _NUMERIC_COLUMNS
+    }
+    for name in _DICTIONARY_COLUMNS:
+        index: dict = {}
+        codes = [np.zeros(0, dtype=np.int32)]
+        for part in parts:
+            dictionary = part[name]
+            remap = np.fromiter(
+                (index.setdefault(value, len(index)) for value in dictionary), dtype=np.int32, count=len(dictionary)
+            )
+            codes.append(remap[part[f"{name}_codes"]])
+        columns[name] = list(index)
+        columns[f"{name}_codes"] = np.concatenate(codes)
+    return columns
+
+
+class OrderBatch:
+    """
+    Columnar view of an orders snapshot.
+
+    cost and delivery_time are float64 arrays; location and status are
+    dictionary-encoded integer codes. The batch is built once per fetch and
+    every metric is then a vectorized reduction over the columns. Results
+    match the row-wise functions in `analytics_service.calculations`,
+    including first-seen ordering of ties.
+
+    With `location_capacity` locations are not encoded at all; a
+    SpaceSavingCounter tracks the top locations in bounded memory instead,
+    for location fields with too many distinct values to hold.
+    """
+
+    def __init__(
+        self,
+        cost: np.ndarray,
+        delivery_time: np.ndarray,
+        location_codes: np.ndarray,
+        locations: list,
+        status_codes: np.ndarray,
+        statuses: list,
+        location_hitters: SpaceSavingCounter | None = None,
+    ):
+        self.cost = cost
+        self.delivery_time = delivery_time
+        self.location_codes = location_codes
+        self.locations = locations
+        self.status_codes = status_codes
+        self.statuses = statuses
+        self.location_hitters = location_hitters
+
+    @classmethod
+    @timed_calculation
+    def from_orders(cls, orders: list[dict], location_capacity: int | None = None) -> "OrderBatch":
+        count = len(orders)
+        cost = np.fromiter(
+            (order.get("cost", 0) for order in orders), dtype=np.float64, count=count
+        )
+        delivery_time = np.fromiter(
+            (order.get("delivery_time", 0) for order in orders), dtype=np.float64, count=count
+        )
+        status_codes, statuses = _encode(order.get("status") for order in orders)
+        if location_capacity is not None:
+            hitters = SpaceSavingCounter(location_capacity)
+            hitters.update(order.get("location") for order in orders if order.get("location"))
+            empty = np.zeros(0, dtype=np.int32)
+            return cls(cost, delivery_time, empty, [], status_codes, statuses, location_hitters=hitters)
+        location_codes, locations = _encode(order.get("location") for order in orders)
+        return cls(cost, delivery_time, location_codes, locations, status_codes, statuses)
+
+    @classmethod
+    @timed_calculation
+    def from_columns(cls, columns: dict, location_capacity: int | None = None) -> "OrderBatch":
+        """
+        Batch over decoded binary columns, without per-order objects.
+
+        The server assigns dictionary codes in first-seen order, so this is
+        the same batch `from_orders` builds from the JSON rows.
+        """
+        cost = columns["cost"]
+        delivery_time = columns["delivery_time"].astype(np.float64)
+        if location_capacity is not None:
+            locations = columns["location"]
+            hitters = SpaceSavingCounter(location_capacity)
+            hitters.update(
+                locations[code] for code in columns["location_codes"].tolist() if locations[code]
+            )
+            empty = np.zeros(0, dtype=np.int32)
+            return cls(
+                cost, delivery_time, empty, [], columns["status_codes"], columns["status"],
+                location_hitters=hitters,
+            )
+        return cls(
+            cost,
+            delivery_time,
+            columns["location_codes"],
+            columns["location"],
+            columns["status_codes"],
+            columns["status"],
+        )
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.cost.nbytes
+            + self.delivery_time.nbytes
+            + self.location_codes.nbytes
+            + self.status_codes.nbytes
+        )
+
+    @timed_calculation
+    def average_delivery_time(self) -> float:
+        return float(self.delivery_time.mean()) if len(self) else 0.0
+
+    @timed_calculation
+    def average_cost(self) -> float:
+        return float(self.cost.mean()) if len(self) else 0.0
+
+    @property
+    def approximate_locations(self) -> bool:
+        return self.location_hitters is not None
+
+    @cached_property
+    def _location_counts(self) -> list[tuple[str, int]]:
+        """Non-empty locations ranked by count, ties in first-seen order."""
+        if self.location_hitters is not None:
+            return [(location, count) for location, count, _ in self.location_hitters.most_common(len(self.location_hitters))]
+        counts = np.bincount(self.location_codes, minlength=len(self.locations))
+        ranked = np.argsort(-counts, kind="stable")
+        return [
+            (self.locations[code], int(counts[code]))
+            for code in ranked
+            if self.locations[code]
+        ]
+
+    @timed_calculation
+    def top_locations(self, top_n: int = 3) -> list[str]:
+        return [location for location, _ in self._location_counts[:top_n]]
+
+    @timed_calculation
+    def top_locations_with_counts(self, top_n: int = 3) -> list[dict]:
+        if self.location_hitters is not None:
+            return [
+                {"location": location, "count": count, "error": error}
+                for location, count, error in self.location_hitters.most_common(top_n)
+            ]
+        return [
+            {"location": location, "count": count}
+            for location, count in self._location_counts[:top_n]
+        ]
+
+    @timed_calculation
+    def status_breakdown(self) -> dict[str, int]:
+        counts = np.bincount(self.status_codes, minlength=len(self.statuses))
+        breakdown: dict[str, int] = {}
+        for status, count in zip(self.statuses, counts.tolist()):
+            if status:
+                breakdown[str(status)] = breakdown.get(str(status), 0) + count
+        return breakdown
+
+    @cached_property
+    @timed_calculation
+    def distribution(self) -> OrderDistribution:
+        """
+        Quantile sketches for the batch, one vectorized pass per group.
+
+        Rows are sorted by code once per dimension and each group is a
+        contiguous slice, so the work is O(N log N) however many keys
+        there are. Approximate-location batches have no per-location sketches.
+        """
+        distribution = OrderDistribution()
+        distribution.add_arrays(self.delivery_time, self.cost)
+        for dimension, codes, keys in (
+            ("location", self.location_codes, self.locations),
+            ("status", self.status_codes, self.statuses),
+        ):
+            order = np.argsort(codes, kind="stable")
+            bounds = np.cumsum(np.bincount(codes, minlength=len(keys)))[:-1]
+            groups = zip(
+                keys, np.split(self.delivery_time[order], bounds), np.split(self.cost[order], bounds)
+            )
+            for key, delivery_time, cost in groups:
+                if key:
+                    distribution.add_arrays(delivery_time, cost, dimension, str(key))
+        return distribution
@@ -0,0 +1,65 @@
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+
+def _opaque_tags(header: str) -> set[str]:
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored.
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+class ConditionalGetMiddleware:
+    """
+    Pure ASGI middleware adding an ETag to successful GET responses.
+
+    The tag is a hash of the body, so identical reports get identical tags
+    whichever calculation mode produced them, and a matching If-None-Match
+    is answered with an empty 304. Bodies are buffered, which is fine for
+    the small JSON reports this service returns.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    await send(message)
+                    return
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(raw=start["headers"])
+            headers["ETag"] = etag
+            if if_none_match is not None and (
+                "*" in (tags := _opaque_tags(if_none_match)) or etag in tags
+            ):
+                del headers["content-length"]
+                if "content-type" in headers:
+                    del headers["content-type"]
+                await send({**start, "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
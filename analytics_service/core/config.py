@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -7,6 +10,69 @@ class Settings(BaseSettings):
     REQUEST_TIMEOUT: float = 5.0
     MAX_RETRIES: int = 3
     INITIAL_BACKOFF: float = 0.5
+    # "full" sleeps a random time between 0 and the doubling backoff so
+    # clients failing together don't retry in lockstep.
+    BACKOFF_JITTER: Literal["none", "full"] = "none"
+    # Race a second identical request once an attempt runs longer than the
+    # HEDGE_QUANTILE of the last successful ones (after HEDGE_MIN_SAMPLES).
+    HEDGE_REQUESTS: bool = False
+    HEDGE_QUANTILE: float = 0.95
+    HEDGE_MIN_SAMPLES: int = 20
+    # Consecutive 5xx/network failures that open the circuit to
+    # orders_service (0 disables it). While open, requests fail fast with 503,
+    # or get the last validated body with CIRCUIT_SERVE_STALE (needs
+    # CONDITIONAL_REQUESTS), until a probe is let through after
+    # CIRCUIT_RESET_TIMEOUT seconds.
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0
+    CIRCUIT_SERVE_STALE: bool = True
+    # "rows" downloads every order and reduces it here; "aggregate" asks
+    # orders_service to compute the totals with SQL GROUP BY; "incremental"
+    # keeps running totals and only pulls changes from the orders change feed;
+    # "rollup" sums the hourly order_rollups rows (from/to rounded to hours).
+    CALCULATION_MODE: Literal["rows", "aggregate", "incremental", "rollup"] = "rows"
+    CHANGE_FEED_PAGE_SIZE: int = 1000
+    # Format rows mode asks GET /orders for: "columnar" is a struct-packed
+    # binary layout decoded straight into numpy arrays, "arrow" an Arrow IPC
+    # stream (needs pyarrow on both sides, else columnar is used), "json"
+    # the plain array. Orders answering in JSON is always accepted.
+    ORDERS_TRANSPORT: Literal["json", "columnar", "arrow"] = "columnar"
+    # Split full GET /orders reads into up to this many id ranges (from
+    # GET /orders/bounds), fetched concurrently, ORDERS_FETCH_CONCURRENCY at
+    # a time, each with its own retries. Ranges span at least
+    # ORDERS_PARTITION_MIN_IDS ids; 1 keeps a single request.
+    ORDERS_FETCH_PARTITIONS: int = 1
+    ORDERS_FETCH_CONCURRENCY: int = 4
+    ORDERS_PARTITION_MIN_IDS: int = 10_000
+    # "approximate" ranks locations in rows mode with a Space-Saving summary
+    # of TOP_LOCATIONS_CAPACITY entries instead of counting every distinct one.
+    TOP_LOCATIONS_MODE: Literal["exact", "approximate"] = "exact"
+    TOP_LOCATIONS_CAPACITY: int = Field(default=1000, gt=0)
+    # "memory" limits per process; "sqlite" shares counts between uvicorn
+    # workers on the same host through RATE_LIMIT_SQLITE_PATH.
+    RATE_LIMIT_BACKEND: Literal["memory", "sqlite"] = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "rate_limits.sqlite3"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Upstream snapshot cache. A TTL of 0 keeps nothing but still coalesces
+    # concurrent identical fetches into one request.
+    ORDERS_CACHE_TTL: float = 0.0
+    ORDERS_CACHE_STALE_TTL: float = 0.0
+    ORDERS_CACHE_MAX_ENTRIES: int = 32
+    # Send If-None-Match/If-Modified-Since to orders_service and reuse the
+    # last parsed body (and the columnar batch built from it) on 304.
+    CONDITIONAL_REQUESTS: bool = True
+    # Seconds between background recomputations of every unranged view
+    # (0 keeps all work on the request path). Each wait varies by up to
+    # PRECOMPUTE_JITTER of the interval. Views older than PRECOMPUTE_MAX_AGE
+    # (say, while orders_service is down) are not served.
+    PRECOMPUTE_INTERVAL: float = 0.0
+    PRECOMPUTE_JITTER: float = 0.1
+    PRECOMPUTE_MAX_AGE: float = 60.0
+    # Client networks allowed to scrape /metrics (which skips the API key).
+    # Loopback only: behind Docker's published ports every outside client
+    # arrives from a private bridge address, so wider ranges must be opted
+    # into per deployment (e.g. the scraper's own network).
+    METRICS_ALLOWLIST: list[str] = ["127.0.0.0/8", "::1/128"]
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,9 +1,26 @@
+import importlib.util
+
 import httpx
 from analytics_service.core.config import settings
 
 _async_client: httpx.AsyncClient | None = None
 
 
+def accept_encoding() -> str:
+    """
+    Encodings to ask orders_service for, preferred first.
+
+    httpx decodes zstd and br itself once zstandard / brotli are installed,
+    so only those that will decode here are advertised.
+    """
+    encodings = [
+        encoding
+        for encoding, module in (("zstd", "zstandard"), ("br", "brotli"))
+        if importlib.util.find_spec(module) is not None
+    ]
+    return ", ".join([*encodings, "gzip"])
+
+
 async def get_http_client() -> httpx.AsyncClient :
     """Dependency-injected async HTTP client."""
     if _async_client is None:
@@ -17,7 +34,7 @@ async def init_http_client():
     if _async_client is None:
         _async_client = httpx.AsyncClient(
             timeout=settings.REQUEST_TIMEOUT,
-            headers={"X-API-Key": settings.ORDERS_API_KEY}
+            headers={"X-API-Key": settings.ORDERS_API_KEY, "Accept-Encoding": accept_encoding()},
         )
 
 
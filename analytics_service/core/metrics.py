@@ -0,0 +1,162 @@
+import functools
+import ipaddress
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from analytics_service.core.config import settings
+
+# Own registry so /metrics exports only what this module defines.
+registry = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body byte.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_bytes",
+    "Response body size.",
+    ["method", "route"],
+    buckets=BYTES_BUCKETS,
+    registry=registry,
+)
+UPSTREAM_SECONDS = Histogram(
+    "orders_upstream_request_duration_seconds",
+    "Duration of each attempt at an orders_service request.",
+    ["endpoint", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+UPSTREAM_RETRIES = Counter(
+    "orders_upstream_retries",
+    "Orders_service requests retried after a failed attempt.",
+    ["endpoint"],
+    registry=registry,
+)
+UPSTREAM_BYTES = Histogram(
+    "orders_upstream_response_bytes",
+    "Orders_service response body size on the wire (before decompression).",
+    ["endpoint"],
+    buckets=BYTES_BUCKETS,
+    registry=registry,
+)
+UPSTREAM_HEDGES = Counter(
+    "orders_upstream_hedged_requests",
+    "Second requests fired because an orders_service attempt was slow.",
+    ["endpoint"],
+    registry=registry,
+)
+CIRCUIT_REJECTIONS = Counter(
+    "orders_upstream_circuit_rejections",
+    "Orders_service requests not sent because the circuit was open.",
+    ["endpoint", "served"],
+    registry=registry,
+)
+CIRCUIT_OPEN = Gauge(
+    "orders_upstream_circuit_open",
+    "1 while the orders_service circuit breaker is open.",
+    registry=registry,
+)
+PRECOMPUTE_AGE = Gauge(
+    "analytics_precomputed_views_age_seconds",
+    "Age of the published precomputed views (NaN before the first refresh).",
+    registry=registry,
+)
+CALCULATION_SECONDS = Histogram(
+    "analytics_calculation_duration_seconds",
+    "Time spent in each analytics calculation.",
+    ["function"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections",
+    "Requests rejected by the per-key rate limiter.",
+    registry=registry,
+)
+
+
+def timed_calculation(func):
+    """Record the wall time of every call to `func` in CALCULATION_SECONDS."""
+    histogram = CALCULATION_SECONDS.labels(func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (like /metrics) set only the endpoint.
+    return scope["path"] if "endpoint" in scope else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency and body size per route template.
+
+    Unmatched paths share one label so scanners cannot blow up cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_label(scope)
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+            RESPONSE_BYTES.labels(scope["method"], route).observe(body_bytes)
+
+
+def _client_allowed(host: str | None) -> bool:
+    try:
+        address = ipaddress.ip_address(host or "")
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWLIST)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Prometheus text exposition.
+
+    Registered as a plain Starlette route so the app-wide API key dependency
+    does not apply; access is limited to METRICS_ALLOWLIST client networks.
+    """
+    if not _client_allowed(request.client.host if request.client else None):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -3,8 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from analytics_service.core.dependencies import verify_api_key
 from analytics_service.core.logging import setup_logging
-from analytics_service.core.http_client import init_http_client, close_http_client
-from analytics_service.routers.analytics import router as analytics_router
+from analytics_service.core.config import settings
+from analytics_service.core.http_client import init_http_client, close_http_client, get_http_client
+from analytics_service.core.conditional import ConditionalGetMiddleware
+from analytics_service.core.metrics import MetricsMiddleware, metrics_endpoint
+from analytics_service.routers.analytics import precompute_views, precomputer, router as analytics_router
 
 app = FastAPI(
     title="Analytics Service",
@@ -18,16 +21,24 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 async def startup_event():
     setup_logging()
     await init_http_client()
+    if settings.PRECOMPUTE_INTERVAL > 0:
+        client = await get_http_client()
+        precomputer.start(lambda: precompute_views(client))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    # Stop the refresh loop before closing the client it fetches with.
+    await precomputer.stop()
     await close_http_client()
 
 
 app.include_router(analytics_router)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from analytics_service.schemas import AnalyticsSummary, DistributionReport, LocationBreakdown, StatusBreakdown
+
+logger = logging.getLogger("analytics.precompute")
+
+
+@dataclass(frozen=True)
+class PrecomputedViews:
+    """
+    Every unranged analytics view, computed together from one snapshot.
+
+    `location_breakdown` holds the top MAX_LOCATION_LIMIT locations;
+    smaller limits are slices of it. `distribution` is the report for the
+    default quantiles, or None when the mode would need an extra row fetch.
+    """
+
+    computed_at: float  # time.monotonic() when the snapshot fetch started
+    summary: AnalyticsSummary
+    status_breakdown: StatusBreakdown
+    location_breakdown: LocationBreakdown
+    distribution: DistributionReport | None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.computed_at
+
+
+class Precomputer:
+    """
+    Background task recomputing the analytics views on a schedule.
+
+    Runs `compute` every `interval` seconds, each wait stretched or shrunk
+    by up to `jitter` (a fraction of the interval) so several workers don't
+    refresh in lockstep. A result is published by replacing one attribute,
+    so readers see either the previous set of views or the new one, never
+    a mix. Failed refreshes are logged and the last good views are kept.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float = 0.0,
+        rng: random.Random | None = None,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.views: PrecomputedViews | None = None
+        self.counters = {"refreshes": 0, "errors": 0}
+        self._task: asyncio.Task | None = None
+
+    def current(self, max_age: float) -> PrecomputedViews | None:
+        """The published views if they are at most `max_age` seconds old."""
+        views = self.views
+        if views is None or views.age > max_age:
+            return None
+        return views
+
+    async def refresh(self, compute: Callable[[], Awaitable[PrecomputedViews]]) -> PrecomputedViews:
+        views = await compute()
+        self.views = views
+        self.counters["refreshes"] += 1
+        return views
+
+    def next_delay(self) -> float:
+        return max(0.0, self.interval * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    async def _run(self, compute: Callable[[], Awaitable[PrecomputedViews]]) -> None:
+        while True:
+            try:
+                await self.refresh(compute)
+            except Exception:
+                self.counters["errors"] += 1
+                logger.exception("Precomputing analytics views failed; keeping the previous ones")
+            await asyncio.sleep(self.next_delay())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, compute: Callable[[], Awaitable[PrecomputedViews]]) -> None:
+        """Start refreshing in the background, the first time right away."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run(compute), name="analytics-precompute")
+
+    async def stop(self) -> None:
+        """Cancel the task and wait for it; the published views are dropped."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.views = None
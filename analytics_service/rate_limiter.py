@@ -1,48 +1,174 @@
+import math
+import sqlite3
+import threading
 import time
 import logging
+from collections import OrderedDict
 
 from fastapi import Depends, HTTPException, status
+from analytics_service.core.config import settings
 from analytics_service.core.dependencies import verify_api_key
+from analytics_service.core.metrics import RATE_LIMIT_REJECTIONS
 
 logger = logging.getLogger("analytics.rate_limiter")
 
 REQUEST_LIMIT = 60
 WINDOW_SIZE_SECONDS = 60
 
-_rate_limit_store: dict[str, dict[str, float | int]] = {}
+# Keys idle for this long carry no weight in the sliding window any more.
+IDLE_AFTER_SECONDS = 2 * WINDOW_SIZE_SECONDS
+# Upper bound on idle keys evicted per request, so eviction stays O(1).
+EVICTIONS_PER_REQUEST = 8
+
+_rate_limit_store: OrderedDict[str, list[float | int]] = OrderedDict()
+
+
+def sliding_window_hit(
+    entry: list[float | int] | None,
+    now: float,
+    limit: int,
+    window: float,
+) -> tuple[list[float | int], float | None]:
+    """
+    Apply one request to a sliding window counter.
+
+    `entry` is [window_index, previous_count, current_count]. The previous
+    window's count is weighted by how much of it still overlaps the trailing
+    window, which removes the 2x burst a fixed window allows at its edge.
+    Returns the updated entry and None if allowed, or seconds to wait if not.
+    """
+    index = math.floor(now / window)
+    if entry is None or entry[0] < index - 1:
+        entry = [index, 0, 0]
+    elif entry[0] == index - 1:
+        entry = [index, entry[2], 0]
+
+    elapsed = now / window - index
+    estimated = entry[1] * (1 - elapsed) + entry[2]
+    if estimated + 1 > limit:
+        # Solve for the elapsed fraction at which one more request fits.
+        if entry[2] + 1 <= limit and entry[1]:
+            wait = 1 - (limit - 1 - entry[2]) / entry[1] - elapsed
+        else:
+            wait = 1 - elapsed + max(0.0, 1 - (limit - 1) / entry[2])
+        return entry, wait * window
+    entry[2] += 1
+    return entry, None
+
+
+class MemoryBackend:
+    """
+    Per-process store, ordered by last use.
+
+    Each request moves its key to the end and evicts a few idle keys from the
+    front; `max_keys` caps the store if keys arrive faster than they idle out.
+    The dependency runs in FastAPI's threadpool, so every hit holds a lock.
+    """
+
+    def __init__(self, store: OrderedDict, max_keys: int):
+        self.store = store
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, now: float, limit: int, window: float) -> float | None:
+        with self._lock:
+            entry = self.store.get(key)
+            if entry is not None:
+                self.store.move_to_end(key)
+                entry = entry[:3]
+            entry, retry_after = sliding_window_hit(entry, now, limit, window)
+            self.store[key] = [*entry, now]
+            self._evict(now)
+        return retry_after
+
+    def _evict(self, now: float) -> None:
+        for _ in range(EVICTIONS_PER_REQUEST):
+            if not self.store:
+                return
+            oldest_key = next(iter(self.store))
+            last_seen = self.store[oldest_key][3]
+            if now - last_seen < IDLE_AFTER_SECONDS and len(self.store) <= self.max_keys:
+                return
+            del self.store[oldest_key]
+
+
+class SQLiteBackend:
+    """
+    Store shared by every worker process on the host through one SQLite file.
+
+    Each hit is a single IMMEDIATE transaction, so concurrent workers see a
+    consistent count. Idle rows are purged every `purge_every` hits.
+    """
+
+    def __init__(self, path: str, purge_every: int = 1000):
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_index INTEGER, previous INTEGER, "
+                "current INTEGER, last_seen REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, now: float, limit: int, window: float) -> float | None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_index, previous, current FROM rate_limits WHERE key = ?",
+                (key,),
+            ).fetchone()
+            entry, retry_after = sliding_window_hit(list(row) if row else None, now, limit, window)
+            conn.execute(
+                "INSERT INTO rate_limits (key, window_index, previous, current, last_seen) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "window_index = excluded.window_index, previous = excluded.previous, "
+                "current = excluded.current, last_seen = excluded.last_seen",
+                (key, *entry, now),
+            )
+            self._hits += 1
+            if self._hits % self.purge_every == 0:
+                conn.execute("DELETE FROM rate_limits WHERE last_seen < ?", (now - IDLE_AFTER_SECONDS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+_backend: MemoryBackend | SQLiteBackend | None = None
+
+
+def get_backend() -> MemoryBackend | SQLiteBackend:
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "sqlite":
+            _backend = SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+        else:
+            _backend = MemoryBackend(_rate_limit_store, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    return _backend
 
 
 def rate_limit_dependency(api_key: str = Depends(verify_api_key)) -> None:
     """
-    Fixed window, per API key rate limiter.
-    
+    Sliding window, per API key rate limiter.
+
     Raises HTTP 429 if the request limit is exceeded.
     """
-    now = time.time()
-    entry = _rate_limit_store.get(api_key)
-
-    # First request from this API key
-    if entry is None:
-        _rate_limit_store[api_key] = {
-            "window_start": now,
-            "count": 1,
-        }
-        return
-    window_start = entry["window_start"]
-    count = entry["count"]
-
-    # Reset if window expired
-    if now - window_start >= WINDOW_SIZE_SECONDS:
-        _rate_limit_store[api_key] = {
-            "window_start": now,
-            "count": 1
-        }
-        return
-    
-    count += 1
-    entry["count"] = count
-
-    if count > REQUEST_LIMIT:
+    retry_after = get_backend().hit(api_key, time.time(), REQUEST_LIMIT, WINDOW_SIZE_SECONDS)
+
+    if retry_after is not None:
+        RATE_LIMIT_REJECTIONS.inc()
         logger.warning(
             "Rate limit exceeded for API key=%s (limit=%d per %ds)",
             api_key,
@@ -53,6 +179,6 @@ def rate_limit_dependency(api_key: str = Depends(verify_api_key)) -> None:
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded. Try again later.",
             headers={
-                "Retry-After": str(WINDOW_SIZE_SECONDS)
+                "Retry-After": str(max(1, math.ceil(retry_after)))
             }
         )
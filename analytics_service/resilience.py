@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+import httpx
+
+logger = logging.getLogger("analytics.resilience")
+
+Send = Callable[[], Awaitable[httpx.Response]]
+
+
+def backoff_delay(backoff: float, jitter: str, rng: random.Random = random) -> float:
+    """
+    Sleep before the next retry, given the current (doubling) backoff.
+
+    "full" jitter draws uniformly from [0, backoff] so callers that failed
+    together don't retry in lockstep; "none" returns `backoff` unchanged.
+    """
+    if jitter == "full":
+        return rng.uniform(0, backoff)
+    return backoff
+
+
+class LatencyTracker:
+    """Durations of the last `window` successful attempts, for hedge delays."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _failed(outcome: httpx.Response | BaseException) -> bool:
+    return isinstance(outcome, BaseException) or outcome.status_code >= 500
+
+
+async def hedged(send: Send, delay: float | None, on_hedge: Callable[[], None] = lambda: None) -> httpx.Response:
+    """
+    Await `send()`, firing a second identical request after `delay` seconds.
+
+    The first response that is not a network error or a 5xx wins and the
+    other request is cancelled. If both fail, the later failure is returned
+    (or raised) so the caller handles it like a single attempt. Only for
+    idempotent requests.
+    """
+    if delay is None:
+        return await send()
+
+    pending = {asyncio.ensure_future(send())}
+    done, _ = await asyncio.wait(pending, timeout=delay)
+    if not done:
+        on_hedge()
+        pending.add(asyncio.ensure_future(send()))
+
+    outcome: httpx.Response | BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcome = task.exception() or task.result()
+                if not _failed(outcome):
+                    return outcome
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker around one upstream.
+
+    `failure_threshold` consecutive failed attempts open the circuit; while
+    open, `allow` refuses every call for `reset_timeout` seconds. Then one
+    probe is let through (half-open): success closes the circuit, failure
+    opens it for another `reset_timeout`. A threshold of 0 disables it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0 or self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self.retry_after > 0:
+                return False
+            self.state = self.HALF_OPEN
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed after a successful probe")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def abandon(self) -> None:
+        """
+        End an allowed attempt that produced no outcome.
+
+        Cancelled attempts and unexpected errors must still release a
+        half-open probe, or the circuit would refuse every call forever;
+        an abandoned probe counts as failed. Outside a probe it does nothing.
+        """
+        if self._probing:
+            self.record_failure()
+
+    def record_failure(self) -> None:
+        self._probing = False
+        if self.failure_threshold <= 0:
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit opened after %d consecutive failures", self.failures)
+            self.state = self.OPEN
+            self.opened_at = self.clock()
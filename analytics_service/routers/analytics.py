@@ -1,18 +1,57 @@
 import asyncio
+import math
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+from urllib.parse import urlencode
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
+from analytics_service.cache import SnapshotCache, ValidatorCache
+from analytics_service.incremental import OrderChangeTracker
+from analytics_service.precompute import PrecomputedViews, Precomputer
 from analytics_service.rate_limiter import rate_limit_dependency
 from analytics_service.core.config import settings
 from analytics_service.core.http_client import get_http_client
-from analytics_service.schemas import AnalyticsSummary, StatusBreakdown, LocationBreakdown
+from analytics_service.core.metrics import (
+    CIRCUIT_OPEN,
+    CIRCUIT_REJECTIONS,
+    PRECOMPUTE_AGE,
+    UPSTREAM_BYTES,
+    UPSTREAM_HEDGES,
+    UPSTREAM_RETRIES,
+    UPSTREAM_SECONDS,
+)
+from analytics_service.resilience import CircuitBreaker, LatencyTracker, backoff_delay, hedged
+from analytics_service.schemas import (
+    DEFAULT_DASHBOARD_SECTIONS,
+    AnalyticsSummary,
+    DashboardReport,
+    DashboardSection,
+    DistributionReport,
+    LocationBreakdown,
+    StatusBreakdown,
+)
+from analytics_service.columnar import (
+    ARROW_MEDIA_TYPE,
+    COLUMNAR_MEDIA_TYPE,
+    OrderBatch,
+    concat_order_columns,
+    decode_order_arrow,
+    decode_order_columns,
+    pyarrow,
+)
 from analytics_service.calculations import (
-    average_delivery_time,
-    average_cost,
-    top_locations,
-    status_breakdown,
-    top_locations_with_counts,
+    DEFAULT_QUANTILES,
+    OrderDistribution,
+    aggregate_from_rollups,
+    average_delivery_time_from_aggregate,
+    average_cost_from_aggregate,
+    top_locations_from_aggregate,
+    status_breakdown_from_aggregate,
+    top_locations_with_counts_from_aggregate,
 )
 
 router = APIRouter(
@@ -21,22 +60,133 @@ router = APIRouter(
     dependencies=[Depends(rate_limit_dependency)]
 )
 
+orders_cache = SnapshotCache(
+    ttl=settings.ORDERS_CACHE_TTL,
+    stale_ttl=settings.ORDERS_CACHE_STALE_TTL,
+    max_entries=settings.ORDERS_CACHE_MAX_ENTRIES,
+)
+
+change_tracker = OrderChangeTracker()
+
+upstream_validators = ValidatorCache(max_entries=settings.ORDERS_CACHE_MAX_ENTRIES)
+
+orders_breaker = CircuitBreaker(
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+)
+CIRCUIT_OPEN.set_function(lambda: orders_breaker.state == CircuitBreaker.OPEN)
+
+precomputer = Precomputer(interval=settings.PRECOMPUTE_INTERVAL, jitter=settings.PRECOMPUTE_JITTER)
+PRECOMPUTE_AGE.set_function(lambda: precomputer.views.age if precomputer.views else float("nan"))
+
+# Successful attempt durations per endpoint, for the hedge delay.
+upstream_latency: dict[str, LatencyTracker] = {}
+
+
+def _orders_url(*path: str) -> str:
+    return "/".join([settings.ORDERS_API_URL.rstrip("/"), *path])
+
+
+def _cache_key(url: str, params: dict | None) -> str:
+    return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+
+def time_range_params(
+    created_from: datetime | None = Query(default=None, alias="from"),
+    created_to: datetime | None = Query(default=None, alias="to"),
+) -> dict:
+    """`?from=&to=` created_at bounds, forwarded as-is to orders_service."""
+    params = {}
+    if created_from is not None:
+        params["from"] = created_from.isoformat()
+    if created_to is not None:
+        params["to"] = created_to.isoformat()
+    return params
+
 
-async def fetch_orders(client: httpx.AsyncClient) -> list[dict]:
+def _validator_key(url: str, params: dict | None, accept: str | None = None) -> str:
+    # Representations negotiated with Accept are validated separately.
+    key = _cache_key(url, params)
+    return f"{key}#{accept}" if accept else key
+
+
+def _hedge_delay(endpoint: str) -> float | None:
+    """HEDGE_QUANTILE of recent attempts, once HEDGE_MIN_SAMPLES are in."""
+    tracker = upstream_latency.get(endpoint)
+    if not settings.HEDGE_REQUESTS or tracker is None or len(tracker) < settings.HEDGE_MIN_SAMPLES:
+        return None
+    return tracker.quantile(settings.HEDGE_QUANTILE)
+
+
+def _circuit_open(key: str, endpoint: str):
+    """Last good body for `key` while the circuit is open, else a 503."""
+    cached = upstream_validators.get(key) if settings.CIRCUIT_SERVE_STALE else None
+    CIRCUIT_REJECTIONS.labels(endpoint, "stale" if cached is not None else "error").inc()
+    if cached is not None:
+        return cached.data
+    raise HTTPException(
+        status_code=503,
+        detail="Orders service unavailable (circuit open)",
+        headers={"Retry-After": str(max(1, math.ceil(orders_breaker.retry_after)))},
+    )
+
+
+async def _get_json(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict | None = None,
+    endpoint: str = "orders",
+    accept: str | None = None,
+    decode: Callable[[httpx.Response], Any] | None = None,
+):
+    """
+    GET with retries, conditional revalidation and metrics.
+
+    The body is parsed as JSON unless `decode` is given; `accept` is sent
+    as the Accept header for content negotiation. Every attempt goes through
+    `orders_breaker`: 5xx and network errors count against it, and while it
+    is open the last validated body is returned (CIRCUIT_SERVE_STALE) or a
+    503 raised without calling orders_service. With HEDGE_REQUESTS a slow
+    attempt is raced against a second identical request.
+    """
     backoff = settings.INITIAL_BACKOFF
+    key = _validator_key(url, params, accept)
+    cached = upstream_validators.get(key) if settings.CONDITIONAL_REQUESTS else None
+    headers = cached.request_headers() if cached else {}
+    if accept:
+        headers["Accept"] = accept
+
+    def send() -> Awaitable[httpx.Response]:
+        return client.get(url, params=params, headers=headers or None, timeout=settings.REQUEST_TIMEOUT)
 
     for attempt in range(1, settings.MAX_RETRIES + 1):
+        if not orders_breaker.allow():
+            return _circuit_open(key, endpoint)
+        started = time.perf_counter()
+        outcome = "ok"
+        recorded = False
         try:
-            resp = await client.get(settings.ORDERS_API_URL, timeout=settings.REQUEST_TIMEOUT)
+            resp = await hedged(send, _hedge_delay(endpoint), on_hedge=UPSTREAM_HEDGES.labels(endpoint).inc)
+            recorded = True
+            if resp.status_code >= 500:
+                orders_breaker.record_failure()
+            else:
+                orders_breaker.record_success()
+                upstream_latency.setdefault(endpoint, LatencyTracker()).add(time.perf_counter() - started)
+            if resp.status_code == 304 and cached is not None:
+                outcome = "not_modified"
+                upstream_validators.counters["revalidated"] += 1
+                UPSTREAM_BYTES.labels(endpoint).observe(resp.num_bytes_downloaded)
+                return cached.data
             resp.raise_for_status()
-            data = resp.json()
-
-            if not isinstance(data, list):
-                raise HTTPException(status_code=502, detail="Orders service returned invalid format")
-
+            UPSTREAM_BYTES.labels(endpoint).observe(resp.num_bytes_downloaded)
+            data = decode(resp) if decode else resp.json()
+            if settings.CONDITIONAL_REQUESTS:
+                upstream_validators.store(key, data, resp.headers.get("etag"), resp.headers.get("last-modified"))
             return data
 
         except httpx.HTTPStatusError as exc:
+            outcome = f"http_{exc.response.status_code}"
             if exc.response.status_code == 401:
                 # auth failed dont retry
                 raise HTTPException(status_code=502, detail="Orders service authentication failed")
@@ -47,42 +197,459 @@ async def fetch_orders(client: httpx.AsyncClient) -> list[dict]:
                 )
 
         except (httpx.RequestError, httpx.ConnectError) as exc:
+            outcome = "network_error"
+            recorded = True
+            orders_breaker.record_failure()
             if attempt == settings.MAX_RETRIES:
                 raise HTTPException(status_code=502, detail=f"Orders service network error: {exc}")
 
-        await asyncio.sleep(backoff)
+        finally:
+            if not recorded:
+                # Cancelled or failed unexpectedly: don't leave a probe held.
+                orders_breaker.abandon()
+            UPSTREAM_SECONDS.labels(endpoint, outcome).observe(time.perf_counter() - started)
+
+        UPSTREAM_RETRIES.labels(endpoint).inc()
+        await asyncio.sleep(backoff_delay(backoff, settings.BACKOFF_JITTER))
         backoff *= 2
 
     raise HTTPException(status_code=502, detail="Failed to fetch orders after retries")
 
 
-@router.get("/summary", response_model=AnalyticsSummary)
-async def get_summary(client: httpx.AsyncClient = Depends(get_http_client)):
-    orders = await fetch_orders(client)
+def id_partitions(min_id: int, max_id: int, partitions: int, min_ids: int) -> list[dict]:
+    """
+    GET /orders params splitting ids `min_id..max_id` into consecutive ranges.
+
+    At most `partitions` ranges, each spanning at least `min_ids` ids. The
+    first range has no lower bound and the last no upper bound, so orders
+    written after the bounds were read are not missed.
+    """
+    span = max_id - min_id + 1
+    count = max(1, min(partitions, span // max(1, min_ids)))
+    edges = [min_id - 1 + span * i // count for i in range(count + 1)]
+    ranges = []
+    for i in range(count):
+        params = {}
+        if i > 0:
+            params["after_id"] = edges[i]
+        if i < count - 1:
+            params["max_id"] = edges[i + 1]
+        ranges.append(params)
+    return ranges
+
+
+def _merge_order_parts(parts: list) -> list[dict] | dict:
+    """Partition payloads in id order joined into one: JSON rows or columns."""
+    if all(isinstance(part, list) for part in parts):
+        return [order for part in parts for order in part]
+    if all(isinstance(part, dict) for part in parts):
+        try:
+            return concat_order_columns(parts)
+        except (KeyError, IndexError, TypeError):
+            pass
+    raise HTTPException(status_code=502, detail="Orders service returned invalid format")
+
+
+async def _fetch_order_rows(
+    client: httpx.AsyncClient,
+    params: dict | None = None,
+    accept: str | None = None,
+    decode: Callable[[httpx.Response], Any] | None = None,
+):
+    """
+    GET /orders, split into id ranges fetched concurrently when configured.
+
+    With ORDERS_FETCH_PARTITIONS above 1, GET /orders/bounds gives the id
+    range, and each part is its own `_get_json` call with its own retries and
+    validators. A part that keeps failing fails the fetch only after the
+    others have finished, so the next attempt revalidates those with a 304
+    instead of downloading them again.
+    """
+    ranges = [{}]
+    if settings.ORDERS_FETCH_PARTITIONS > 1:
+        bounds = await _get_json(client, _orders_url("bounds"), params=params, endpoint="bounds")
+        if not isinstance(bounds, dict):
+            raise HTTPException(status_code=502, detail="Orders service returned invalid format")
+        if bounds.get("min_id") is not None and bounds.get("max_id") is not None:
+            ranges = id_partitions(
+                bounds["min_id"], bounds["max_id"], settings.ORDERS_FETCH_PARTITIONS, settings.ORDERS_PARTITION_MIN_IDS
+            )
+    if len(ranges) == 1:
+        return await _get_json(client, settings.ORDERS_API_URL, params=params, accept=accept, decode=decode)
+
+    semaphore = asyncio.Semaphore(max(1, settings.ORDERS_FETCH_CONCURRENCY))
+
+    async def fetch_range(range_params: dict):
+        async with semaphore:
+            return await _get_json(
+                client, settings.ORDERS_API_URL, params={**(params or {}), **range_params}, accept=accept, decode=decode
+            )
+
+    parts = await asyncio.gather(*(fetch_range(range_params) for range_params in ranges), return_exceptions=True)
+    for part in parts:
+        if isinstance(part, BaseException):
+            raise part
+    return _merge_order_parts(parts)
+
+
+async def fetch_orders(client: httpx.AsyncClient, params: dict | None = None) -> list[dict]:
+    data = await _fetch_order_rows(client, params)
+
+    if not isinstance(data, list):
+        raise HTTPException(status_code=502, detail="Orders service returned invalid format")
+
+    return data
+
+
+# What get_order_batch asks for per ORDERS_TRANSPORT; JSON stays acceptable
+# so an orders_service without the binary formats still answers.
+TRANSPORT_ACCEPT = {
+    "json": None,
+    "columnar": f"{COLUMNAR_MEDIA_TYPE}, application/json;q=0.5",
+    "arrow": f"{ARROW_MEDIA_TYPE}, {COLUMNAR_MEDIA_TYPE};q=0.9, application/json;q=0.5",
+}
+
+
+def _transport_accept() -> str | None:
+    transport = settings.ORDERS_TRANSPORT
+    if transport == "arrow" and pyarrow is None:
+        transport = "columnar"
+    return TRANSPORT_ACCEPT[transport]
+
+
+def _decode_orders(resp: httpx.Response) -> list[dict] | dict:
+    """JSON rows, or a dict of columns for the binary media types."""
+    content_type = resp.headers.get("content-type", "")
+    try:
+        if content_type.startswith(COLUMNAR_MEDIA_TYPE):
+            return decode_order_columns(resp.content)
+        if content_type.startswith(ARROW_MEDIA_TYPE) and pyarrow is not None:
+            return decode_order_arrow(resp.content)
+        data = resp.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, list):
+        raise HTTPException(status_code=502, detail="Orders service returned invalid format")
+    return data
+
+
+async def fetch_order_payload(client: httpx.AsyncClient, params: dict | None = None) -> list[dict] | dict:
+    """`fetch_orders` in the ORDERS_TRANSPORT format: JSON rows or decoded columns."""
+    return await _fetch_order_rows(client, params, accept=_transport_accept(), decode=_decode_orders)
+
+
+async def fetch_order_aggregate(client: httpx.AsyncClient, params: dict | None = None) -> dict:
+    """Fetch SQL-computed totals from orders_service instead of every row."""
+    data = await _get_json(client, _orders_url("aggregate"), params=params, endpoint="aggregate")
+
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=502, detail="Orders service returned invalid format")
+
+    return data
+
+
+async def fetch_order_rollups(client: httpx.AsyncClient, params: dict | None = None) -> list[dict]:
+    """Fetch the hourly rollup rows covering the requested range."""
+    data = await _get_json(client, _orders_url("rollups"), params=params, endpoint="rollups")
+
+    if not isinstance(data, list):
+        raise HTTPException(status_code=502, detail="Orders service returned invalid format")
+
+    return data
+
+
+async def fetch_order_changes(client: httpx.AsyncClient, since: int) -> dict:
+    """Fetch one page of the orders change feed after version `since`."""
+    data = await _get_json(
+        client,
+        _orders_url("changes"),
+        params={"since": since, "limit": settings.CHANGE_FEED_PAGE_SIZE},
+        endpoint="changes",
+    )
 
-    total = len(orders)
-    avg_delivery = average_delivery_time(orders) if orders else 0.0
-    avg_cost_val = average_cost(orders) if orders else 0.0
-    top_locs = top_locations(orders) if orders else []
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=502, detail="Orders service returned invalid format")
 
+    return data
+
+
+async def get_orders_snapshot(client: httpx.AsyncClient, params: dict | None = None) -> list[dict]:
+    """`fetch_orders` through the shared snapshot cache."""
+    return await orders_cache.get(
+        _cache_key(settings.ORDERS_API_URL, params),
+        lambda: fetch_orders(client, params),
+    )
+
+
+async def get_order_batch(client: httpx.AsyncClient, params: dict | None = None) -> OrderBatch:
+    """Columnar snapshot of the orders, built once per fetch and cached."""
+    location_capacity = (
+        settings.TOP_LOCATIONS_CAPACITY if settings.TOP_LOCATIONS_MODE == "approximate" else None
+    )
+
+    def build(payload: list[dict] | dict) -> OrderBatch:
+        if isinstance(payload, dict):
+            return OrderBatch.from_columns(payload, location_capacity=location_capacity)
+        return OrderBatch.from_orders(payload, location_capacity=location_capacity)
+
+    async def load() -> OrderBatch:
+        payload = await fetch_order_payload(client, params)
+        # After a 304 the body is the stored one, and so is its batch.
+        validated = upstream_validators.get(_validator_key(settings.ORDERS_API_URL, params, _transport_accept()))
+        if validated is None or validated.data is not payload:
+            return build(payload)
+        if suffix not in validated.derived:
+            validated.derived[suffix] = build(payload)
+        return validated.derived[suffix]
+
+    suffix = "#columnar" if location_capacity is None else f"#columnar-top{location_capacity}"
+    return await orders_cache.get(f"{_cache_key(settings.ORDERS_API_URL, params)}{suffix}", load)
+
+
+async def get_order_aggregate_snapshot(client: httpx.AsyncClient, params: dict | None = None) -> dict:
+    """`fetch_order_aggregate` through the shared snapshot cache."""
+    return await orders_cache.get(
+        _cache_key(_orders_url("aggregate"), params),
+        lambda: fetch_order_aggregate(client, params),
+    )
+
+
+async def get_rollup_aggregate(client: httpx.AsyncClient, params: dict | None = None) -> dict:
+    """Aggregate payload summed from the hourly rollups, cached like the others."""
+    async def load() -> dict:
+        return aggregate_from_rollups(await fetch_order_rollups(client, params))
+
+    return await orders_cache.get(_cache_key(_orders_url("rollups"), params), load)
+
+
+async def get_aggregate(client: httpx.AsyncClient, params: dict | None = None) -> dict:
+    """
+    Aggregate payload for the non-row calculation modes.
+
+    Running totals cover all orders ever, so time-ranged requests in
+    incremental mode are answered by the aggregate endpoint instead.
+    """
+    if settings.CALCULATION_MODE == "rollup":
+        return await get_rollup_aggregate(client, params)
+    if settings.CALCULATION_MODE == "incremental" and not params:
+        return await change_tracker.sync(lambda since: fetch_order_changes(client, since))
+    return await get_order_aggregate_snapshot(client, params)
+
+
+async def get_order_views_source(client: httpx.AsyncClient, params: dict | None = None) -> OrderBatch | dict:
+    """The snapshot the summary and breakdown views are computed from in this CALCULATION_MODE."""
+    if settings.CALCULATION_MODE != "rows":
+        return await get_aggregate(client, params)
+    return await get_order_batch(client, params)
+
+
+async def get_distribution_snapshot(
+    client: httpx.AsyncClient, params: dict | None = None, source: OrderBatch | dict | None = None
+) -> OrderDistribution:
+    """
+    Quantile sketches for the orders.
+
+    Incremental mode keeps them current from the change feed (`source`, if
+    given, has just been synced); every other mode sketches the cached
+    columnar snapshot, reusing `source` when it is that batch.
+    """
+    if settings.CALCULATION_MODE == "incremental" and not params:
+        if source is None:
+            await change_tracker.sync(lambda since: fetch_order_changes(client, since))
+        return change_tracker.aggregates.distribution
+    if not isinstance(source, OrderBatch):
+        source = await get_order_batch(client, params)
+    return source.distribution
+
+
+def summary_view(source: OrderBatch | dict) -> AnalyticsSummary:
+    if isinstance(source, OrderBatch):
+        return AnalyticsSummary(
+            total_orders=len(source),
+            average_delivery_time=round(source.average_delivery_time(), 2),
+            average_cost=round(source.average_cost(), 2),
+            top_locations=source.top_locations(),
+        )
     return AnalyticsSummary(
-        total_orders=total,
-        average_delivery_time=round(avg_delivery, 2),
-        average_cost=round(avg_cost_val, 2),
-        top_locations=top_locs,
+        total_orders=source.get("count", 0),
+        average_delivery_time=round(average_delivery_time_from_aggregate(source), 2),
+        average_cost=round(average_cost_from_aggregate(source), 2),
+        top_locations=top_locations_from_aggregate(source),
     )
 
 
+def status_breakdown_view(source: OrderBatch | dict) -> StatusBreakdown:
+    if isinstance(source, OrderBatch):
+        return StatusBreakdown(statuses=source.status_breakdown())
+    return StatusBreakdown(statuses=status_breakdown_from_aggregate(source))
+
+
+def location_breakdown_view(source: OrderBatch | dict, limit: int) -> LocationBreakdown:
+    if isinstance(source, OrderBatch):
+        return LocationBreakdown(
+            top_locations=source.top_locations_with_counts(top_n=limit),
+            max_error=source.location_hitters.max_error if source.approximate_locations else None,
+        )
+    return LocationBreakdown(top_locations=top_locations_with_counts_from_aggregate(source, top_n=limit))
+
+
+def _validate_quantiles(quantiles: list[float]) -> None:
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise HTTPException(status_code=422, detail="quantiles must be between 0 and 1")
+
+
+# Largest location breakdown a request can ask for; precomputed in full.
+MAX_LOCATION_LIMIT = 50
+
+
+async def precompute_views(client: httpx.AsyncClient) -> PrecomputedViews:
+    """
+    All unranged views from one snapshot, for `precomputer`.
+
+    The distribution is included when the mode has it without fetching
+    the rows again (rows and incremental).
+    """
+    started = time.monotonic()
+    source = await get_order_views_source(client)
+    distribution = None
+    if settings.CALCULATION_MODE in ("rows", "incremental"):
+        sketches = await get_distribution_snapshot(client, source=source)
+        distribution = DistributionReport.model_validate(sketches.report(DEFAULT_QUANTILES))
+    return PrecomputedViews(
+        # Age counts from the fetch, not from when the views were done.
+        computed_at=started,
+        summary=summary_view(source),
+        status_breakdown=status_breakdown_view(source),
+        location_breakdown=location_breakdown_view(source, MAX_LOCATION_LIMIT),
+        distribution=distribution,
+    )
+
+
+def _precomputed(time_range: dict) -> PrecomputedViews | None:
+    """Fresh precomputed views, if there are any and the request is unranged."""
+    if time_range or settings.PRECOMPUTE_INTERVAL <= 0:
+        return None
+    return precomputer.current(settings.PRECOMPUTE_MAX_AGE)
+
+
+def _report_age(response: Response, views: PrecomputedViews) -> None:
+    # Whole seconds since the views' snapshot was fetched, as caches do.
+    response.headers["Age"] = str(int(views.age))
+
+
+def _first_locations(breakdown: LocationBreakdown, limit: int) -> LocationBreakdown:
+    return breakdown.model_copy(update={"top_locations": breakdown.top_locations[:limit]})
+
+
+def _default_quantiles(quantiles: list[float]) -> bool:
+    return quantiles == list(DEFAULT_QUANTILES)
+
+
+@router.get("/summary", response_model=AnalyticsSummary)
+async def get_summary(
+    response: Response,
+    time_range: dict = Depends(time_range_params),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    if views := _precomputed(time_range):
+        _report_age(response, views)
+        return views.summary
+    return summary_view(await get_order_views_source(client, time_range))
+
+
 @router.get("/status-breakdown", response_model=StatusBreakdown)
-async def get_status_breakdown(client: httpx.AsyncClient = Depends(get_http_client)):
-    orders = await fetch_orders(client)
-    return StatusBreakdown(statuses=status_breakdown(orders))
+async def get_status_breakdown(
+    response: Response,
+    time_range: dict = Depends(time_range_params),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    if views := _precomputed(time_range):
+        _report_age(response, views)
+        return views.status_breakdown
+    return status_breakdown_view(await get_order_views_source(client, time_range))
 
 
-@router.get("/location-breakdown", response_model=LocationBreakdown)
+@router.get("/location-breakdown", response_model=LocationBreakdown, response_model_exclude_none=True)
 async def get_location_breakdown(
-    limit: int = Query(default=3, ge=1, le=50),
+    response: Response,
+    limit: int = Query(default=3, ge=1, le=MAX_LOCATION_LIMIT),
+    time_range: dict = Depends(time_range_params),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    if views := _precomputed(time_range):
+        _report_age(response, views)
+        return _first_locations(views.location_breakdown, limit)
+    return location_breakdown_view(await get_order_views_source(client, time_range), limit)
+
+
+@router.get("/distribution", response_model=DistributionReport)
+async def get_distribution(
+    response: Response,
+    quantiles: list[float] = Query(default=list(DEFAULT_QUANTILES), max_length=20),
+    time_range: dict = Depends(time_range_params),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """
+    delivery_time and cost quantiles overall, per location and per status.
+
+    Repeat `quantiles` for several (`?quantiles=0.5&quantiles=0.99`).
+    Incremental mode keeps the sketches current from the change feed;
+    every other mode sketches the cached columnar snapshot.
+    """
+    _validate_quantiles(quantiles)
+    views = _precomputed(time_range)
+    if views is not None and views.distribution is not None and _default_quantiles(quantiles):
+        _report_age(response, views)
+        return views.distribution
+    distribution = await get_distribution_snapshot(client, time_range)
+    return distribution.report(quantiles)
+
+
+@router.get("/dashboard", response_model=DashboardReport, response_model_exclude_none=True)
+async def get_dashboard(
+    response: Response,
+    sections: list[DashboardSection] = Query(default=list(DEFAULT_DASHBOARD_SECTIONS)),
+    limit: int = Query(default=3, ge=1, le=MAX_LOCATION_LIMIT),
+    quantiles: list[float] = Query(default=list(DEFAULT_QUANTILES), max_length=20),
+    time_range: dict = Depends(time_range_params),
     client: httpx.AsyncClient = Depends(get_http_client),
 ):
-    orders = await fetch_orders(client)
-    return LocationBreakdown(top_locations=top_locations_with_counts(orders, top_n=limit))
+    """
+    Several views in one response, for rendering a dashboard.
+
+    Repeat `sections` to pick them (summary, status_breakdown,
+    location_breakdown, distribution; all but distribution by default).
+    `limit` and `quantiles` mean what they do on the single-view routes.
+    Every section is computed from one snapshot, fetched once, so the
+    sections agree with each other and cost one rate limit hit. The only
+    second fetch is the order rows `distribution` needs in aggregate and
+    rollup modes. Precomputed views are used when they cover every section.
+    """
+    _validate_quantiles(quantiles)
+    wanted = set(sections)
+    views = _precomputed(time_range)
+    if views is not None and (
+        "distribution" not in wanted or (views.distribution is not None and _default_quantiles(quantiles))
+    ):
+        _report_age(response, views)
+        return DashboardReport(
+            summary=views.summary if "summary" in wanted else None,
+            status_breakdown=views.status_breakdown if "status_breakdown" in wanted else None,
+            location_breakdown=(
+                _first_locations(views.location_breakdown, limit) if "location_breakdown" in wanted else None
+            ),
+            distribution=views.distribution if "distribution" in wanted else None,
+        )
+
+    source = distribution = None
+    if wanted - {"distribution"}:
+        source = await get_order_views_source(client, time_range)
+    if "distribution" in wanted:
+        distribution = await get_distribution_snapshot(client, time_range, source)
+
+    return DashboardReport(
+        summary=summary_view(source) if "summary" in wanted else None,
+        status_breakdown=status_breakdown_view(source) if "status_breakdown" in wanted else None,
+        location_breakdown=location_breakdown_view(source, limit) if "location_breakdown" in wanted else None,
+        distribution=distribution.report(quantiles) if distribution is not None else None,
+    )
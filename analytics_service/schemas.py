@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 class AnalyticsSummary(BaseModel):
@@ -14,7 +16,38 @@ class StatusBreakdown(BaseModel):
 class LocationCount(BaseModel):
     location: str
     count: int
+    # Approximate mode only: count may exceed the true count by up to this.
+    error: int | None = None
 
 
 class LocationBreakdown(BaseModel):
     top_locations: list[LocationCount]
+    # Approximate mode only: no location left out of the summary occurred
+    # more often than this.
+    max_error: int | None = None
+
+
+class GroupDistribution(BaseModel):
+    count: int
+    delivery_time: dict[str, float | None]
+    cost: dict[str, float | None]
+
+
+class DistributionReport(BaseModel):
+    quantiles: list[float]
+    relative_accuracy: float
+    overall: GroupDistribution
+    by_location: dict[str, GroupDistribution]
+    by_status: dict[str, GroupDistribution]
+
+
+DashboardSection = Literal["summary", "status_breakdown", "location_breakdown", "distribution"]
+DEFAULT_DASHBOARD_SECTIONS: tuple[DashboardSection, ...] = ("summary", "status_breakdown", "location_breakdown")
+
+
+class DashboardReport(BaseModel):
+    # Sections that were not asked for are left out of the response.
+    summary: AnalyticsSummary | None = None
+    status_breakdown: StatusBreakdown | None = None
+    location_breakdown: LocationBreakdown | None = None
+    distribution: DistributionReport | None = None
@@ -0,0 +1,100 @@
+"""
+Bytes and latency tradeoff of compressing GET /orders bodies.
+
+    python -m benchmarks.compression --rows 1000,10000,100000 --bandwidth-mbps 100,1000
+
+Bodies are the exact bytes GET /orders sends, built from the synthetic
+orders of benchmarks.suite. Each encoding and level is timed with the
+compressors orders_service uses, and decoding with the same libraries
+httpx uses in analytics. Transfer time is modelled from the compressed size
+at each bandwidth, so "total" is compress + transfer + decode per request.
+zstd and br rows only appear when zstandard / brotli are installed.
+"""
+import argparse
+import statistics
+import time
+import zlib
+from collections.abc import Callable
+
+from benchmarks.suite import synthetic_orders
+from orders_service.compression import COMPRESSORS, brotli, zstandard
+from orders_service.fast_json import ORDER_READ_FIELDS, encode_order_rows
+
+LEVELS = {"gzip": (1, 6, 9), "zstd": (1, 3, 10), "br": (1, 4, 9)}
+
+
+def _decoder(encoding: str) -> Callable[[bytes], bytes]:
+    if encoding == "gzip":
+        return lambda data: zlib.decompress(data, 31)
+    if encoding == "zstd":
+        return lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if encoding == "br":
+        return brotli.decompress
+    return lambda data: data
+
+
+def _median_seconds(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def measure(body: bytes, repeat: int) -> list[dict]:
+    """Size and codec timings of `body` for identity and every encoding/level."""
+    results = [{"encoding": "identity", "level": None, "bytes": len(body), "compress_s": 0.0, "decode_s": 0.0}]
+    for encoding in COMPRESSORS:
+        decode = _decoder(encoding)
+        for level in LEVELS[encoding]:
+            compressed = COMPRESSORS[encoding](level).compress(body, final=True)
+            assert decode(compressed) == body
+            results.append(
+                {
+                    "encoding": encoding,
+                    "level": level,
+                    "bytes": len(compressed),
+                    "compress_s": _median_seconds(
+                        lambda: COMPRESSORS[encoding](level).compress(body, final=True), repeat
+                    ),
+                    "decode_s": _median_seconds(lambda: decode(compressed), repeat),
+                }
+            )
+    return results
+
+
+def orders_body(rows: int) -> bytes:
+    orders = synthetic_orders(rows)
+    return encode_order_rows([tuple(order[field] for field in ORDER_READ_FIELDS) for order in orders])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma-separated row counts")
+    parser.add_argument("--bandwidth-mbps", default="100,1000", help="comma-separated link speeds to model")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    bandwidths = [float(value) for value in args.bandwidth_mbps.split(",")]
+
+    for rows in (int(value) for value in args.rows.split(",")):
+        body = orders_body(rows)
+        print(f"\n{rows:,} orders, {len(body):,} bytes uncompressed")
+        print(
+            f"{'encoding':<10} {'level':>5} {'bytes':>12} {'ratio':>7} {'compress ms':>12} {'decode ms':>10}"
+            + "".join(f" {f'total ms @{bandwidth:g}Mbps':>20}" for bandwidth in bandwidths)
+        )
+        for row in measure(body, args.repeat):
+            totals = [
+                (row["compress_s"] + row["bytes"] * 8 / (bandwidth * 1e6) + row["decode_s"]) * 1000
+                for bandwidth in bandwidths
+            ]
+            print(
+                f"{row['encoding']:<10} {row['level'] if row['level'] is not None else '-':>5} "
+                f"{row['bytes']:>12,} {len(body) / row['bytes']:>6.1f}x {row['compress_s'] * 1000:>12.2f} "
+                f"{row['decode_s'] * 1000:>10.2f}" + "".join(f" {total:>20.2f}" for total in totals)
+            )
+
+
+if __name__ == "__main__":
+    main()
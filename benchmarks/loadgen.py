@@ -0,0 +1,448 @@
+"""
+In-process load test of analytics_service and orders_service.
+
+    python -m benchmarks.loadgen --rows 20000 --requests 2000 --concurrency 32
+    python -m benchmarks.loadgen --duration 30 --mode aggregate --cache-ttl 5
+    python -m benchmarks.loadgen --rate-limit 60 --upstream-error-rate 0.2 --output run.json
+
+Both apps run in this process behind httpx.ASGITransport: analytics talks to
+orders through a transport that can add latency and synthetic 503s, and
+orders reads a temporary SQLite file seeded with the bulk generators from
+orders_service.seed_db (or --database-url). Workers are asyncio tasks, so
+--concurrency is the number of requests in flight, not OS threads; sync
+orders routes still run on the threadpool as they do under uvicorn.
+
+The mix is a comma-separated list of service:path=weight entries. The report
+gives p50/p95/p99 latency, throughput and status counts per endpoint, so 429s
+from the rate limiter, 502s from the upstream fetch and 503s from an open
+circuit breaker show up as their own error rates. The rate limiter is off
+unless --rate-limit is given.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import analytics_service.main as analytics_main
+import analytics_service.rate_limiter as rate_limiter
+import analytics_service.routers.analytics as analytics_router
+import orders_service.main as orders_main
+from analytics_service.cache import SnapshotCache, ValidatorCache
+from analytics_service.core.config import settings as analytics_settings
+from analytics_service.core.http_client import get_http_client
+from analytics_service.resilience import CircuitBreaker
+from orders_service.core.config import settings as orders_settings
+from orders_service.db import Base, get_async_db, to_async_url
+from orders_service.seed_db import bulk_seed_orders
+
+API_KEY = "load-test-key"
+ORDERS_BASE_URL = "http://orders.load"
+DEFAULT_MIX = ",".join(
+    [
+        "analytics:/analytics/summary=4",
+        "analytics:/analytics/status-breakdown=2",
+        "analytics:/analytics/location-breakdown=2",
+        "analytics:/analytics/distribution=1",
+        "orders:/orders?limit=100=2",
+        "orders:/orders/aggregate=1",
+    ]
+)
+SERVICES = ("analytics", "orders")
+
+
+@dataclass(frozen=True)
+class Target:
+    service: str
+    path: str
+    weight: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.service} {self.path}"
+
+
+def parse_mix(spec: str) -> list[Target]:
+    """
+    Parse "service:path=weight,...".
+
+    The weight defaults to 1, except after a query string, where the last
+    "=..." is always read as the weight.
+    """
+    targets = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        service, _, rest = entry.partition(":")
+        if service not in SERVICES or not rest.startswith("/"):
+            raise ValueError(f"mix entries look like analytics:/analytics/summary=3, got: {entry}")
+        path, _, weight = rest.rpartition("=")
+        try:
+            weight = float(weight)
+        except ValueError:
+            path, weight = rest, 1.0
+        if weight <= 0:
+            raise ValueError(f"mix weight must be positive: {entry}")
+        targets.append(Target(service, path, weight))
+    if not targets:
+        raise ValueError("mix is empty")
+    return targets
+
+
+class FaultInjectingTransport(httpx.AsyncBaseTransport):
+    """Adds latency to, and fails a fraction of, requests from analytics to orders."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, error_rate: float, latency: float, rng: random.Random):
+        self.transport = transport
+        self.error_rate = error_rate
+        self.latency = latency
+        self.rng = rng
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return httpx.Response(503, request=request)
+        return await self.transport.handle_async_request(request)
+
+
+def latency_percentiles(seconds: list[float]) -> dict:
+    """p50/p95/p99/max in milliseconds."""
+    if not seconds:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    p50, p95, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 95, 99]).tolist()
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": max(seconds) * 1000}
+
+
+def summarize(samples: dict[str, list[tuple[float, int]]], elapsed: float) -> dict:
+    """Per-endpoint and overall latency, throughput and status counts."""
+
+    def section(rows: list[tuple[float, int]]) -> dict:
+        statuses = Counter(status for _, status in rows)
+        errors = sum(count for status, count in statuses.items() if status >= 400)
+        return {
+            "requests": len(rows),
+            "throughput_rps": len(rows) / elapsed if elapsed else None,
+            **latency_percentiles([seconds for seconds, _ in rows]),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "error_rate": errors / len(rows) if rows else 0.0,
+            "rate_limited_rate": statuses[429] / len(rows) if rows else 0.0,
+            "upstream_error_rate": statuses[502] / len(rows) if rows else 0.0,
+            "circuit_open_rate": statuses[503] / len(rows) if rows else 0.0,
+        }
+
+    return {
+        "elapsed_seconds": elapsed,
+        "endpoints": {name: section(rows) for name, rows in sorted(samples.items())},
+        "total": section([row for rows in samples.values() for row in rows]),
+    }
+
+
+async def _drive(
+    clients: dict[str, httpx.AsyncClient],
+    targets: list[Target],
+    concurrency: int,
+    requests: int | None,
+    duration: float | None,
+    rng: random.Random,
+) -> tuple[dict[str, list[tuple[float, int]]], float]:
+    samples: dict[str, list[tuple[float, int]]] = {target.name: [] for target in targets}
+    weights = [target.weight for target in targets]
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker():
+        nonlocal issued
+        while True:
+            if requests is not None and issued >= requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            issued += 1
+            target = rng.choices(targets, weights)[0]
+            sent = time.perf_counter()
+            response = await clients[target.service].get(target.path)
+            samples[target.name].append((time.perf_counter() - sent, response.status_code))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+@contextlib.contextmanager
+def _patched(obj, **values):
+    previous = {name: getattr(obj, name) for name in values}
+    for name, value in values.items():
+        setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(obj, name, value)
+
+
+@contextlib.contextmanager
+def _quiet_logger(name: str):
+    # One warning per 429 or retry would flood the terminal and skew timings.
+    logger = logging.getLogger(name)
+    previous = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        logger.setLevel(previous)
+
+
+@contextlib.contextmanager
+def _orders_database(database_url: str | None, rows: int, seed: int):
+    """Yield a database URL: `database_url` as is, or a freshly seeded SQLite file."""
+    if database_url:
+        yield database_url
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'orders.sqlite3')}"
+        engine = create_engine(url)
+        try:
+            Base.metadata.create_all(bind=engine)
+            with contextlib.redirect_stdout(sys.stderr):
+                bulk_seed_orders(rows, seed=seed, bind=engine)
+        finally:
+            engine.dispose()
+        yield url
+
+
+def run_load_test(
+    rows: int = 10_000,
+    requests: int | None = 1_000,
+    duration: float | None = None,
+    concurrency: int = 16,
+    mix: str = DEFAULT_MIX,
+    mode: str | None = None,
+    rate_limit: int | None = None,
+    upstream_error_rate: float = 0.0,
+    upstream_latency: float = 0.0,
+    max_retries: int | None = None,
+    backoff: float | None = None,
+    cache_ttl: float | None = None,
+    circuit_threshold: int | None = None,
+    seed: int = 1,
+    database_url: str | None = None,
+) -> dict:
+    """
+    Run one load test and return its summary.
+
+    Stops after `requests` requests or `duration` seconds, whichever is given
+    (both: whichever comes first). Settings, dependency overrides and module
+    state touched here are restored afterwards.
+    """
+    if requests is None and duration is None:
+        raise ValueError("give requests, duration or both")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    targets = parse_mix(mix)
+    rng = random.Random(seed)
+
+    with contextlib.ExitStack() as stack:
+        url = stack.enter_context(_orders_database(database_url, rows, seed))
+        engine = create_engine(url)
+        stack.callback(engine.dispose)
+        session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+        def override_get_db():
+            db = session_local()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        overrides = {orders_main.get_db: override_get_db}
+        if orders_settings.ASYNC_DB:
+            async_engine = create_async_engine(to_async_url(url))
+            stack.callback(lambda: asyncio.run(async_engine.dispose()))
+            async_session_local = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+            async def override_get_async_db():
+                async with async_session_local() as db:
+                    yield db
+
+            overrides[get_async_db] = override_get_async_db
+
+        orders_main.app.dependency_overrides.update(overrides)
+        stack.callback(orders_main.app.dependency_overrides.clear)
+
+        stack.enter_context(_patched(orders_settings, ORDERS_API_KEY=API_KEY))
+        analytics_values = {"ORDERS_API_KEY": API_KEY, "ORDERS_API_URL": f"{ORDERS_BASE_URL}/orders"}
+        if mode is not None:
+            analytics_values["CALCULATION_MODE"] = mode
+        if max_retries is not None:
+            analytics_values["MAX_RETRIES"] = max_retries
+        if backoff is not None:
+            analytics_values["INITIAL_BACKOFF"] = backoff
+        if circuit_threshold is not None:
+            analytics_values["CIRCUIT_FAILURE_THRESHOLD"] = circuit_threshold
+        stack.enter_context(_patched(analytics_settings, **analytics_values))
+
+        cache = SnapshotCache(
+            ttl=analytics_settings.ORDERS_CACHE_TTL if cache_ttl is None else cache_ttl,
+            stale_ttl=analytics_settings.ORDERS_CACHE_STALE_TTL,
+            max_entries=analytics_settings.ORDERS_CACHE_MAX_ENTRIES,
+        )
+        breaker = CircuitBreaker(
+            failure_threshold=analytics_settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=analytics_settings.CIRCUIT_RESET_TIMEOUT,
+        )
+        stack.enter_context(
+            _patched(
+                analytics_router,
+                orders_cache=cache,
+                upstream_validators=ValidatorCache(max_entries=analytics_settings.ORDERS_CACHE_MAX_ENTRIES),
+                orders_breaker=breaker,
+                upstream_latency={},
+            )
+        )
+        analytics_router.change_tracker.reset()
+        stack.callback(analytics_router.change_tracker.reset)
+
+        stack.enter_context(
+            _patched(rate_limiter, REQUEST_LIMIT=rate_limit if rate_limit is not None else sys.maxsize, _backend=None)
+        )
+        rate_limiter._rate_limit_store.clear()
+        stack.callback(rate_limiter._rate_limit_store.clear)
+        stack.enter_context(_quiet_logger("analytics"))
+
+        async def run() -> tuple[dict, float]:
+            headers = {"X-API-Key": API_KEY}
+            upstream = httpx.AsyncClient(
+                transport=FaultInjectingTransport(
+                    httpx.ASGITransport(app=orders_main.app),
+                    error_rate=upstream_error_rate,
+                    latency=upstream_latency,
+                    rng=random.Random(seed + 1),
+                ),
+                base_url=ORDERS_BASE_URL,
+                headers=headers,
+            )
+
+            async def override_http_client():
+                return upstream
+
+            analytics_main.app.dependency_overrides[get_http_client] = override_http_client
+            clients = {
+                "analytics": httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=analytics_main.app, raise_app_exceptions=False),
+                    base_url="http://analytics.load",
+                    headers=headers,
+                ),
+                "orders": httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=orders_main.app, raise_app_exceptions=False),
+                    base_url=ORDERS_BASE_URL,
+                    headers=headers,
+                ),
+            }
+            try:
+                return await _drive(clients, targets, concurrency, requests, duration, rng)
+            finally:
+                analytics_main.app.dependency_overrides.clear()
+                for client in (upstream, *clients.values()):
+                    await client.aclose()
+
+        samples, elapsed = asyncio.run(run())
+
+    report = summarize(samples, elapsed)
+    report["config"] = {
+        "rows": None if database_url else rows,
+        "concurrency": concurrency,
+        "mix": [target.name + f"={target.weight:g}" for target in targets],
+        "mode": mode or analytics_settings.CALCULATION_MODE,
+        "rate_limit": rate_limit,
+        "upstream_error_rate": upstream_error_rate,
+        "upstream_latency": upstream_latency,
+        "cache_ttl": cache.ttl,
+        "circuit_threshold": breaker.failure_threshold,
+        "seed": seed,
+    }
+    report["cache"] = dict(cache.counters)
+    report["circuit"] = {"state": breaker.state, "failures": breaker.failures}
+    return report
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"{'endpoint':<44} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'errors':>7} {'429':>6} {'502':>6} {'503':>6}",
+        file=sys.stderr,
+    )
+    sections = [*report["endpoints"].items(), ("total", report["total"])]
+    for name, row in sections:
+        if not row["requests"]:
+            print(f"{name:<44} {0:>8}", file=sys.stderr)
+            continue
+        print(
+            f"{name:<44} {row['requests']:>8} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['error_rate']:>7.1%} "
+            f"{row['rate_limited_rate']:>6.1%} {row['upstream_error_rate']:>6.1%} {row['circuit_open_rate']:>6.1%}",
+            file=sys.stderr,
+        )
+    print(f"cache: {report['cache']}", file=sys.stderr)
+    print(f"circuit: {report['circuit']}", file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="orders to seed into the temporary SQLite file")
+    parser.add_argument("--database-url", help="use this orders database as is instead of seeding SQLite")
+    parser.add_argument("--requests", type=int, help="total requests (default 1000 unless --duration is given)")
+    parser.add_argument("--duration", type=float, help="seconds to run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="service:path=weight,... (service: analytics or orders)")
+    parser.add_argument("--mode", choices=["rows", "aggregate", "incremental", "rollup"], help="CALCULATION_MODE")
+    parser.add_argument("--rate-limit", type=int, help="requests per key per window (default: no limit)")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="fraction of orders calls failing with 503")
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="seconds added to each orders call")
+    parser.add_argument("--max-retries", type=int, help="override MAX_RETRIES")
+    parser.add_argument("--backoff", type=float, help="override INITIAL_BACKOFF")
+    parser.add_argument("--cache-ttl", type=float, help="override ORDERS_CACHE_TTL")
+    parser.add_argument("--circuit-threshold", type=int, help="override CIRCUIT_FAILURE_THRESHOLD (0 disables)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        rows=args.rows,
+        requests=args.requests if args.requests is not None or args.duration else 1_000,
+        duration=args.duration,
+        concurrency=args.concurrency,
+        mix=args.mix,
+        mode=args.mode,
+        rate_limit=args.rate_limit,
+        upstream_error_rate=args.upstream_error_rate,
+        upstream_latency=args.upstream_latency,
+        max_retries=args.max_retries,
+        backoff=args.backoff,
+        cache_ttl=args.cache_ttl,
+        circuit_threshold=args.circuit_threshold,
+        seed=args.seed,
+        database_url=args.database_url,
+    )
+    _print_report(report)
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(encoded + "\n")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
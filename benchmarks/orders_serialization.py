@@ -0,0 +1,79 @@
+"""
+Compare the default and FAST_ORDERS_JSON paths of GET /orders.
+
+    python -m benchmarks.orders_serialization --rows 50000 --repeat 5
+
+Runs the orders app in-process against an in-memory SQLite database seeded
+with the bulk generators from orders_service.seed_db.
+"""
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import orders_service.main as orders_main
+from orders_service.core.config import settings as orders_settings
+from orders_service.db import Base
+from orders_service.seed_db import bulk_seed_orders
+
+
+def _build_client(rows: int) -> TestClient:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    bulk_seed_orders(rows, chunk_size=50_000, seed=1, bind=engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    orders_main.app.dependency_overrides[orders_main.get_db] = override_get_db
+    orders_settings.ORDERS_API_KEY = "bench-key"
+    return TestClient(orders_main.app, headers={"X-API-Key": "bench-key"})
+
+
+def _time_request(client: TestClient, repeat: int) -> tuple[float, int]:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get("/orders")
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+        size = len(response.content)
+    return statistics.median(timings), size
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    client = _build_client(args.rows)
+    results = {}
+    for fast in (False, True):
+        orders_settings.FAST_ORDERS_JSON = fast
+        results[fast] = _time_request(client, args.repeat)
+    orders_main.app.dependency_overrides.clear()
+
+    print(f"GET /orders, {args.rows} rows, median of {args.repeat}")
+    for fast, (seconds, size) in results.items():
+        label = "fast (column rows + orjson)" if fast else "default (ORM + OrderRead)"
+        print(f"  {label:<30} {seconds * 1000:9.1f} ms  {args.rows / seconds:12,.0f} rows/s  {size:,} bytes")
+    print(f"  speedup: {results[False][0] / results[True][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Micro-benchmarks for analytics calculations and orders serialization.
+
+    python -m benchmarks.suite run --sizes 1000,100000 --output baseline.json
+    python -m benchmarks.suite run --sizes 1000,100000 --compare baseline.json
+    python -m benchmarks.suite compare baseline.json current.json --threshold 0.15
+
+Order sets are generated deterministically with the bulk generators from
+orders_service.seed_db, so results from the same seed and size are
+comparable across runs. Each case records the median wall time, rows per
+second and peak traced memory. `compare` exits with status 1 when a case is
+slower (or uses more memory) than the baseline by more than the threshold.
+Sizes up to 10M rows are supported, but the rows are held in memory as
+dicts, so the largest sizes need several GB of RAM.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+import orjson
+from pydantic import TypeAdapter
+
+from analytics_service import calculations
+from analytics_service.columnar import OrderBatch
+from analytics_service.core.config import settings as analytics_settings
+from analytics_service.routers.analytics import fetch_order_payload, fetch_orders
+from orders_service.columnar_wire import COLUMNAR_MEDIA_TYPE, encode_order_columns
+from orders_service.fast_json import ORDER_READ_FIELDS, encode_order_rows
+from orders_service.models import Order
+from orders_service.schemas import OrderRead
+from orders_service.seed_db import generate_order_columns
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+MAX_SIZE = 10_000_000
+# Fixed so generated created_at values (and everything else) are reproducible.
+GENERATED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+_order_list_adapter = TypeAdapter(list[OrderRead])
+
+
+def synthetic_orders(n: int, seed: int = 1) -> list[dict]:
+    """`n` orders in the GET /orders wire shape, identical for the same seed."""
+    columns = generate_order_columns(n, np.random.default_rng(seed), now=GENERATED_AT)
+    return [
+        {
+            "id": index + 1,
+            "item_name": item_name,
+            "location": location,
+            "cost": cost,
+            "delivery_time": delivery_time,
+            "status": status,
+        }
+        for index, (item_name, location, cost, delivery_time, status) in enumerate(
+            zip(
+                columns["item_name"].tolist(),
+                columns["location"].tolist(),
+                columns["cost"].tolist(),
+                columns["delivery_time"].tolist(),
+                columns["status"].tolist(),
+            )
+        )
+    ]
+
+
+def _fetch_decode(
+    fetch: Callable[[httpx.AsyncClient], Awaitable[object]],
+    payload: bytes,
+    media_type: str = "application/json",
+) -> Callable[[], object]:
+    """`fetch` against a canned response, so only httpx and decoding are timed."""
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=payload, headers={"Content-Type": media_type})
+        )
+    )
+
+    def run():
+        previous_url = analytics_settings.ORDERS_API_URL
+        analytics_settings.ORDERS_API_URL = "http://orders.bench/orders"
+        try:
+            return asyncio.run(fetch(client))
+        finally:
+            analytics_settings.ORDERS_API_URL = previous_url
+
+    return run
+
+
+async def _fetch_batch(client: httpx.AsyncClient) -> OrderBatch:
+    payload = await fetch_order_payload(client)
+    if isinstance(payload, dict):
+        return OrderBatch.from_columns(payload)
+    return OrderBatch.from_orders(payload)
+
+
+def build_cases(orders: list[dict]) -> dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable, each timing one function on `orders`."""
+    batch = OrderBatch.from_orders(orders)
+    aggregate = {
+        "count": len(orders),
+        "by_status": batch.status_breakdown(),
+        "by_location": {
+            row["location"]: row["count"]
+            for row in batch.top_locations_with_counts(top_n=len(batch.locations))
+        },
+    }
+
+    def fresh_batch() -> OrderBatch:
+        # Same columns without the cached rankings and sketches.
+        return OrderBatch(
+            batch.cost,
+            batch.delivery_time,
+            batch.location_codes,
+            batch.locations,
+            batch.status_codes,
+            batch.statuses,
+        )
+
+    orm_rows = [Order(**order) for order in orders]
+    column_rows = [tuple(order[field] for field in ORDER_READ_FIELDS) for order in orders]
+    payload = orjson.dumps(orders)
+
+    def running_aggregates():
+        running = calculations.RunningAggregates()
+        for order in orders:
+            running.upsert(order)
+        return running.to_aggregate()
+
+    return {
+        # Row-wise reference functions.
+        "calculations.average_delivery_time": lambda: calculations.average_delivery_time(orders),
+        "calculations.average_cost": lambda: calculations.average_cost(orders),
+        "calculations.top_locations": lambda: calculations.top_locations(orders),
+        "calculations.status_breakdown": lambda: calculations.status_breakdown(orders),
+        "calculations.top_locations_with_counts": lambda: calculations.top_locations_with_counts(orders),
+        "calculations.top_locations_with_counts_approximate": (
+            lambda: calculations.top_locations_with_counts_approximate(orders)
+        ),
+        # Aggregate-mode functions work on the per-location payload, not rows.
+        "calculations.top_locations_with_counts_from_aggregate": (
+            lambda: calculations.top_locations_with_counts_from_aggregate(aggregate)
+        ),
+        "calculations.RunningAggregates.upsert": running_aggregates,
+        # Columnar path used by rows mode.
+        "columnar.OrderBatch.from_orders": lambda: OrderBatch.from_orders(orders),
+        "columnar.OrderBatch.summary": lambda: (
+            (fresh := fresh_batch()).average_delivery_time(),
+            fresh.average_cost(),
+            fresh.status_breakdown(),
+            fresh.top_locations_with_counts(),
+        ),
+        "columnar.OrderBatch.distribution": lambda: fresh_batch().distribution.report(),
+        # Orders serialization, default (OrderRead) and FAST_ORDERS_JSON paths.
+        "orders.OrderRead.serialize": lambda: _order_list_adapter.dump_json(
+            _order_list_adapter.validate_python(orm_rows, from_attributes=True)
+        ),
+        "orders.encode_order_rows": lambda: encode_order_rows(column_rows),
+        "orders.encode_order_columns": lambda: encode_order_columns(column_rows),
+        # Upstream decoding in analytics, and decoding into the rows-mode batch.
+        "analytics.fetch_orders.decode": _fetch_decode(fetch_orders, payload),
+        "analytics.fetch_order_batch.json": _fetch_decode(_fetch_batch, payload),
+        "analytics.fetch_order_batch.columnar": _fetch_decode(
+            _fetch_batch, encode_order_columns(column_rows), COLUMNAR_MEDIA_TYPE
+        ),
+    }
+
+
+def _time_case(func: Callable[[], object], repeat: int) -> dict:
+    func()  # warm caches and lazily built state
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    # A separate traced run, since tracemalloc slows the code it watches.
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": statistics.median(timings), "peak_bytes": peak}
+
+
+def run_suite(sizes, repeat: int = 5, seed: int = 1, cases: list[str] | None = None) -> dict:
+    """Run every case (or those named in `cases`) at every size."""
+    results = {}
+    for size in sizes:
+        if not 0 < size <= MAX_SIZE:
+            raise ValueError(f"size must be between 1 and {MAX_SIZE}: {size}")
+        orders = synthetic_orders(size, seed)
+        for name, func in build_cases(orders).items():
+            if cases and name not in cases:
+                continue
+            result = _time_case(func, repeat)
+            result["rows"] = size
+            result["rows_per_second"] = size / result["seconds"] if result["seconds"] else None
+            results[f"{name}@{size}"] = result
+            print(
+                f"{name:<58} {size:>10,} rows {result['seconds'] * 1000:10.2f} ms "
+                f"{result['peak_bytes'] / 2**20:9.1f} MiB",
+                file=sys.stderr,
+            )
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10, min_seconds: float = 0.001) -> list[dict]:
+    """
+    Cases present in both runs with their time and memory ratios.
+
+    A case regresses when either ratio exceeds 1 + threshold. Timings under
+    `min_seconds` in both runs are scheduler noise and never regress on time.
+    """
+    rows = []
+    for key, now in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        time_ratio = now["seconds"] / before["seconds"] if before["seconds"] else 1.0
+        memory_ratio = now["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else 1.0
+        timed = max(now["seconds"], before["seconds"]) >= min_seconds
+        rows.append(
+            {
+                "case": key,
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regressed": (timed and time_ratio > 1 + threshold) or memory_ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def _print_comparison(rows: list[dict], threshold: float) -> bool:
+    regressed = False
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else "ok"
+        print(f"{row['case']:<70} time x{row['time_ratio']:5.2f}  memory x{row['memory_ratio']:5.2f}  {flag}")
+        regressed = regressed or row["regressed"]
+    print(f"{sum(row['regressed'] for row in rows)} of {len(rows)} cases regressed beyond {threshold:.0%}")
+    return regressed
+
+
+def _load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and write JSON results")
+    run.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated row counts")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--case", action="append", dest="cases", help="only run this case (repeatable)")
+    run.add_argument("--output", help="write results here (default: stdout)")
+    run.add_argument("--compare", metavar="BASELINE", help="compare against a baseline after running")
+    run.add_argument("--threshold", type=float, default=0.10)
+    run.add_argument("--min-seconds", type=float, default=0.001, help="ignore time changes below this")
+
+    diff = commands.add_parser("compare", help="compare two result files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.10)
+    diff.add_argument("--min-seconds", type=float, default=0.001, help="ignore time changes below this")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        rows = compare(_load(args.baseline), _load(args.current), args.threshold, args.min_seconds)
+        return 1 if _print_comparison(rows, args.threshold) else 0
+
+    results = run_suite(
+        [int(size) for size in args.sizes.split(",")],
+        repeat=args.repeat,
+        seed=args.seed,
+        cases=args.cases,
+    )
+    encoded = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(encoded + "\n")
+    elif not args.compare:
+        print(encoded)
+
+    if args.compare:
+        rows = compare(_load(args.compare), results, args.threshold, args.min_seconds)
+        return 1 if _print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
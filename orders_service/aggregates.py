@@ -0,0 +1,61 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from orders_service.models import Order
+
+
+def _field_stats(avg, min_, max_) -> dict:
+    return {
+        "avg": float(avg) if avg is not None else None,
+        "min": float(min_) if min_ is not None else None,
+        "max": float(max_) if max_ is not None else None,
+    }
+
+
+def _group_counts(db: Session, column, filters: list) -> dict[str, int]:
+    rows = (
+        db.query(column, func.count(Order.id))
+        .filter(column.isnot(None), column != "", *filters)
+        .group_by(column)
+        .all()
+    )
+    return {key: count for key, count in rows}
+
+
+def compute_order_aggregate(db: Session, filters: list | None = None) -> dict:
+    """
+    Aggregate the orders table in SQL.
+
+    Returns the row count, avg/min/max of cost and delivery_time and
+    counts grouped by status and by location, over the rows matching
+    `filters` (e.g. created_at_filters).
+    """
+    filters = filters or []
+    totals = db.query(
+        func.count(Order.id),
+        func.avg(Order.cost),
+        func.min(Order.cost),
+        func.max(Order.cost),
+        func.avg(Order.delivery_time),
+        func.min(Order.delivery_time),
+        func.max(Order.delivery_time),
+    ).filter(*filters).one()
+
+    return {
+        "count": totals[0],
+        "cost": _field_stats(*totals[1:4]),
+        "delivery_time": _field_stats(*totals[4:7]),
+        "by_status": _group_counts(db, Order.status, filters),
+        "by_location": _group_counts(db, Order.location, filters),
+    }
+
+
+def compute_id_bounds(db: Session, filters: list | None = None) -> dict:
+    """
+    Smallest and largest order id matching `filters`, both None when none do.
+
+    Without filters this is two primary key index lookups, cheap enough for
+    clients to call before splitting a full read into id ranges.
+    """
+    min_id, max_id = db.query(func.min(Order.id), func.max(Order.id)).filter(*(filters or [])).one()
+    return {"min_id": min_id, "max_id": max_id}
@@ -0,0 +1,200 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from orders_service.db import get_async_db
+from orders_service.models import Order
+from orders_service.aggregates import compute_id_bounds, compute_order_aggregate
+from orders_service.changes import current_table_state, read_changes
+from orders_service.conditional import is_not_modified, not_modified_response, validator_headers
+from orders_service.rollups import read_rollups
+from orders_service.filters import created_range, rollup_hour_range
+from orders_service.schemas import (
+    MAX_PAGE_SIZE,
+    NDJSON_MEDIA_TYPE,
+    OrderRead,
+    OrderCreate,
+    OrderUpdate,
+    OrderAggregate,
+    OrderChangeFeed,
+    OrderIdBounds,
+    OrderRollupRead,
+    BulkCreateResult,
+    BULK_OPENAPI,
+)
+from orders_service.bulk import parse_bulk_body, read_bulk_body, write_orders_bulk
+from orders_service.fast_json import ORDER_READ_COLUMNS, encode_order_rows, encode_order_rows_ndjson
+from orders_service.columnar_wire import ARROW_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, encode_columnar, negotiate_columnar
+from orders_service.core.config import settings
+
+# Same contract as the sync routes in orders_service.main, served from the
+# event loop on an asyncio engine. Enabled with ASYNC_DB=true.
+router = APIRouter()
+
+
+async def _stream_orders(db: AsyncSession, statement, batch_size: int):
+    """Yield NDJSON chunks while reading rows through a server-side cursor."""
+    result = await db.stream_scalars(statement.execution_options(yield_per=batch_size))
+    async for orders in result.partitions():
+        yield "".join(OrderRead.model_validate(order).model_dump_json() + "\n" for order in orders)
+
+
+async def _stream_order_rows(db: AsyncSession, statement, batch_size: int):
+    """Fast-path NDJSON: column tuples encoded straight to bytes."""
+    result = await db.stream(statement.execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        yield encode_order_rows_ndjson(rows)
+
+
+@router.get(
+    "/orders",
+    response_model=list[OrderRead],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, COLUMNAR_MEDIA_TYPE: {}, ARROW_MEDIA_TYPE: {}}}},
+)
+async def get_orders(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    after_id: int | None = Query(default=None, ge=0),
+    max_id: int | None = Query(default=None, ge=0),
+    created_filters: list = Depends(created_range),
+    db: AsyncSession = Depends(get_async_db),
+):
+    columnar = negotiate_columnar(request.headers.get("accept", ""))
+    fast = settings.FAST_ORDERS_JSON or columnar is not None
+    statement = select(*ORDER_READ_COLUMNS) if fast else select(Order)
+    statement = statement.where(*created_filters).order_by(Order.id)
+    if after_id is not None:
+        statement = statement.where(Order.id > after_id)
+    if max_id is not None:
+        statement = statement.where(Order.id <= max_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    if columnar is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        stream = _stream_order_rows if fast else _stream_orders
+        return StreamingResponse(
+            stream(db, statement, settings.STREAM_BATCH_SIZE),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    headers = validator_headers(*await db.run_sync(current_table_state))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    orders = (await db.execute(statement)).all() if fast else (await db.scalars(statement)).all()
+    if limit is not None and len(orders) == limit:
+        headers["X-Next-After-Id"] = str(orders[-1].id)
+    if columnar is not None:
+        return Response(encode_columnar(columnar, orders), media_type=columnar, headers=headers)
+    if fast:
+        return Response(encode_order_rows(orders), media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return orders
+
+@router.get("/orders/aggregate", response_model=OrderAggregate)
+async def get_orders_aggregate(
+    request: Request,
+    response: Response,
+    created_filters: list = Depends(created_range),
+    db: AsyncSession = Depends(get_async_db),
+):
+    headers = validator_headers(*await db.run_sync(current_table_state))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    return await db.run_sync(compute_order_aggregate, created_filters)
+
+@router.get("/orders/rollups", response_model=list[OrderRollupRead])
+async def get_order_rollups(
+    hour_filters: list = Depends(rollup_hour_range),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Hourly totals per location and status for the hours overlapping `from`/`to`."""
+    return await db.run_sync(read_rollups, hour_filters)
+
+@router.get("/orders/changes", response_model=OrderChangeFeed)
+async def get_order_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=1000, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    feed = await db.run_sync(read_changes, since=since, limit=limit)
+    # Validate while still inside the session so attribute access can't lazy-load.
+    return OrderChangeFeed.model_validate(feed, from_attributes=True)
+
+@router.get("/orders/bounds", response_model=OrderIdBounds)
+async def get_order_id_bounds(
+    created_filters: list = Depends(created_range),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(compute_id_bounds, created_filters)
+
+@router.get("/orders/{order_id}", response_model=OrderRead)
+async def get_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+@router.post("/orders", response_model=OrderRead)
+async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_async_db)):
+    new_order = Order(**order.model_dump())
+    db.add(new_order)
+    try:
+        await db.commit()
+        await db.refresh(new_order)
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database commit failed")
+    return new_order
+
+@router.post("/orders/bulk", response_model=BulkCreateResult, openapi_extra=BULK_OPENAPI)
+async def create_orders_bulk(
+    request: Request,
+    chunk_size: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    atomic: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create many orders from a JSON array or an NDJSON body.
+
+    Rows are written in chunks of `chunk_size` inside one transaction. With
+    `atomic=false` a failing chunk is rolled back on its own and reported in
+    `chunks` while the rest are kept.
+    """
+    orders = parse_bulk_body(await read_bulk_body(request), request.headers.get("content-type", ""))
+    return await db.run_sync(write_orders_bulk, orders, chunk_size or settings.BULK_CHUNK_SIZE, atomic)
+
+@router.patch("/orders/{order_id}", response_model=OrderRead)
+async def update_order(order_id: int, order_update: OrderUpdate, db: AsyncSession = Depends(get_async_db)):
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    update_data = order_update.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(order, key, value)
+
+    try:
+        await db.commit()
+        await db.refresh(order)
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database commit failed")
+    return order
+
+@router.delete("/orders/{order_id}")
+async def delete_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    await db.delete(order)
+    try:
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database commit failed")
+    return {"message": "Item deleted successfully"}
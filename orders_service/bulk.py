@@ -0,0 +1,164 @@
+import json
+from datetime import datetime, timezone
+
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from orders_service.changes import reserve_change_versions
+from orders_service.core.config import settings
+from orders_service.models import Order
+from orders_service.rollups import RollupDeltas, apply_rollup_deltas
+from orders_service.schemas import NDJSON_MEDIA_TYPE, OrderCreate
+
+_orders_adapter = TypeAdapter(list[OrderCreate])
+
+
+class BulkInsertError(Exception):
+    def __init__(self, chunk_index: int, error: Exception):
+        super().__init__(f"chunk {chunk_index}: {error}")
+        self.chunk_index = chunk_index
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+def _too_many_rows() -> HTTPException:
+    return _too_large(f"Bulk request exceeds {settings.BULK_MAX_ROWS} orders")
+
+
+async def read_bulk_body(request: Request) -> bytes:
+    """The request body, refused with 413 as soon as it passes BULK_MAX_BYTES."""
+    limit = settings.BULK_MAX_BYTES
+    too_large = _too_large(f"Bulk request body exceeds {limit} bytes")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _json_invalid(loc: tuple, msg: str) -> RequestValidationError:
+    return RequestValidationError([{"type": "json_invalid", "loc": loc, "msg": msg, "input": None}])
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list[OrderCreate]:
+    """
+    Validate a JSON array or NDJSON stream of orders in one pass.
+
+    Raises RequestValidationError with the row's position in each error
+    location so the response matches FastAPI's own 422 format: the array
+    index for JSON, the 1-based line number in the upload for NDJSON (blank
+    lines are skipped but still counted). More than BULK_MAX_ROWS rows is a
+    413, raised before any row is validated (and, for NDJSON, before the
+    lines past the cap are decoded).
+    """
+    line_numbers = None
+    if NDJSON_MEDIA_TYPE in content_type:
+        rows, line_numbers = [], []
+        for number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            if len(rows) >= settings.BULK_MAX_ROWS:
+                raise _too_many_rows()
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise _json_invalid(("body", number), exc.msg)
+            line_numbers.append(number)
+    else:
+        try:
+            rows = orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise _json_invalid(("body",), exc.msg)
+        if isinstance(rows, list) and len(rows) > settings.BULK_MAX_ROWS:
+            raise _too_many_rows()
+
+    try:
+        return _orders_adapter.validate_python(rows)
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False)
+        if line_numbers is not None:
+            errors = [{**error, "loc": (line_numbers[error["loc"][0]], *error["loc"][1:])} for error in errors]
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors])
+
+
+def _insert_chunk(db: Session, statement, chunk: list[dict]) -> list[int]:
+    deltas = RollupDeltas()
+    for row in chunk:
+        deltas.add_row(row)
+    ids = db.scalars(statement, chunk).all()
+    apply_rollup_deltas(db, deltas)
+    return ids
+
+
+def insert_orders(db: Session, orders: list[OrderCreate], chunk_size: int, atomic: bool = True) -> dict:
+    """
+    Insert orders with one multi-row INSERT ... RETURNING per chunk.
+
+    Nothing is committed here. With `atomic` the first failing chunk raises
+    BulkInsertError and the caller rolls everything back; otherwise each chunk
+    runs in a savepoint and failures are reported per chunk.
+    """
+    rows = [order.model_dump() for order in orders]
+    if rows:
+        # Bulk INSERT skips the flush hooks, so stamp change versions and
+        # created_at (for the rollup buckets) here.
+        first_version = reserve_change_versions(db, len(rows))
+        created_at = datetime.now(timezone.utc)
+        for offset, row in enumerate(rows):
+            row["version"] = first_version + offset
+            row["created_at"] = created_at
+
+    statement = insert(Order).returning(Order.id, sort_by_parameter_order=True)
+    created_ids: list[int] = []
+    chunks: list[dict] = []
+
+    for index, start in enumerate(range(0, len(rows), chunk_size)):
+        chunk = rows[start:start + chunk_size]
+        result = {"index": index, "start": start, "count": len(chunk), "status": "ok", "error": None}
+        try:
+            if atomic:
+                ids = _insert_chunk(db, statement, chunk)
+            else:
+                with db.begin_nested():
+                    ids = _insert_chunk(db, statement, chunk)
+        except SQLAlchemyError as exc:
+            if atomic:
+                raise BulkInsertError(index, exc) from exc
+            result.update(status="failed", error=str(getattr(exc, "orig", None) or exc))
+        else:
+            created_ids.extend(ids)
+        chunks.append(result)
+
+    return {"created_ids": created_ids, "chunks": chunks}
+
+
+def write_orders_bulk(db: Session, orders: list[OrderCreate], chunk_size: int, atomic: bool) -> dict:
+    """Insert and commit a validated batch, mapping failures to HTTP errors."""
+    if len(orders) > settings.BULK_MAX_ROWS:
+        raise _too_many_rows()
+
+    try:
+        result = insert_orders(db, orders, chunk_size=chunk_size, atomic=atomic)
+        db.commit()
+    except BulkInsertError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database commit failed in chunk {exc.chunk_index}",
+        )
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Database commit failed")
+    return result
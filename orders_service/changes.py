@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from orders_service.models import Order, OrderChangeCounter, OrderTombstone
+
+
+def reserve_change_versions(session: Session, count: int = 1) -> int:
+    """
+    Reserve `count` consecutive change versions and return the first one.
+
+    The counter row stays locked until the transaction ends, so versions
+    become visible to readers in the order they were handed out.
+    """
+    last = session.execute(
+        update(OrderChangeCounter)
+        .where(OrderChangeCounter.id == 1)
+        .values(version=OrderChangeCounter.version + count, updated_at=datetime.now(timezone.utc))
+        .returning(OrderChangeCounter.version)
+    ).scalar_one()
+    return last - count + 1
+
+
+def current_change_version(session: Session) -> int:
+    return session.query(OrderChangeCounter.version).filter(OrderChangeCounter.id == 1).scalar()
+
+
+def current_table_state(session: Session) -> tuple[int, datetime | None]:
+    """
+    The committed change version and when it was reserved.
+
+    Every create, update and delete (ORM, bulk or seed) reserves a version,
+    so the pair changes whenever the orders table does. One primary key
+    lookup, cheap enough to check before every read.
+    """
+    version, updated_at = session.query(
+        OrderChangeCounter.version, OrderChangeCounter.updated_at
+    ).filter(OrderChangeCounter.id == 1).one()
+    if updated_at is not None and updated_at.tzinfo is None:
+        # SQLite hands timestamps back naive; they were written as UTC.
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return version, updated_at
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_change_versions(session, flush_context, instances):
+    """Version every ORM write to `orders` and leave a tombstone for deletes."""
+    written = [
+        obj for obj in session.new
+        if isinstance(obj, Order)
+    ] + [
+        obj for obj in session.dirty
+        if isinstance(obj, Order) and session.is_modified(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Order)]
+    if not written and not deleted:
+        return
+
+    version = reserve_change_versions(session, len(written) + len(deleted))
+    for order in written:
+        order.version = version
+        version += 1
+    for order in deleted:
+        session.add(OrderTombstone(order_id=order.id, version=version))
+        version += 1
+
+
+def read_changes(session: Session, since: int, limit: int) -> dict:
+    """
+    Return orders written and deleted after version `since`, oldest first.
+
+    At most `limit` entries are returned; pass `next_since` back as `since`
+    while `has_more` is true.
+    """
+    # Every version up to the committed counter value is itself committed, so
+    # bounding both queries by it keeps them consistent without a snapshot.
+    latest = current_change_version(session)
+    orders = (
+        session.query(Order)
+        .filter(Order.version > since, Order.version <= latest)
+        .order_by(Order.version)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = (
+        session.query(OrderTombstone)
+        .filter(OrderTombstone.version > since, OrderTombstone.version <= latest)
+        .order_by(OrderTombstone.version)
+        .limit(limit + 1)
+        .all()
+    )
+
+    entries = sorted(orders + tombstones, key=lambda entry: entry.version)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    return {
+        "changes": [entry for entry in entries if isinstance(entry, Order)],
+        "deleted": [
+            {"id": entry.order_id, "version": entry.version}
+            for entry in entries
+            if isinstance(entry, OrderTombstone)
+        ],
+        "next_since": entries[-1].version if entries else since,
+        "latest_version": latest,
+        "has_more": has_more,
+    }
@@ -0,0 +1,55 @@
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def validator_headers(version: int, updated_at: datetime | None) -> dict[str, str]:
+    """
+    ETag and Last-Modified for a response derived from table state `version`.
+
+    The tag is weak: the JSON, FAST_ORDERS_JSON and paged bodies for one URL
+    are equivalent but not byte-identical across settings.
+    """
+    # Vary: Accept since JSON and the columnar formats share one URL.
+    if updated_at is None:
+        return {"ETag": f'W/"orders-{version}"', "Vary": "Accept"}
+    # The timestamp keeps tags unique across databases whose counters were
+    # reset or restored to the same version.
+    stamp = int(updated_at.timestamp() * 1_000_000)
+    return {
+        "ETag": f'W/"orders-{version}-{stamp}"',
+        "Last-Modified": format_datetime(updated_at, usegmt=True),
+        "Vary": "Accept",
+    }
+
+
+def _opaque_tags(header: str) -> set[str]:
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored.
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """
+    Whether the client's cached copy still matches `headers`.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    it is absent, at the one-second resolution of HTTP dates.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _opaque_tags(if_none_match)
+        return "*" in tags or headers["ETag"].removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -2,6 +2,38 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     ORDERS_API_KEY: str
+    # Rows fetched per server-side cursor round trip when streaming NDJSON.
+    STREAM_BATCH_SIZE: int = 1000
+    # GET /orders selects column tuples and encodes them with orjson instead
+    # of validating every row through OrderRead. Same wire format.
+    FAST_ORDERS_JSON: bool = False
+    # Serve the CRUD routes from async handlers on an asyncio engine
+    # (asyncpg for Postgres, aiosqlite for SQLite) instead of the threadpool.
+    ASYNC_DB: bool = False
+    # POST /orders/bulk: rows per multi-row INSERT and the request size caps.
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_ROWS: int = 100_000
+    BULK_MAX_BYTES: int = 64 * 1024 * 1024
+    # Connection pool (ignored for SQLite). Recycle of -1 never recycles.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # Response compression, negotiated from Accept-Encoding in this order of
+    # preference; zstd and br are skipped unless zstandard / brotli are
+    # installed. Bodies under COMPRESSION_MIN_SIZE bytes are sent as is, and an
+    # empty list turns compression off.
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 1
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    # Client networks allowed to scrape /metrics (which skips the API key).
+    # Loopback only: behind Docker's published ports every outside client
+    # arrives from a private bridge address, so wider ranges must be opted
+    # into per deployment (e.g. the scraper's own network).
+    METRICS_ALLOWLIST: list[str] = ["127.0.0.0/8", "::1/128"]
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,18 +1,47 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from orders_service.core.config import settings
+from orders_service.metrics import instrument_engine
+from orders_service.pool_stats import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    async_pool_stats,
+    sync_pool_stats,
+)
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 connect_args = {}
 
+
+def pool_options(url: str, poolclass) -> dict:
+    """Queue pool settings from Settings; SQLite keeps SQLAlchemy's default pool."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
 engine = create_engine(
     DATABASE_URL,
-    connect_args=connect_args
+    connect_args=connect_args,
+    **pool_options(DATABASE_URL, InstrumentedQueuePool),
 )
+sync_pool_stats.attach(engine)
+instrument_engine(engine, "sync")
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
@@ -23,4 +52,45 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+_async_session_local: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Create the async engine on first use so the driver is only needed when enabled."""
+    global _async_session_local
+    if _async_session_local is None:
+        url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+        async_engine = create_async_engine(url, **pool_options(url, InstrumentedAsyncQueuePool))
+        async_pool_stats.attach(async_engine.sync_engine)
+        instrument_engine(async_engine.sync_engine, "async")
+        _async_session_local = async_sessionmaker(
+            bind=async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_local
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,17 @@
+import orjson
+
+from orders_service.models import Order
+from orders_service.schemas import OrderRead
+
+# Column rows in OrderRead field order, so they zip straight into the wire shape.
+ORDER_READ_FIELDS = tuple(OrderRead.model_fields)
+ORDER_READ_COLUMNS = tuple(getattr(Order, field) for field in ORDER_READ_FIELDS)
+
+
+def encode_order_rows(rows) -> bytes:
+    """Encode column rows as the JSON array `list[OrderRead]` would produce."""
+    return orjson.dumps([dict(zip(ORDER_READ_FIELDS, row)) for row in rows])
+
+
+def encode_order_rows_ndjson(rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(ORDER_READ_FIELDS, row))) + b"\n" for row in rows)
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+from fastapi import Query
+
+from orders_service.models import Order, OrderRollup
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps are taken as UTC, matching how created_at is written.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """The UTC hour a timestamp falls in, as used by order_rollups."""
+    return _as_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def created_at_filters(created_from: datetime | None, created_to: datetime | None) -> list:
+    """SQL clauses for `from <= created_at < to`; either bound may be open."""
+    clauses = []
+    if created_from is not None:
+        clauses.append(Order.created_at >= _as_utc(created_from))
+    if created_to is not None:
+        clauses.append(Order.created_at < _as_utc(created_to))
+    return clauses
+
+
+def created_range(
+    created_from: datetime | None = Query(default=None, alias="from"),
+    created_to: datetime | None = Query(default=None, alias="to"),
+) -> list:
+    """Dependency turning `?from=&to=` into created_at filter clauses."""
+    return created_at_filters(created_from, created_to)
+
+
+def rollup_hour_range(
+    created_from: datetime | None = Query(default=None, alias="from"),
+    created_to: datetime | None = Query(default=None, alias="to"),
+) -> list:
+    """Dependency selecting the rollup hours that overlap `[from, to)`."""
+    clauses = []
+    if created_from is not None:
+        clauses.append(OrderRollup.hour >= hour_bucket(created_from))
+    if created_to is not None:
+        clauses.append(OrderRollup.hour < _as_utc(created_to))
+    return clauses
@@ -1,28 +1,194 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from orders_service.db import get_db
 from orders_service.models import Order
-from orders_service.schemas import OrderRead, OrderCreate, OrderUpdate
+from orders_service.aggregates import compute_id_bounds, compute_order_aggregate
+from orders_service.changes import current_table_state, read_changes
+from orders_service.conditional import is_not_modified, not_modified_response, validator_headers
+from orders_service.rollups import read_rollups
+from orders_service.filters import created_range, rollup_hour_range
+from orders_service.schemas import (
+    MAX_PAGE_SIZE,
+    NDJSON_MEDIA_TYPE,
+    OrderRead,
+    OrderCreate,
+    OrderUpdate,
+    OrderAggregate,
+    OrderChangeFeed,
+    OrderIdBounds,
+    OrderRollupRead,
+    BulkCreateResult,
+    BULK_OPENAPI,
+)
+from orders_service.bulk import parse_bulk_body, read_bulk_body, write_orders_bulk
+from orders_service.fast_json import ORDER_READ_COLUMNS, encode_order_rows, encode_order_rows_ndjson
+from orders_service.columnar_wire import ARROW_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, encode_columnar, negotiate_columnar
 from orders_service.dependencies import verify_api_key
+from orders_service.core.config import settings
+from orders_service.async_routes import router as async_router
+from orders_service.pool_stats import async_pool_stats, sync_pool_stats
+from orders_service.metrics import MetricsMiddleware, metrics_endpoint
+from orders_service.compression import CompressionMiddleware
 
 app = FastAPI(
     title="Order Service",
     dependencies=[Depends(verify_api_key)],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=settings.COMPRESSION_ENCODINGS,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    levels={
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        "br": settings.COMPRESSION_BROTLI_LEVEL,
+    },
+)
+# Outermost, so response sizes are measured after compression.
+app.add_middleware(MetricsMiddleware)
+
+# Blocking handlers on the sync engine. Run on the threadpool by FastAPI;
+# see orders_service.async_routes for the asyncio equivalent.
+router = APIRouter()
+
+
+def _stream_orders(query, batch_size: int):
+    """Yield NDJSON chunks while reading rows through a server-side cursor."""
+    lines = []
+    for order in query.yield_per(batch_size):
+        lines.append(OrderRead.model_validate(order).model_dump_json())
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _stream_order_rows(query, batch_size: int):
+    """Fast-path NDJSON: column tuples encoded straight to bytes."""
+    rows = []
+    for row in query.yield_per(batch_size):
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield encode_order_rows_ndjson(rows)
+            rows = []
+    if rows:
+        yield encode_order_rows_ndjson(rows)
+
+
+@router.get(
+    "/orders",
+    response_model=list[OrderRead],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, COLUMNAR_MEDIA_TYPE: {}, ARROW_MEDIA_TYPE: {}}}},
+)
+def get_orders(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    after_id: int | None = Query(default=None, ge=0),
+    max_id: int | None = Query(default=None, ge=0),
+    created_filters: list = Depends(created_range),
+    db: Session = Depends(get_db),
+):
+    """
+    List orders ordered by id.
+
+    `limit` and `after_id` page through the table by primary key; a full page
+    sets `X-Next-After-Id` to the cursor for the next one. `max_id` caps the
+    ids, so `after_id < id <= max_id` reads one range of GET /orders/bounds. Sending
+    `Accept: application/x-ndjson` streams one order per line instead of
+    building the whole array in memory. With FAST_ORDERS_JSON the rows are
+    selected as column tuples and encoded with orjson, skipping per-row
+    OrderRead validation. `from`/`to` restrict to `from <= created_at < to`.
+    JSON responses carry ETag/Last-Modified from the table's change version
+    and answer a matching If-None-Match or If-Modified-Since with 304.
+    Accepting `application/vnd.orders.columns` (or the Arrow IPC stream type,
+    with pyarrow installed) returns the same rows in a columnar binary
+    layout; see orders_service.columnar_wire.
+    """
+    columnar = negotiate_columnar(request.headers.get("accept", ""))
+    fast = settings.FAST_ORDERS_JSON or columnar is not None
+    query = db.query(*ORDER_READ_COLUMNS) if fast else db.query(Order)
+    query = query.filter(*created_filters).order_by(Order.id)
+    if after_id is not None:
+        query = query.filter(Order.id > after_id)
+    if max_id is not None:
+        query = query.filter(Order.id <= max_id)
+    if limit is not None:
+        query = query.limit(limit)
 
+    if columnar is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        stream = _stream_order_rows if fast else _stream_orders
+        return StreamingResponse(
+            stream(query, settings.STREAM_BATCH_SIZE),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
 
-@app.get("/orders", response_model=list[OrderRead])
-def get_orders(db: Session = Depends(get_db)):
-    return db.query(Order).all()
+    # Read the version before the rows: a write landing in between then
+    # only makes the tag older than the body, never newer.
+    headers = validator_headers(*current_table_state(db))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
 
-@app.get("/orders/{order_id}", response_model=OrderRead)
+    orders = query.all()
+    if limit is not None and len(orders) == limit:
+        headers["X-Next-After-Id"] = str(orders[-1].id)
+    if columnar is not None:
+        return Response(encode_columnar(columnar, orders), media_type=columnar, headers=headers)
+    if fast:
+        return Response(encode_order_rows(orders), media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return orders
+
+@router.get("/orders/aggregate", response_model=OrderAggregate)
+def get_orders_aggregate(
+    request: Request,
+    response: Response,
+    created_filters: list = Depends(created_range),
+    db: Session = Depends(get_db),
+):
+    """SQL totals for `from <= created_at < to`, revalidated like GET /orders."""
+    headers = validator_headers(*current_table_state(db))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    return compute_order_aggregate(db, created_filters)
+
+@router.get("/orders/rollups", response_model=list[OrderRollupRead])
+def get_order_rollups(
+    hour_filters: list = Depends(rollup_hour_range),
+    db: Session = Depends(get_db),
+):
+    """Hourly totals per location and status for the hours overlapping `from`/`to`."""
+    return read_rollups(db, hour_filters)
+
+@router.get("/orders/changes", response_model=OrderChangeFeed)
+def get_order_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=1000, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Orders written and deleted after change version `since`."""
+    return read_changes(db, since=since, limit=limit)
+
+@router.get("/orders/bounds", response_model=OrderIdBounds)
+def get_order_id_bounds(
+    created_filters: list = Depends(created_range),
+    db: Session = Depends(get_db),
+):
+    """Smallest and largest order id for `from <= created_at < to`, to split reads into id ranges."""
+    return compute_id_bounds(db, created_filters)
+
+@router.get("/orders/{order_id}", response_model=OrderRead)
 def get_order(order_id: int, db: Session = Depends(get_db)):
     order = db.get(Order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
-@app.post("/orders", response_model=OrderRead)
+@router.post("/orders", response_model=OrderRead)
 def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     new_order = Order(**order.model_dump())
     db.add(new_order)
@@ -34,7 +200,24 @@ def create_order(order: OrderCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Database commit failed")
     return new_order
 
-@app.patch("/orders/{order_id}", response_model=OrderRead)
+@router.post("/orders/bulk", response_model=BulkCreateResult, openapi_extra=BULK_OPENAPI)
+async def create_orders_bulk(
+    request: Request,
+    chunk_size: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    atomic: bool = True,
+    db: Session = Depends(get_db),
+):
+    """
+    Create many orders from a JSON array or an NDJSON body.
+
+    Rows are written in chunks of `chunk_size` inside one transaction. With
+    `atomic=false` a failing chunk is rolled back on its own and reported in
+    `chunks` while the rest are kept.
+    """
+    orders = parse_bulk_body(await read_bulk_body(request), request.headers.get("content-type", ""))
+    return await run_in_threadpool(write_orders_bulk, db, orders, chunk_size or settings.BULK_CHUNK_SIZE, atomic)
+
+@router.patch("/orders/{order_id}", response_model=OrderRead)
 def update_order(order_id: int, order_update: OrderUpdate, db: Session = Depends(get_db)):
     order = db.get(Order, order_id)
     if not order:
@@ -52,7 +235,7 @@ def update_order(order_id: int, order_update: OrderUpdate, db: Session = Depends
         raise HTTPException(status_code=500, detail="Database commit failed")
     return order
 
-@app.delete("/orders/{order_id}")
+@router.delete("/orders/{order_id}")
 def delete_order(order_id: int, db: Session = Depends(get_db)):
     order = db.get(Order, order_id)
     if not order:
@@ -65,3 +248,16 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=500, detail="Database commit failed")
     return {"message": "Item deleted successfully"}
+
+
+@app.get("/internal/pool-stats")
+def get_pool_stats():
+    """Connection pool gauges and checkout wait histogram for sizing the pool."""
+    stats = [sync_pool_stats.snapshot()]
+    if settings.ASYNC_DB:
+        stats.append(async_pool_stats.snapshot())
+    return {"pools": stats}
+
+
+app.include_router(async_router if settings.ASYNC_DB else router)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
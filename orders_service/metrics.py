@@ -0,0 +1,126 @@
+import ipaddress
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from orders_service.core.config import settings
+
+# Own registry so /metrics exports only what this module defines.
+registry = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body byte.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_bytes",
+    "Response body size.",
+    ["method", "route"],
+    buckets=BYTES_BUCKETS,
+    registry=registry,
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Time to execute one SQL statement, by statement type.",
+    ["engine", "operation"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "COPY") else "OTHER"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Time every statement run through `engine` into DB_QUERY_SECONDS."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.labels(name, _operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # A failed statement never reaches after_cursor_execute.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (like /metrics) set only the endpoint.
+    return scope["path"] if "endpoint" in scope else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency and body size per route template.
+
+    Unmatched paths share one label so scanners cannot blow up cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_label(scope)
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+            RESPONSE_BYTES.labels(scope["method"], route).observe(body_bytes)
+
+
+def _client_allowed(host: str | None) -> bool:
+    try:
+        address = ipaddress.ip_address(host or "")
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWLIST)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Prometheus text exposition.
+
+    Registered as a plain Starlette route so the app-wide API key dependency
+    does not apply; access is limited to METRICS_ALLOWLIST client networks.
+    """
+    if not _client_allowed(request.client.host if request.client else None):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
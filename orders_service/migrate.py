@@ -0,0 +1,126 @@
+import argparse
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from orders_service.db import Base, engine
+from orders_service.models import Order, OrderChangeCounter, OrderTombstone
+
+# Columns added to existing tables after their first release. `create_all`
+# only creates missing tables, so older databases get them from here.
+ADDED_COLUMNS = (
+    Order.__table__.c.updated_at,
+    Order.__table__.c.version,
+    OrderChangeCounter.__table__.c.updated_at,
+)
+
+
+def _add_missing_columns(conn: Connection) -> list[str]:
+    added = []
+    inspector = inspect(conn)
+    for column in ADDED_COLUMNS:
+        table = column.table.name
+        if column.name in {existing["name"] for existing in inspector.get_columns(table)}:
+            continue
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}")
+        added.append(f"{table}.{column.name}")
+    return added
+
+
+def _add_missing_indexes(conn: Connection) -> list[str]:
+    existing = {index["name"] for index in inspect(conn).get_indexes(Order.__tablename__)}
+    added = []
+    for index in sorted(Order.__table__.indexes, key=lambda index: index.name):
+        if index.name not in existing:
+            index.create(conn)
+            added.append(index.name)
+    return added
+
+
+def _backfill_versions(conn: Connection) -> int:
+    """
+    Give every unversioned order a change version, in id order.
+
+    The versions are reserved from the counter like any other write, after
+    first moving it past the highest version already handed out, so the
+    change feed serves the backfilled rows before anything written later.
+    """
+    missing = conn.scalar(select(func.count()).select_from(Order).where(Order.version.is_(None)))
+    if not missing:
+        return 0
+
+    highest = max(
+        conn.scalar(select(func.max(Order.version))) or 0,
+        conn.scalar(select(func.max(OrderTombstone.version))) or 0,
+    )
+    counter = OrderChangeCounter.version
+    # Holds the counter row lock until commit, so writers wait for the backfill.
+    last = conn.execute(
+        update(OrderChangeCounter)
+        .where(OrderChangeCounter.id == 1)
+        .values(
+            version=case((counter < highest, highest), else_=counter) + missing,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .returning(OrderChangeCounter.version)
+    ).scalar_one()
+
+    ranked = (
+        select(
+            Order.id.label("id"),
+            (last - missing + func.row_number().over(order_by=Order.id)).label("version"),
+        )
+        .where(Order.version.is_(None))
+        .subquery()
+    )
+    # Keep updated_at as it is rather than letting its onupdate stamp now.
+    conn.execute(
+        update(Order)
+        .where(Order.id == ranked.c.id)
+        .values(version=ranked.c.version, updated_at=Order.updated_at)
+    )
+    return missing
+
+
+def _backfill_updated_at(conn: Connection) -> int:
+    return conn.execute(
+        update(Order)
+        .where(Order.updated_at.is_(None))
+        .values(updated_at=func.coalesce(Order.created_at, datetime.now(timezone.utc)))
+    ).rowcount
+
+
+def migrate_orders(bind: Engine) -> dict:
+    """
+    Bring an orders database created by an older release up to date.
+
+    Adds the columns and indexes `create_all` skips on existing tables,
+    versions old orders so the change feed returns them, and fills their
+    `updated_at` from `created_at`. Safe to run again; a second run
+    changes nothing.
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        columns = _add_missing_columns(conn)
+        indexes = _add_missing_indexes(conn)
+        stamped = _backfill_updated_at(conn)
+        versioned = _backfill_versions(conn)
+    return {"columns": columns, "indexes": indexes, "versioned": versioned, "updated_at": stamped}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Upgrade an existing orders database to the current schema.")
+    parser.parse_args(argv)
+
+    result = migrate_orders(engine)
+    print(
+        f"Added columns: {', '.join(result['columns']) or 'none'}; "
+        f"added indexes: {', '.join(result['indexes']) or 'none'}; "
+        f"versioned {result['versioned']} orders, filled updated_at on {result['updated_at']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
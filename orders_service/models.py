@@ -1,7 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, DDL, Index, event
 from datetime import datetime, timezone
 from .db import Base
 
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Order(Base):
     __tablename__ = "orders"
 
@@ -11,4 +16,51 @@ class Order(Base):
     cost = Column(Float)
     delivery_time = Column(Integer) #minutes
     status = Column(String, default="pending")
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=_utcnow)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    version = Column(Integer, index=True) # change version, see orders_service.changes
+
+    # Time-range reads: plain windows and windows within one status/location.
+    __table_args__ = (
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_location_created_at", "location", "created_at"),
+    )
+
+
+class OrderTombstone(Base):
+    """Records a deleted order so the change feed can report it."""
+    __tablename__ = "order_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    version = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), default=_utcnow)
+
+
+class OrderRollup(Base):
+    """Hourly totals per (location, status), kept in step with `orders` on write."""
+    __tablename__ = "order_rollups"
+
+    hour = Column(DateTime(timezone=True), primary_key=True) # UTC, truncated to the hour
+    location = Column(String, primary_key=True) # "" when the order has none
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum_cost = Column(Float, nullable=False, default=0.0)
+    sum_delivery_time = Column(Integer, nullable=False, default=0)
+
+
+class OrderChangeCounter(Base):
+    """Single-row counter handing out monotonically increasing change versions."""
+    __tablename__ = "order_change_counter"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True)) # time of the last reservation; Last-Modified
+
+
+event.listen(
+    OrderChangeCounter.__table__,
+    "after_create",
+    DDL("INSERT INTO order_change_counter (id, version) VALUES (1, 0)"),
+)
@@ -0,0 +1,193 @@
+import argparse
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from orders_service.db import Base, engine
+from orders_service.filters import hour_bucket
+from orders_service.models import Order, OrderRollup
+
+# Columns a rollup row is keyed by or sums over.
+ROLLUP_FIELDS = ("created_at", "location", "status", "cost", "delivery_time")
+
+# Rows per INSERT ... ON CONFLICT when writing rollup deltas.
+UPSERT_CHUNK_SIZE = 1000
+
+
+class RollupDeltas:
+    """
+    Pending changes to order_rollups, keyed by (hour, location, status).
+
+    Orders without a location are filed under "" and missing cost or
+    delivery_time count as 0, the same convention the analytics running
+    totals use.
+    """
+
+    def __init__(self):
+        self._deltas: defaultdict[tuple, list] = defaultdict(lambda: [0, 0.0, 0])
+
+    def __bool__(self) -> bool:
+        return any(delta[0] or delta[1] or delta[2] for delta in self._deltas.values())
+
+    def add(self, created_at: datetime, location, status, cost, delivery_time, sign: int = 1) -> None:
+        delta = self._deltas[(hour_bucket(created_at), location or "", status or "")]
+        delta[0] += sign
+        delta[1] += sign * float(cost or 0)
+        delta[2] += sign * int(delivery_time or 0)
+
+    def add_row(self, row: dict, sign: int = 1) -> None:
+        self.add(*(row.get(field) for field in ROLLUP_FIELDS), sign=sign)
+
+    def rows(self) -> list[dict]:
+        # Sorted so concurrent writers lock rollup rows in the same order.
+        return [
+            {
+                "hour": hour,
+                "location": location,
+                "status": status,
+                "count": count,
+                "sum_cost": sum_cost,
+                "sum_delivery_time": sum_delivery_time,
+            }
+            for (hour, location, status), (count, sum_cost, sum_delivery_time) in sorted(self._deltas.items())
+            if count or sum_cost or sum_delivery_time
+        ]
+
+
+def _upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"order_rollups upsert is not supported on {dialect_name}")
+
+    statement = insert(OrderRollup)
+    return statement.on_conflict_do_update(
+        index_elements=[OrderRollup.hour, OrderRollup.location, OrderRollup.status],
+        set_={
+            "count": OrderRollup.count + statement.excluded["count"],
+            "sum_cost": OrderRollup.sum_cost + statement.excluded.sum_cost,
+            "sum_delivery_time": OrderRollup.sum_delivery_time + statement.excluded.sum_delivery_time,
+        },
+    )
+
+
+def apply_rollup_deltas(bind: Session | Connection, deltas: RollupDeltas) -> None:
+    """
+    Add `deltas` to order_rollups in the caller's transaction.
+
+    Buckets whose count drops to zero are removed.
+    """
+    rows = deltas.rows()
+    if not rows:
+        return
+
+    dialect_name = (bind.get_bind() if isinstance(bind, Session) else bind).dialect.name
+    statement = _upsert_statement(dialect_name)
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        bind.execute(statement.values(rows[start:start + UPSERT_CHUNK_SIZE]))
+
+    if any(row["count"] < 0 for row in rows):
+        bind.execute(
+            delete(OrderRollup).where(
+                OrderRollup.count <= 0,
+                OrderRollup.hour.in_({row["hour"] for row in rows if row["count"] < 0}),
+            )
+        )
+
+
+def _fill_insert_defaults(order: Order) -> None:
+    # created_at and status defaults normally apply at INSERT time, after the
+    # rollup delta has been computed, so resolve them up front.
+    for name in ("created_at", "status"):
+        default = Order.__table__.c[name].default
+        if getattr(order, name) is None and default is not None:
+            setattr(order, name, default.arg(None) if default.is_callable else default.arg)
+
+
+def _previous_values(session: Session, order: Order) -> tuple:
+    """Rollup fields as they were before this flush's pending changes."""
+    state = inspect(order)
+    values = []
+    for name in ROLLUP_FIELDS:
+        history = state.attrs[name].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        elif not history.added:
+            values.append(getattr(order, name))
+        else:
+            # Set after expiry, so the old value was never loaded.
+            return session.execute(
+                select(*(getattr(Order, field) for field in ROLLUP_FIELDS)).where(Order.id == order.id)
+            ).one()
+    return tuple(values)
+
+
+@event.listens_for(Session, "before_flush")
+def _maintain_rollups(session, flush_context, instances):
+    """Fold every ORM insert, update and delete of an order into order_rollups."""
+    deltas = RollupDeltas()
+    for obj in session.new:
+        if isinstance(obj, Order):
+            _fill_insert_defaults(obj)
+            deltas.add(*(getattr(obj, field) for field in ROLLUP_FIELDS))
+    for obj in session.dirty:
+        if isinstance(obj, Order) and session.is_modified(obj):
+            deltas.add(*_previous_values(session, obj), sign=-1)
+            deltas.add(*(getattr(obj, field) for field in ROLLUP_FIELDS))
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            deltas.add(*_previous_values(session, obj), sign=-1)
+    if deltas:
+        apply_rollup_deltas(session, deltas)
+
+
+def read_rollups(session: Session, filters: list | None = None) -> list[OrderRollup]:
+    """Rollup rows matching `filters` (e.g. rollup_hour_range), oldest hour first."""
+    return list(
+        session.scalars(
+            select(OrderRollup)
+            .where(*(filters or []))
+            .order_by(OrderRollup.hour, OrderRollup.location, OrderRollup.status)
+        )
+    )
+
+
+def _locked_order_rows(conn: Connection) -> Iterable:
+    if conn.dialect.name == "postgresql":
+        # Blocks order writes until the rebuild commits, so none are lost.
+        conn.exec_driver_sql("LOCK TABLE orders IN SHARE MODE")
+    return conn.execution_options(yield_per=10_000).execute(
+        select(*(getattr(Order, field) for field in ROLLUP_FIELDS))
+    )
+
+
+def rebuild_rollups(bind: Engine) -> int:
+    """Recompute order_rollups from the orders table; returns the bucket count."""
+    deltas = RollupDeltas()
+    with bind.begin() as conn:
+        for row in _locked_order_rows(conn):
+            deltas.add(*row)
+        conn.execute(delete(OrderRollup))
+        apply_rollup_deltas(conn, deltas)
+    return len(deltas.rows())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the order_rollups table from orders.")
+    parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    buckets = rebuild_rollups(engine)
+    print(f"Rebuilt order_rollups: {buckets} buckets")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MAX_PAGE_SIZE = 10_000
+
 class OrderRead(BaseModel):
     model_config = ConfigDict(extra="forbid", from_attributes=True)
     
@@ -23,3 +28,66 @@ class OrderUpdate(BaseModel):
     cost: float | None = None
     delivery_time: int | None = None
     status: str | None = None
+
+class FieldStats(BaseModel):
+    avg: float | None
+    min: float | None
+    max: float | None
+
+class OrderAggregate(BaseModel):
+    count: int
+    cost: FieldStats
+    delivery_time: FieldStats
+    by_status: dict[str, int]
+    by_location: dict[str, int]
+
+class OrderIdBounds(BaseModel):
+    min_id: int | None
+    max_id: int | None
+
+class OrderChange(OrderRead):
+    version: int
+
+class DeletedOrder(BaseModel):
+    id: int
+    version: int
+
+class OrderChangeFeed(BaseModel):
+    changes: list[OrderChange]
+    deleted: list[DeletedOrder]
+    next_since: int
+    latest_version: int
+    has_more: bool
+
+class OrderRollupRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    hour: datetime
+    location: str
+    status: str
+    count: int
+    sum_cost: float
+    sum_delivery_time: int
+
+class BulkChunkResult(BaseModel):
+    index: int
+    start: int
+    count: int
+    status: str
+    error: str | None = None
+
+class BulkCreateResult(BaseModel):
+    created_ids: list[int]
+    chunks: list[BulkChunkResult]
+
+BULK_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/OrderCreate"}}
+            },
+            NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/OrderCreate"}},
+        },
+    }
+}
@@ -1,6 +1,9 @@
 import asyncio
+from collections import Counter
+from datetime import datetime, timezone
 
 import httpx
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -8,9 +11,12 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 import analytics_service.rate_limiter as rate_limiter
+import analytics_service.routers.analytics as analytics_router_module
+from analytics_service.cache import ValidatorCache
 import orders_service.main as orders_main
 from analytics_service.core.config import settings as analytics_settings
 from analytics_service.core.http_client import get_http_client
+from analytics_service.incremental import OrderChangeTracker
 from analytics_service.routers.analytics import router as analytics_router
 from orders_service.core.config import settings as orders_settings
 from orders_service.db import Base
@@ -225,6 +231,12 @@ def test_location_breakdown_real_cross_service_success(monkeypatch):
             "/analytics/location-breakdown?limit=2",
             headers={"X-API-Key": "shared-key"},
         )
+        monkeypatch.setattr(analytics_settings, "TOP_LOCATIONS_MODE", "approximate")
+        monkeypatch.setattr(analytics_settings, "TOP_LOCATIONS_CAPACITY", 2)
+        approximate = analytics_client.get(
+            "/analytics/location-breakdown?limit=2",
+            headers={"X-API-Key": "shared-key"},
+        )
 
     asyncio.run(orders_client.aclose())
     orders_main.app.dependency_overrides.clear()
@@ -238,3 +250,496 @@ def test_location_breakdown_real_cross_service_success(monkeypatch):
             {"location": "Dallas", "count": 1},
         ]
     }
+    # Miami evicted Dallas from the two-slot summary and inherited its count.
+    assert approximate.json() == {
+        "top_locations": [
+            {"location": "Austin", "count": 2, "error": 0},
+            {"location": "Miami", "count": 2, "error": 1},
+        ],
+        "max_error": 2,
+    }
+
+
+def test_summary_aggregate_mode_matches_rows_mode(monkeypatch):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+
+    session = testing_session_local()
+    session.add_all(
+        [
+            Order(item_name="A", location="Austin", cost=10.0, delivery_time=30, status="delivered"),
+            Order(item_name="B", location="Dallas", cost=20.0, delivery_time=50, status="pending"),
+            Order(item_name="C", location="Austin", cost=15.0, delivery_time=40, status="delivered"),
+            Order(item_name="D", location="Miami", cost=22.0, delivery_time=60, status="cancelled"),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    rate_limiter._rate_limit_store.clear()
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+    )
+    analytics_client = _build_analytics_client(orders_client)
+
+    responses = {}
+    with analytics_client:
+        for mode in ("rows", "aggregate", "rollup"):
+            monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", mode)
+            responses[mode] = [
+                analytics_client.get(path, headers={"X-API-Key": "shared-key"}).json()
+                for path in (
+                    "/analytics/summary",
+                    "/analytics/status-breakdown",
+                    "/analytics/location-breakdown?limit=2",
+                )
+            ]
+
+    asyncio.run(orders_client.aclose())
+    orders_main.app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+    assert responses["aggregate"] == responses["rows"] == responses["rollup"]
+    assert responses["aggregate"][0] == {
+        "total_orders": 4,
+        "average_delivery_time": 45.0,
+        "average_cost": 16.75,
+        "top_locations": ["Austin", "Dallas", "Miami"],
+    }
+
+
+def test_summary_time_range_matches_across_modes(monkeypatch):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+
+    session = testing_session_local()
+    session.add_all(
+        [
+            Order(
+                item_name=name,
+                location=location,
+                cost=cost,
+                delivery_time=delivery_time,
+                status="delivered",
+                created_at=datetime(2024, 3, day, tzinfo=timezone.utc),
+            )
+            for name, location, cost, delivery_time, day in (
+                ("A", "Austin", 10.0, 30, 1),
+                ("B", "Dallas", 20.0, 50, 5),
+                ("C", "Dallas", 30.0, 70, 6),
+                ("D", "Miami", 40.0, 90, 9),
+            )
+        ]
+    )
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_router_module, "change_tracker", OrderChangeTracker())
+    analytics_router_module.orders_cache.clear()
+    rate_limiter._rate_limit_store.clear()
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+    )
+    analytics_client = _build_analytics_client(orders_client)
+
+    responses = {}
+    with analytics_client:
+        for mode in ("rows", "aggregate", "incremental"):
+            monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", mode)
+            responses[mode] = analytics_client.get(
+                "/analytics/summary?from=2024-03-02T00:00:00Z&to=2024-03-08T00:00:00Z",
+                headers={"X-API-Key": "shared-key"},
+            ).json()
+
+    asyncio.run(orders_client.aclose())
+    orders_main.app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+    assert responses["rows"] == responses["aggregate"] == responses["incremental"] == {
+        "total_orders": 2,
+        "average_delivery_time": 60.0,
+        "average_cost": 25.0,
+        "top_locations": ["Dallas"],
+    }
+
+
+def test_incremental_mode_tracks_writes_through_change_feed(monkeypatch):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_settings, "CHANGE_FEED_PAGE_SIZE", 2)
+    monkeypatch.setattr(analytics_router_module, "change_tracker", OrderChangeTracker())
+    rate_limiter._rate_limit_store.clear()
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+    )
+    analytics_client = _build_analytics_client(orders_client)
+    orders_api = TestClient(orders_main.app, headers={"X-API-Key": "shared-key"})
+
+    def summaries():
+        results = {}
+        for mode in ("rows", "incremental"):
+            monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", mode)
+            results[mode] = analytics_client.get(
+                "/analytics/summary", headers={"X-API-Key": "shared-key"}
+            ).json()
+        return results
+
+    with analytics_client:
+        for item, location, cost in [
+            ("A", "Austin", 10.0),
+            ("B", "Dallas", 20.0),
+            ("C", "Austin", 30.0),
+            ("D", "Austin", 40.0),
+        ]:
+            orders_api.post(
+                "/orders",
+                json={"item_name": item, "location": location, "cost": cost, "delivery_time": 30, "status": "pending"},
+            )
+        before = summaries()
+
+        orders_api.patch("/orders/2", json={"location": "Miami", "cost": 50.0})
+        orders_api.delete("/orders/1")
+        after = summaries()
+
+    asyncio.run(orders_client.aclose())
+    orders_main.app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+    assert before["incremental"] == before["rows"]
+    assert before["incremental"]["total_orders"] == 4
+    assert after["incremental"] == after["rows"]
+    assert after["incremental"] == {
+        "total_orders": 3,
+        "average_delivery_time": 30.0,
+        "average_cost": 40.0,
+        "top_locations": ["Austin", "Miami"],
+    }
+    assert analytics_router_module.change_tracker.version == 6
+
+
+def test_distribution_matches_between_rows_and_incremental_modes(monkeypatch):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+
+    session = testing_session_local()
+    session.add_all(
+        [
+            Order(item_name=f"Item {i}", location=location, cost=10.0 * (i + 1), delivery_time=20 + 10 * i, status=status)
+            for i, (location, status) in enumerate(
+                [("Austin", "delivered"), ("Austin", "pending"), ("Dallas", "delivered"), ("Austin", "delivered")]
+            )
+        ]
+    )
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_router_module, "change_tracker", OrderChangeTracker())
+    rate_limiter._rate_limit_store.clear()
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+    )
+    analytics_client = _build_analytics_client(orders_client)
+
+    responses = {}
+    with analytics_client:
+        for mode in ("rows", "incremental"):
+            monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", mode)
+            responses[mode] = analytics_client.get(
+                "/analytics/distribution?quantiles=0.5&quantiles=1",
+                headers={"X-API-Key": "shared-key"},
+            )
+        invalid = analytics_client.get(
+            "/analytics/distribution?quantiles=1.5", headers={"X-API-Key": "shared-key"}
+        )
+
+    asyncio.run(orders_client.aclose())
+    orders_main.app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+    assert invalid.status_code == 422
+    assert responses["rows"].status_code == 200
+    body = responses["rows"].json()
+    assert body == responses["incremental"].json()
+    assert body["quantiles"] == [0.5, 1.0]
+    assert body["overall"]["count"] == 4
+    assert body["by_location"]["Austin"]["count"] == 3
+    assert body["by_status"]["pending"]["count"] == 1
+    # Sketch estimates are within 1% of the true values.
+    assert body["overall"]["delivery_time"]["1.0"] == pytest.approx(50, rel=0.01)
+    assert body["by_location"]["Dallas"]["cost"]["0.5"] == pytest.approx(30.0, rel=0.01)
+
+
+def test_unchanged_orders_are_revalidated_not_refetched(monkeypatch):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+    session = testing_session_local()
+    session.add(Order(item_name="A", location="Austin", cost=10.0, delivery_time=30, status="delivered"))
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", "rows")
+    monkeypatch.setattr(analytics_router_module, "upstream_validators", ValidatorCache())
+    rate_limiter._rate_limit_store.clear()
+
+    statuses = []
+
+    async def record(response):
+        statuses.append(response.status_code)
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+        event_hooks={"response": [record]},
+    )
+
+    async def run():
+        batches = [await analytics_router_module.get_order_batch(orders_client) for _ in range(2)]
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=orders_main.app),
+            base_url="http://orders.local",
+            headers={"X-API-KEY": "shared-key"},
+        ) as writer:
+            created = await writer.post(
+                "/orders",
+                json={"item_name": "B", "location": "Dallas", "cost": 30.0, "delivery_time": 50, "status": "pending"},
+            )
+            assert created.status_code == 200, created.text
+        batches.append(await analytics_router_module.get_order_batch(orders_client))
+        return batches
+
+    try:
+        first, second, third = asyncio.run(run())
+    finally:
+        asyncio.run(orders_client.aclose())
+        orders_main.app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    assert statuses == [200, 304, 200]
+    # The 304 reused the parsed body and the columnar batch built from it.
+    assert second is first
+    assert third is not first
+    assert third.average_cost() == 20.0
+    assert analytics_router_module.upstream_validators.counters["revalidated"] == 1
+
+
+@pytest.mark.parametrize("transport", ["json", "columnar", "arrow"])
+def test_order_batch_is_the_same_over_every_transport(monkeypatch, transport):
+    if transport == "arrow":
+        pytest.importorskip("pyarrow")
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+    session = testing_session_local()
+    session.add_all(
+        [
+            Order(item_name="A", location="Austin", cost=10.0, delivery_time=30, status="delivered"),
+            Order(item_name="B", location="Dallas", cost=20.0, delivery_time=50, status="pending"),
+            Order(item_name="A", location="Dallas", cost=33.5, delivery_time=41, status="delivered"),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_settings, "ORDERS_TRANSPORT", transport)
+    monkeypatch.setattr(analytics_router_module, "upstream_validators", ValidatorCache())
+    content_types = []
+
+    async def record(response):
+        content_types.append(response.headers["content-type"])
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=orders_main.app),
+            headers={"X-API-KEY": "shared-key"},
+            event_hooks={"response": [record]},
+        ) as orders_client:
+            return await analytics_router_module.get_order_batch(orders_client)
+
+    try:
+        batch = asyncio.run(run())
+    finally:
+        orders_main.app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    expected = {
+        "json": "application/json",
+        "columnar": "application/vnd.orders.columns",
+        "arrow": "application/vnd.apache.arrow.stream",
+    }
+    assert content_types == [expected[transport]]
+    assert batch.average_cost() == pytest.approx(21.1666666)
+    assert batch.average_delivery_time() == pytest.approx(40.3333333)
+    assert batch.top_locations_with_counts() == [{"location": "Dallas", "count": 2}, {"location": "Austin", "count": 1}]
+    assert batch.status_breakdown() == {"delivered": 2, "pending": 1}
+
+
+@pytest.mark.parametrize("mode", ["rows", "aggregate", "incremental"])
+def test_dashboard_matches_single_views_from_one_upstream_fetch(monkeypatch, mode):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+    session = testing_session_local()
+    session.add_all(
+        [
+            Order(item_name="A", location="Austin", cost=10.0, delivery_time=30, status="delivered"),
+            Order(item_name="B", location="Dallas", cost=20.0, delivery_time=50, status="pending"),
+            Order(item_name="C", location="Austin", cost=40.0, delivery_time=20, status="delivered"),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", mode)
+    monkeypatch.setattr(analytics_router_module, "change_tracker", OrderChangeTracker())
+    monkeypatch.setattr(analytics_router_module, "upstream_validators", ValidatorCache())
+    rate_limiter._rate_limit_store.clear()
+
+    upstream_paths = []
+
+    async def record(request: httpx.Request):
+        upstream_paths.append(request.url.path)
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+        event_hooks={"request": [record]},
+    )
+    analytics_client = _build_analytics_client(orders_client)
+    headers = {"X-API-Key": "shared-key"}
+
+    with analytics_client:
+        dashboard = analytics_client.get("/analytics/dashboard?limit=1", headers=headers)
+        dashboard_fetches = len(upstream_paths)
+        singles = {
+            "summary": analytics_client.get("/analytics/summary", headers=headers),
+            "status_breakdown": analytics_client.get("/analytics/status-breakdown", headers=headers),
+            "location_breakdown": analytics_client.get("/analytics/location-breakdown?limit=1", headers=headers),
+        }
+        only_statuses = analytics_client.get(
+            "/analytics/dashboard?sections=status_breakdown&sections=distribution&quantiles=0.5", headers=headers
+        )
+        unknown = analytics_client.get("/analytics/dashboard?sections=orders", headers=headers)
+
+    asyncio.run(orders_client.aclose())
+    orders_main.app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+    assert dashboard.status_code == 200
+    assert dashboard.json() == {name: response.json() for name, response in singles.items()}
+    assert dashboard.json()["location_breakdown"]["top_locations"] == [{"location": "Austin", "count": 2}]
+    assert dashboard_fetches == 1
+    assert set(only_statuses.json()) == {"status_breakdown", "distribution"}
+    assert only_statuses.json()["distribution"]["overall"]["count"] == 3
+    assert unknown.status_code == 422
+
+
+class _FailOnce(httpx.AsyncBaseTransport):
+    """Answers the first request for `query` with a 503, then passes through."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, query: str):
+        self.transport = transport
+        self.query = query
+        self.requests = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.url.path, request.url.query.decode()))
+        if request.url.query.decode() == self.query and self.requests.count(self.requests[-1]) == 1:
+            return httpx.Response(503)
+        return await self.transport.handle_async_request(request)
+
+
+@pytest.mark.parametrize("transport", ["json", "columnar"])
+def test_partitioned_fetch_matches_single_fetch_and_retries_one_range(monkeypatch, transport):
+    engine, testing_session_local = _setup_orders_db()
+    _override_orders_db(testing_session_local)
+    session = testing_session_local()
+    session.add_all(
+        [
+            Order(
+                item_name=f"Item {i % 3}",
+                location=["Austin", "Dallas", "Reno"][i % 3 if i < 6 else 2],
+                cost=5.0 + i,
+                delivery_time=20 + i,
+                status="delivered" if i % 2 else "pending",
+            )
+            for i in range(10)
+        ]
+    )
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_settings, "ORDERS_TRANSPORT", transport)
+    monkeypatch.setattr(analytics_settings, "ORDERS_PARTITION_MIN_IDS", 1)
+    monkeypatch.setattr(analytics_settings, "INITIAL_BACKOFF", 0.0)
+    monkeypatch.setattr(analytics_router_module, "upstream_validators", ValidatorCache())
+
+    def summary(batch):
+        return (
+            len(batch),
+            batch.average_cost(),
+            batch.top_locations_with_counts(top_n=3),
+            batch.status_breakdown(),
+            batch.distribution.report(),
+        )
+
+    async def batch_with(partitions: int, orders_transport: httpx.AsyncBaseTransport):
+        monkeypatch.setattr(analytics_settings, "ORDERS_FETCH_PARTITIONS", partitions)
+        async with httpx.AsyncClient(transport=orders_transport, headers={"X-API-KEY": "shared-key"}) as client:
+            return summary(await analytics_router_module.get_order_batch(client))
+
+    asgi = httpx.ASGITransport(app=orders_main.app)
+    flaky = _FailOnce(asgi, "after_id=5&max_id=7")
+    try:
+        single = asyncio.run(batch_with(1, asgi))
+        partitioned = asyncio.run(batch_with(4, flaky))
+    finally:
+        orders_main.app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    assert partitioned == single
+    assert single[0] == 10
+    # One bounds lookup, four ranges, and only the failed range fetched twice.
+    assert flaky.requests[0] == ("/orders/bounds", "")
+    assert Counter(flaky.requests[1:]) == {
+        ("/orders", "max_id=2"): 1,
+        ("/orders", "after_id=2&max_id=5"): 1,
+        ("/orders", "after_id=5&max_id=7"): 2,
+        ("/orders", "after_id=7"): 1,
+    }
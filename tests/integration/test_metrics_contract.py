@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import analytics_service.main as analytics_main
+import analytics_service.rate_limiter as rate_limiter
+import orders_service.main as orders_main
+from analytics_service.core import metrics as analytics_metrics
+from analytics_service.core.config import settings as analytics_settings
+from analytics_service.core.http_client import get_http_client
+from orders_service import metrics as orders_metrics
+from orders_service.core.config import settings as orders_settings
+from orders_service.db import Base
+from orders_service.models import Order
+
+
+def _sample(registry, name: str, labels: dict) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+async def _scrape(app, path: str = "/metrics") -> httpx.Response:
+    # ASGITransport reports the client as 127.0.0.1, inside the allowlist.
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://internal") as client:
+        return await client.get(path)
+
+
+def test_metrics_skip_api_key_but_require_allowlisted_client():
+    for app in (orders_main.app, analytics_main.app):
+        response = asyncio.run(_scrape(app))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds" in response.text
+
+        # TestClient connects as "testclient", which is not an allowlisted address.
+        assert TestClient(app).get("/metrics").status_code == 403
+
+
+def test_orders_metrics_record_routes_and_sql():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    orders_metrics.instrument_engine(engine, "test")
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    orders_main.app.dependency_overrides[orders_main.get_db] = override_get_db
+    orders_settings.ORDERS_API_KEY = "test-key"
+    route_labels = {"method": "GET", "route": "/orders/{order_id}", "status": "404"}
+    before = _sample(orders_metrics.registry, "http_request_duration_seconds_count", route_labels)
+    try:
+        client = TestClient(orders_main.app)
+        assert client.get("/orders/41", headers={"X-API-Key": "test-key"}).status_code == 404
+        assert client.get("/orders/42", headers={"X-API-Key": "test-key"}).status_code == 404
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        orders_main.app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    registry = orders_metrics.registry
+    assert _sample(registry, "http_request_duration_seconds_count", route_labels) == before + 2
+    assert _sample(registry, "http_response_bytes_sum", {"method": "GET", "route": "/orders/{order_id}"}) > 0
+    assert _sample(registry, "db_query_duration_seconds_count", {"engine": "test", "operation": "SELECT"}) >= 3
+
+
+def test_analytics_metrics_record_upstream_calculations_and_rejections(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    session = session_local()
+    session.add(Order(item_name="A", location="Austin", cost=10.0, delivery_time=30, status="delivered"))
+    session.commit()
+    session.close()
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_KEY", "shared-key")
+    monkeypatch.setattr(analytics_settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_settings, "CALCULATION_MODE", "rows")
+    monkeypatch.setattr(rate_limiter, "REQUEST_LIMIT", 1)
+    rate_limiter._rate_limit_store.clear()
+    orders_main.app.dependency_overrides[orders_main.get_db] = override_get_db
+
+    orders_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=orders_main.app),
+        headers={"X-API-KEY": "shared-key"},
+    )
+
+    async def override_http_client():
+        return orders_client
+
+    analytics_main.app.dependency_overrides[get_http_client] = override_http_client
+    registry = analytics_metrics.registry
+    upstream = {"endpoint": "orders", "outcome": "ok"}
+    calculation = {"function": "OrderBatch.average_cost"}
+    before = {
+        "upstream": _sample(registry, "orders_upstream_request_duration_seconds_count", upstream),
+        "calculation": _sample(registry, "analytics_calculation_duration_seconds_count", calculation),
+        "rejections": _sample(registry, "rate_limit_rejections_total", {}),
+    }
+    try:
+        client = TestClient(analytics_main.app)
+        headers = {"X-API-Key": "shared-key"}
+        assert client.get("/analytics/summary", headers=headers).status_code == 200
+        assert client.get("/analytics/summary", headers=headers).status_code == 429
+    finally:
+        asyncio.run(orders_client.aclose())
+        analytics_main.app.dependency_overrides.clear()
+        orders_main.app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        rate_limiter._rate_limit_store.clear()
+
+    assert _sample(registry, "orders_upstream_request_duration_seconds_count", upstream) == before["upstream"] + 1
+    assert _sample(registry, "orders_upstream_response_bytes_count", {"endpoint": "orders"}) >= 1
+    assert _sample(registry, "analytics_calculation_duration_seconds_count", calculation) == before["calculation"] + 1
+    assert _sample(registry, "rate_limit_rejections_total", {}) == before["rejections"] + 1
@@ -0,0 +1,78 @@
+import json
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from orders_service.async_routes import router as async_router
+from orders_service.core.config import settings as orders_settings
+from orders_service.db import Base, get_async_db, to_async_url
+from orders_service.dependencies import verify_api_key
+
+
+def _build_async_orders_client(tmp_path, api_key: str = "test-key"):
+    url = f"sqlite:///{tmp_path / 'orders.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+
+    async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+    async_session_local = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_local() as db:
+            yield db
+
+    app = FastAPI(dependencies=[Depends(verify_api_key)])
+    app.include_router(async_router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    orders_settings.ORDERS_API_KEY = api_key
+    return TestClient(app, headers={"X-API-Key": api_key}), sync_engine
+
+
+def test_to_async_url_swaps_driver():
+    assert to_async_url("sqlite://") == "sqlite+aiosqlite://"
+    assert (
+        to_async_url("postgresql+psycopg2://postgres:secret@db:5432/ordersdb")
+        == "postgresql+asyncpg://postgres:secret@db:5432/ordersdb"
+    )
+
+
+def test_async_orders_crud_contract(tmp_path):
+    client, sync_engine = _build_async_orders_client(tmp_path)
+    payload = {"item_name": "Widget", "location": "Austin", "cost": 25.5, "delivery_time": 45, "status": "pending"}
+    try:
+        with client:
+            created = client.post("/orders", json=payload)
+            assert created.status_code == 200
+            order_id = created.json()["id"]
+            client.post("/orders", json={**payload, "location": "Dallas"})
+
+            updated = client.patch(f"/orders/{order_id}", json={"status": "delivered"})
+            assert updated.json() == {**payload, "id": order_id, "status": "delivered"}
+
+            page = client.get("/orders?limit=1")
+            assert [order["id"] for order in page.json()] == [order_id]
+            assert page.headers["X-Next-After-Id"] == str(order_id)
+
+            streamed = client.get("/orders", headers={"Accept": "application/x-ndjson"})
+            listing = client.get("/orders").json()
+            assert [json.loads(line) for line in streamed.text.splitlines()] == listing
+
+            aggregate = client.get("/orders/aggregate").json()
+            assert aggregate["by_location"] == {"Austin": 1, "Dallas": 1}
+
+            assert client.delete(f"/orders/{order_id}").json() == {"message": "Item deleted successfully"}
+            assert client.get(f"/orders/{order_id}").status_code == 404
+
+            feed = client.get("/orders/changes?since=2").json()
+            assert [change["id"] for change in feed["changes"]] == []
+            assert feed["deleted"] == [{"id": order_id, "version": 4}]
+            assert feed["latest_version"] == 4
+
+            rollups = client.get("/orders/rollups").json()
+            assert [(row["location"], row["status"], row["count"]) for row in rollups] == [("Dallas", "pending", 1)]
+    finally:
+        Base.metadata.drop_all(bind=sync_engine)
+        sync_engine.dispose()
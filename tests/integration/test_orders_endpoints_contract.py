@@ -1,12 +1,18 @@
+import json
+from datetime import datetime, timezone
+
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 import orders_service.main as orders_main
+from orders_service.bulk import insert_orders
 from orders_service.core.config import settings as orders_settings
 from orders_service.db import Base
 from orders_service.models import Order
+from orders_service.rollups import rebuild_rollups
+from orders_service.schemas import OrderCreate
 
 
 def _build_orders_test_client(api_key: str = "test-key"):
@@ -144,3 +150,378 @@ def test_orders_create_update_delete_contract():
         assert delete_resp.json()["message"] == "Item deleted successfully"
     finally:
         _cleanup_orders_test_client(engine)
+
+
+def test_orders_aggregate_contract():
+    client, session_local, engine = _build_orders_test_client()
+    try:
+        session = session_local()
+        session.add_all(
+            [
+                Order(item_name="A", location="Austin", cost=10.0, delivery_time=30, status="delivered"),
+                Order(item_name="B", location="Dallas", cost=30.0, delivery_time=50, status="pending"),
+                Order(item_name="C", location="Austin", cost=20.0, delivery_time=40, status="delivered"),
+            ]
+        )
+        session.commit()
+        session.close()
+
+        response = client.get("/orders/aggregate", headers={"X-API-Key": "test-key"})
+        assert response.status_code == 200
+        assert response.json() == {
+            "count": 3,
+            "cost": {"avg": 20.0, "min": 10.0, "max": 30.0},
+            "delivery_time": {"avg": 40.0, "min": 30.0, "max": 50.0},
+            "by_status": {"delivered": 2, "pending": 1},
+            "by_location": {"Austin": 2, "Dallas": 1},
+        }
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_aggregate_empty_table():
+    client, _session_local, engine = _build_orders_test_client()
+    try:
+        response = client.get("/orders/aggregate", headers={"X-API-Key": "test-key"})
+        assert response.status_code == 200
+        assert response.json()["count"] == 0
+        assert response.json()["cost"] == {"avg": None, "min": None, "max": None}
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_time_range_filters_listing_and_aggregate():
+    client, session_local, engine = _build_orders_test_client()
+    try:
+        session = session_local()
+        session.add_all(
+            [
+                Order(
+                    item_name=name,
+                    location="Austin",
+                    cost=cost,
+                    delivery_time=30,
+                    status="delivered",
+                    created_at=datetime(2024, 1, day, tzinfo=timezone.utc),
+                )
+                for name, cost, day in (("A", 10.0, 1), ("B", 20.0, 2), ("C", 30.0, 3))
+            ]
+        )
+        session.commit()
+        session.close()
+        headers = {"X-API-Key": "test-key"}
+        window = {"from": "2024-01-02T00:00:00Z", "to": "2024-01-03T00:00:00Z"}
+
+        listing = client.get("/orders", params=window, headers=headers)
+        assert [order["item_name"] for order in listing.json()] == ["B"]
+
+        open_ended = client.get("/orders", params={"from": "2024-01-02T00:00:00"}, headers=headers)
+        assert [order["item_name"] for order in open_ended.json()] == ["B", "C"]
+
+        aggregate = client.get("/orders/aggregate", params=window, headers=headers)
+        assert aggregate.json()["count"] == 1
+        assert aggregate.json()["cost"] == {"avg": 20.0, "min": 20.0, "max": 20.0}
+
+        invalid = client.get("/orders/aggregate", params={"from": "yesterday"}, headers=headers)
+        assert invalid.status_code == 422
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def _seed_orders(session_local, n: int):
+    session = session_local()
+    session.add_all(
+        [
+            Order(item_name=f"Item {i}", location="Austin", cost=10.0 + i, delivery_time=30, status="pending")
+            for i in range(n)
+        ]
+    )
+    session.commit()
+    session.close()
+
+
+def test_orders_keyset_pagination():
+    client, session_local, engine = _build_orders_test_client()
+    try:
+        _seed_orders(session_local, 5)
+        headers = {"X-API-Key": "test-key"}
+
+        first = client.get("/orders?limit=2", headers=headers)
+        assert first.status_code == 200
+        assert [order["id"] for order in first.json()] == [1, 2]
+        assert first.headers["X-Next-After-Id"] == "2"
+
+        second = client.get("/orders?limit=2&after_id=2", headers=headers)
+        assert [order["id"] for order in second.json()] == [3, 4]
+
+        last = client.get("/orders?limit=2&after_id=4", headers=headers)
+        assert [order["id"] for order in last.json()] == [5]
+        assert "X-Next-After-Id" not in last.headers
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_id_bounds_and_ranges():
+    client, session_local, engine = _build_orders_test_client()
+    try:
+        headers = {"X-API-Key": "test-key"}
+        assert client.get("/orders/bounds", headers=headers).json() == {"min_id": None, "max_id": None}
+
+        _seed_orders(session_local, 5)
+        assert client.get("/orders/bounds", headers=headers).json() == {"min_id": 1, "max_id": 5}
+        ranged = client.get("/orders?after_id=1&max_id=3", headers=headers)
+        assert [order["id"] for order in ranged.json()] == [2, 3]
+        assert client.get("/orders/bounds?from=2999-01-01T00:00:00", headers=headers).json()["min_id"] is None
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_ndjson_stream_matches_json_listing(monkeypatch):
+    client, session_local, engine = _build_orders_test_client()
+    try:
+        _seed_orders(session_local, 5)
+        monkeypatch.setattr(orders_settings, "STREAM_BATCH_SIZE", 2)
+
+        listing = client.get("/orders", headers={"X-API-Key": "test-key"}).json()
+        streamed = client.get(
+            "/orders",
+            headers={"X-API-Key": "test-key", "Accept": "application/x-ndjson"},
+        )
+
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in streamed.text.splitlines()] == listing
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_change_feed_reports_writes_and_tombstones():
+    client, _session_local, engine = _build_orders_test_client()
+    headers = {"X-API-Key": "test-key"}
+    payload = {"item_name": "Widget", "location": "Austin", "cost": 25.5, "delivery_time": 45, "status": "pending"}
+    try:
+        first_id = client.post("/orders", headers=headers, json=payload).json()["id"]
+        second_id = client.post("/orders", headers=headers, json=payload).json()["id"]
+
+        initial = client.get("/orders/changes?since=0", headers=headers).json()
+        assert [change["id"] for change in initial["changes"]] == [first_id, second_id]
+        assert initial["deleted"] == []
+        assert initial["next_since"] == initial["latest_version"] == 2
+        assert initial["has_more"] is False
+
+        client.patch(f"/orders/{first_id}", headers=headers, json={"status": "delivered"})
+        client.delete(f"/orders/{second_id}", headers=headers)
+
+        delta = client.get("/orders/changes?since=2", headers=headers).json()
+        assert [(c["id"], c["status"], c["version"]) for c in delta["changes"]] == [(first_id, "delivered", 3)]
+        assert delta["deleted"] == [{"id": second_id, "version": 4}]
+        assert delta["next_since"] == 4
+
+        page = client.get("/orders/changes?since=0&limit=1", headers=headers).json()
+        assert page["has_more"] is True
+        assert page["next_since"] == 3
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_bulk_create_json_and_ndjson(monkeypatch):
+    client, _session_local, engine = _build_orders_test_client()
+    headers = {"X-API-Key": "test-key"}
+    payload = {"item_name": "Widget", "location": "Austin", "cost": 25.5, "delivery_time": 45, "status": "pending"}
+    try:
+        created = client.post(
+            "/orders/bulk?chunk_size=2",
+            headers=headers,
+            json=[{**payload, "cost": float(i)} for i in range(5)],
+        )
+        assert created.status_code == 200
+        body = created.json()
+        assert body["created_ids"] == [1, 2, 3, 4, 5]
+        assert [(chunk["start"], chunk["count"], chunk["status"]) for chunk in body["chunks"]] == [
+            (0, 2, "ok"),
+            (2, 2, "ok"),
+            (4, 1, "ok"),
+        ]
+
+        streamed = client.post(
+            "/orders/bulk",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content="\n".join(json.dumps({**payload, "location": "Dallas"}) for _ in range(2)) + "\n",
+        )
+        assert streamed.json()["created_ids"] == [6, 7]
+
+        listing = client.get("/orders", headers=headers).json()
+        assert [order["cost"] for order in listing[:5]] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+        changes = client.get("/orders/changes?since=0", headers=headers).json()
+        assert [change["version"] for change in changes["changes"]] == [1, 2, 3, 4, 5, 6, 7]
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_order_rollups_follow_writes_and_match_rebuild():
+    client, _session_local, engine = _build_orders_test_client()
+    headers = {"X-API-Key": "test-key"}
+    payload = {"item_name": "Widget", "location": "Austin", "cost": 10.0, "delivery_time": 30, "status": "pending"}
+    try:
+        client.post("/orders", headers=headers, json=payload)
+        client.post("/orders", headers=headers, json={**payload, "cost": 20.0, "delivery_time": 50})
+        client.post("/orders/bulk", headers=headers, json=[{**payload, "location": "Dallas"}] * 3)
+        client.patch("/orders/2", headers=headers, json={"status": "delivered", "cost": 25.0})
+        client.delete("/orders/3", headers=headers)
+
+        rollups = client.get("/orders/rollups", headers=headers)
+        assert rollups.status_code == 200
+        totals = {}
+        for row in rollups.json():
+            # Summed over hours in case the test straddles an hour boundary.
+            count, sum_cost, sum_delivery_time = totals.get((row["location"], row["status"]), (0, 0.0, 0))
+            totals[(row["location"], row["status"])] = (
+                count + row["count"],
+                sum_cost + row["sum_cost"],
+                sum_delivery_time + row["sum_delivery_time"],
+            )
+        assert totals == {
+            ("Austin", "delivered"): (1, 25.0, 50),
+            ("Austin", "pending"): (1, 10.0, 30),
+            ("Dallas", "pending"): (2, 20.0, 60),
+        }
+
+        rebuild_rollups(engine)
+        assert client.get("/orders/rollups", headers=headers).json() == rollups.json()
+
+        later = client.get("/orders/rollups?from=2999-01-01T00:00:00Z", headers=headers)
+        assert later.json() == []
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_bulk_create_reports_invalid_rows():
+    client, _session_local, engine = _build_orders_test_client()
+    try:
+        response = client.post(
+            "/orders/bulk",
+            headers={"X-API-Key": "test-key"},
+            json=[
+                {"item_name": "Widget", "location": "Austin", "cost": 25.5, "delivery_time": 45, "status": "pending"},
+                {"item_name": "Widget", "location": "Austin", "cost": 25.5, "delivery_time": "slow", "status": "pending"},
+            ],
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", 1, "delivery_time"]
+        assert client.get("/orders", headers={"X-API-Key": "test-key"}).json() == []
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_bulk_ndjson_errors_and_size_caps(monkeypatch):
+    client, _session_local, engine = _build_orders_test_client()
+    headers = {"X-API-Key": "test-key"}
+    ndjson = {**headers, "Content-Type": "application/x-ndjson"}
+    line = json.dumps({"item_name": "Widget", "location": "Austin", "cost": 1.0, "delivery_time": 5, "status": "pending"})
+    try:
+        # Errors name the physical line, counting the interior blank ones.
+        bad_json = client.post("/orders/bulk", headers=ndjson, content="\n".join([line, "", line, "  ", "{oops"]))
+        assert bad_json.status_code == 422
+        assert bad_json.json()["detail"][0]["loc"] == ["body", 5]
+        invalid = client.post("/orders/bulk", headers=ndjson, content="\n".join([line, "", "", '{"item_name": "Widget"}']))
+        assert invalid.status_code == 422
+        assert {tuple(error["loc"][:2]) for error in invalid.json()["detail"]} == {("body", 4)}
+
+        monkeypatch.setattr(orders_settings, "BULK_MAX_ROWS", 2)
+        too_many = client.post("/orders/bulk", headers=ndjson, content="\n".join([line, line, "{never decoded"]))
+        assert too_many.status_code == 413
+        assert client.post("/orders/bulk", headers=headers, json=[json.loads(line)] * 3).status_code == 413
+
+        monkeypatch.setattr(orders_settings, "BULK_MAX_BYTES", len(line))
+        too_big = client.post("/orders/bulk", headers=ndjson, content=line + "\n" + line)
+        assert too_big.status_code == 413
+        assert client.get("/orders", headers=headers).json() == []
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_insert_orders_non_atomic_keeps_good_chunks():
+    _client, session_local, engine = _build_orders_test_client()
+    payload = {"item_name": "Widget", "location": "Austin", "cost": 25.5, "delivery_time": 45, "status": "pending"}
+    try:
+        orders = [
+            OrderCreate(**payload),
+            OrderCreate.model_construct(**{**payload, "item_name": None}),
+            OrderCreate(**payload),
+        ]
+        session = session_local()
+        result = insert_orders(session, orders, chunk_size=1, atomic=False)
+        session.commit()
+
+        assert [chunk["status"] for chunk in result["chunks"]] == ["ok", "failed", "ok"]
+        assert "NOT NULL" in result["chunks"][1]["error"]
+        assert len(result["created_ids"]) == 2
+        assert session.query(Order).count() == 2
+        session.close()
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_fast_json_path_keeps_wire_contract(monkeypatch):
+    client, session_local, engine = _build_orders_test_client()
+    headers = {"X-API-Key": "test-key"}
+    try:
+        session = session_local()
+        session.add_all(
+            [
+                Order(item_name="Électronique - Souris", location="Montréal", cost=25.5, delivery_time=45, status="pending"),
+                Order(item_name="Widget", location="Austin", cost=10.0, delivery_time=30, status="delivered"),
+                Order(item_name="Gadget", location="Dallas", cost=0.1 + 0.2, delivery_time=120, status="cancelled"),
+            ]
+        )
+        session.commit()
+        session.close()
+
+        responses = {}
+        for fast in (False, True):
+            monkeypatch.setattr(orders_settings, "FAST_ORDERS_JSON", fast)
+            responses[fast] = (
+                client.get("/orders", headers=headers),
+                client.get("/orders?limit=2", headers=headers),
+                client.get("/orders", headers={**headers, "Accept": "application/x-ndjson"}),
+            )
+
+        for slow, fast in zip(responses[False], responses[True]):
+            assert fast.status_code == slow.status_code == 200
+            assert fast.headers["content-type"] == slow.headers["content-type"]
+            assert fast.content == slow.content
+        assert responses[True][1].headers["X-Next-After-Id"] == "2"
+    finally:
+        _cleanup_orders_test_client(engine)
+
+
+def test_orders_conditional_get_follows_table_version():
+    client, session_local, engine = _build_orders_test_client()
+    headers = {"X-API-Key": "test-key"}
+    order = {"item_name": "A", "location": "Austin", "cost": 10.0, "delivery_time": 30, "status": "pending"}
+    try:
+        created = client.post("/orders", json=order, headers=headers).json()
+        first = client.get("/orders", headers=headers)
+        etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+        assert etag.startswith('W/"orders-')
+
+        for path in ("/orders", "/orders?limit=1", "/orders/aggregate"):
+            unchanged = client.get(path, headers={**headers, "If-None-Match": etag})
+            assert unchanged.status_code == 304
+            assert unchanged.content == b""
+            assert unchanged.headers["ETag"] == etag
+        assert client.get("/orders", headers={**headers, "If-Modified-Since": last_modified}).status_code == 304
+
+        client.patch(f"/orders/{created['id']}", json={"status": "delivered"}, headers=headers)
+        changed = client.get("/orders", headers={**headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert changed.json()[0]["status"] == "delivered"
+
+        client.delete(f"/orders/{created['id']}", headers=headers)
+        deleted = client.get("/orders", headers={**headers, "If-None-Match": changed.headers["ETag"]})
+        assert deleted.status_code == 200
+        assert deleted.json() == []
+    finally:
+        _cleanup_orders_test_client(engine)
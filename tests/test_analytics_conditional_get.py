@@ -0,0 +1,46 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from analytics_service.core.conditional import ConditionalGetMiddleware
+
+
+def _client(report: dict) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+
+    @app.get("/report")
+    def get_report():
+        return report
+
+    @app.get("/missing")
+    def get_missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    return TestClient(app)
+
+
+def test_etag_follows_body_and_matching_request_gets_304():
+    report = {"total_orders": 2}
+    client = _client(report)
+
+    first = client.get("/report")
+    etag = first.headers["ETag"]
+    assert first.json() == {"total_orders": 2}
+    assert client.get("/report").headers["ETag"] == etag
+
+    unchanged = client.get("/report", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+
+    report["total_orders"] = 3
+    changed = client.get("/report", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_errors_are_not_tagged():
+    response = _client({}).get("/missing", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
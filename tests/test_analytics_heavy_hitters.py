@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import pytest
+from pydantic import ValidationError
+
+from analytics_service.calculations import (
+    SpaceSavingCounter,
+    top_locations_with_counts,
+    top_locations_with_counts_approximate,
+)
+from analytics_service.columnar import OrderBatch
+from analytics_service.core.config import Settings
+
+
+def _skewed_locations(n: int, distinct: int, seed: int = 3) -> list[str]:
+    rng = random.Random(seed)
+    # A handful of busy locations over a long tail of one-off addresses.
+    hot = [f"Hub {i}" for i in range(5)]
+    return [
+        rng.choice(hot) if rng.random() < 0.4 else f"{rng.randrange(distinct)} Main St"
+        for _ in range(n)
+    ]
+
+
+def test_matches_exact_counts_below_capacity():
+    orders = [{"location": location} for location in _skewed_locations(2_000, distinct=50)]
+
+    approximate = top_locations_with_counts_approximate(orders, top_n=5, capacity=100)
+
+    assert [{"location": row["location"], "count": row["count"]} for row in approximate] == (
+        top_locations_with_counts(orders, top_n=5)
+    )
+    assert all(row["error"] == 0 for row in approximate)
+
+
+def test_error_bounds_hold_at_high_cardinality():
+    locations = _skewed_locations(50_000, distinct=100_000)
+    exact = Counter(locations)
+    counter = SpaceSavingCounter(capacity=200)
+    counter.update(locations)
+
+    assert len(counter) == 200
+    assert counter.max_error <= len(locations) / 200
+    for location, count, error in counter.most_common(5):
+        assert count - error <= exact[location] <= count
+    assert {location for location, _, _ in counter.most_common(5)} == {f"Hub {i}" for i in range(5)}
+    for location, true_count in exact.items():
+        if location not in counter.counts:
+            assert true_count <= counter.max_error
+
+
+def test_order_batch_approximate_locations():
+    orders = [
+        {"location": location, "cost": 10.0, "delivery_time": 30, "status": "pending"}
+        for location in _skewed_locations(5_000, distinct=10_000)
+    ]
+
+    batch = OrderBatch.from_orders(orders, location_capacity=50)
+
+    assert batch.approximate_locations
+    assert batch.locations == []
+    assert batch.top_locations_with_counts(top_n=3) == top_locations_with_counts_approximate(
+        orders, top_n=3, capacity=50
+    )
+    assert batch.top_locations(top_n=3) == [row["location"] for row in batch.top_locations_with_counts(top_n=3)]
+    assert batch.status_breakdown() == {"pending": 5_000}
+
+
+def test_non_positive_capacity_is_rejected_at_startup():
+    for capacity in (0, -5):
+        with pytest.raises(ValidationError):
+            Settings(TOP_LOCATIONS_CAPACITY=capacity)
+    assert Settings(TOP_LOCATIONS_CAPACITY=1).TOP_LOCATIONS_CAPACITY == 1
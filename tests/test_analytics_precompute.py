@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import analytics_service.main as analytics_main
+import analytics_service.rate_limiter as rate_limiter
+import analytics_service.routers.analytics as analytics_router
+from analytics_service.core.config import settings
+from analytics_service.core.http_client import get_http_client
+from analytics_service.precompute import PrecomputedViews, Precomputer
+from analytics_service.schemas import AnalyticsSummary, LocationBreakdown, LocationCount, StatusBreakdown
+
+
+def _views(total_orders: int = 3, computed_at: float | None = None) -> PrecomputedViews:
+    return PrecomputedViews(
+        computed_at=time.monotonic() if computed_at is None else computed_at,
+        summary=AnalyticsSummary(
+            total_orders=total_orders, average_delivery_time=30.0, average_cost=10.0, top_locations=["Austin"]
+        ),
+        status_breakdown=StatusBreakdown(statuses={"delivered": total_orders}),
+        location_breakdown=LocationBreakdown(
+            top_locations=[LocationCount(location="Austin", count=2), LocationCount(location="Dallas", count=1)]
+        ),
+        distribution=None,
+    )
+
+
+def test_failed_refresh_keeps_the_last_published_views():
+    precomputer = Precomputer(interval=1.0)
+    results = [_views(1), RuntimeError("orders down"), _views(2)]
+
+    async def compute():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def run():
+        await precomputer.refresh(compute)
+        with pytest.raises(RuntimeError):
+            await precomputer.refresh(compute)
+        assert precomputer.views.summary.total_orders == 1
+        await precomputer.refresh(compute)
+
+    asyncio.run(run())
+    assert precomputer.views.summary.total_orders == 2
+    assert precomputer.current(max_age=60) is precomputer.views
+    assert Precomputer(interval=1.0).current(max_age=60) is None
+
+
+def test_views_older_than_max_age_are_not_served():
+    precomputer = Precomputer(interval=1.0)
+    precomputer.views = _views(computed_at=time.monotonic() - 120)
+
+    assert precomputer.current(max_age=60) is None
+    assert precomputer.current(max_age=300) is precomputer.views
+
+
+def test_schedule_jitter_stays_within_bounds():
+    precomputer = Precomputer(interval=10.0, jitter=0.2, rng=random.Random(5))
+    delays = [precomputer.next_delay() for _ in range(200)]
+
+    assert all(8.0 <= delay <= 12.0 for delay in delays)
+    assert len(set(delays)) > 100
+
+
+def test_background_task_refreshes_until_stopped():
+    precomputer = Precomputer(interval=0.01)
+    calls = []
+
+    async def compute():
+        calls.append(time.monotonic())
+        if len(calls) == 2:
+            raise RuntimeError("one failed refresh")
+        return _views(len(calls))
+
+    async def run():
+        precomputer.start(compute)
+        while len(calls) < 4:
+            await asyncio.sleep(0.005)
+        assert precomputer.running
+        await precomputer.stop()
+
+    asyncio.run(run())
+    assert not precomputer.running
+    assert precomputer.views is None
+    assert precomputer.counters["errors"] == 1
+    assert precomputer.counters["refreshes"] >= 3
+
+
+def test_routes_answer_from_precomputed_views_without_upstream(monkeypatch):
+    upstream_calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream_calls.append(request)
+        return httpx.Response(
+            200, json=[{"id": 1, "cost": 5.0, "delivery_time": 10, "location": "Reno", "status": "pending"}]
+        )
+
+    precomputer = Precomputer(interval=30.0)
+    precomputer.views = _views(computed_at=time.monotonic() - 7.5)
+    monkeypatch.setattr(analytics_router, "precomputer", precomputer)
+    monkeypatch.setattr(settings, "PRECOMPUTE_INTERVAL", 30.0)
+    monkeypatch.setattr(settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(settings, "ORDERS_TRANSPORT", "json")
+    rate_limiter._rate_limit_store.clear()
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app = FastAPI()
+    app.include_router(analytics_router.router)
+
+    async def override_http_client():
+        return upstream
+
+    app.dependency_overrides[get_http_client] = override_http_client
+    headers = {"X-API-Key": settings.ORDERS_API_KEY}
+
+    with TestClient(app) as client:
+        summary = client.get("/analytics/summary", headers=headers)
+        locations = client.get("/analytics/location-breakdown?limit=1", headers=headers)
+        dashboard = client.get("/analytics/dashboard", headers=headers)
+        assert not upstream_calls
+        # Ranged requests and views that were not precomputed go upstream.
+        ranged = client.get("/analytics/summary?from=2024-01-01T00:00:00", headers=headers)
+        distribution = client.get("/analytics/distribution", headers=headers)
+
+    asyncio.run(upstream.aclose())
+
+    assert summary.json()["total_orders"] == 3
+    assert summary.headers["Age"] == "7"
+    assert locations.json() == {"top_locations": [{"location": "Austin", "count": 2}]}
+    assert dashboard.json()["status_breakdown"] == {"statuses": {"delivered": 3}}
+    assert dashboard.headers["Age"] == "7"
+    assert ranged.json()["top_locations"] == ["Reno"] and "Age" not in ranged.headers
+    assert distribution.json()["overall"]["count"] == 1
+    assert len(upstream_calls) == 2
+
+
+def test_app_starts_and_stops_the_scheduler(monkeypatch):
+    precomputer = Precomputer(interval=0.01)
+    computed = []
+
+    async def fake_precompute_views(client: httpx.AsyncClient) -> PrecomputedViews:
+        computed.append(client)
+        return _views()
+
+    monkeypatch.setattr(analytics_main, "precomputer", precomputer)
+    monkeypatch.setattr(analytics_main, "precompute_views", fake_precompute_views)
+    monkeypatch.setattr(settings, "PRECOMPUTE_INTERVAL", 0.01)
+
+    with TestClient(analytics_main.app):
+        deadline = time.monotonic() + 5
+        while not computed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert precomputer.running
+
+    assert computed and isinstance(computed[0], httpx.AsyncClient)
+    assert not precomputer.running
@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from analytics_service.calculations import QuantileSketch, RunningAggregates
+from analytics_service.columnar import OrderBatch
+
+
+def _synthetic_orders(n: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "location": rng.choice(["Birmingham", "Hoover", "Pelham", None]),
+            "cost": round(rng.lognormvariate(3, 1), 2),
+            "delivery_time": rng.randint(15, 120),
+            "status": rng.choice(["delivered", "pending", None]),
+        }
+        for i in range(n)
+    ]
+
+
+def test_quantiles_stay_within_relative_accuracy():
+    values = np.random.default_rng(3).lognormal(3, 1.5, 50_000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add_array(values)
+
+    for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_merged_sketches_equal_one_pass_and_removal_undoes_add():
+    values = np.random.default_rng(5).uniform(1, 500, 10_000)
+    whole = QuantileSketch()
+    whole.add_array(values)
+
+    left, right = QuantileSketch(), QuantileSketch()
+    left.add_array(values[:4_000])
+    for value in values[4_000:]:
+        right.add(float(value))
+    left.merge(right)
+    assert left.buckets == whole.buckets
+    assert left.count == whole.count
+
+    for value in values[4_000:]:
+        left.add(float(value), -1)
+    assert left.count == 4_000
+    assert left.quantile(0.5) == pytest.approx(np.quantile(values[:4_000], 0.5, method="lower"), rel=0.01)
+
+
+def test_bucket_count_is_bounded():
+    sketch = QuantileSketch(max_buckets=64)
+    sketch.add_array(np.geomspace(1e-3, 1e6, 100_000))
+    sketch.add(1e-6)
+
+    assert len(sketch.buckets) <= 64
+    # The top of the range keeps full accuracy.
+    assert sketch.quantile(1.0) == pytest.approx(1e6, rel=0.01)
+
+
+def test_batch_and_running_distributions_match():
+    orders = _synthetic_orders(2_000)
+    running = RunningAggregates()
+    for order in orders:
+        running.upsert(order)
+    # Updates and deletes are backed out of the running sketches.
+    for order in orders[:500]:
+        running.upsert({**order, "cost": order["cost"] * 3, "location": "Hoover"})
+    for order in orders[500:700]:
+        running.delete(order["id"])
+
+    current = [
+        {**order, "cost": order["cost"] * 3, "location": "Hoover"} for order in orders[:500]
+    ] + orders[700:]
+    quantiles = (0.5, 0.9, 0.99)
+
+    running_report = running.distribution.report(quantiles)
+    batch_report = OrderBatch.from_orders(current).distribution.report(quantiles)
+
+    groups = [("overall", None)] + [("by_location", key) for key in batch_report["by_location"]] + [
+        ("by_status", key) for key in batch_report["by_status"]
+    ]
+    assert running_report["by_location"].keys() == batch_report["by_location"].keys()
+    assert running_report["by_status"].keys() == batch_report["by_status"].keys()
+    for section, key in groups:
+        expected = batch_report[section] if key is None else batch_report[section][key]
+        actual = running_report[section] if key is None else running_report[section][key]
+        assert actual["count"] == expected["count"]
+        for field in ("delivery_time", "cost"):
+            # Same buckets up to float rounding in the vectorized log.
+            assert actual[field] == pytest.approx(expected[field], rel=0.03)
@@ -0,0 +1,103 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pytest
+from fastapi import HTTPException
+
+import analytics_service.rate_limiter as rate_limiter
+from analytics_service.rate_limiter import MemoryBackend, SQLiteBackend, sliding_window_hit
+
+
+def _run(entry, times, limit=10, window=60):
+    allowed = 0
+    for now in times:
+        entry, retry_after = sliding_window_hit(entry, now, limit, window)
+        allowed += retry_after is None
+    return entry, allowed
+
+
+def test_sliding_window_blocks_burst_across_window_edge():
+    # A fixed window would allow 10 just before the edge and 10 just after.
+    entry, before_edge = _run(None, [59.0] * 10)
+    entry, after_edge = _run(entry, [61.0] * 10)
+
+    assert before_edge == 10
+    assert after_edge == 0
+
+
+def test_sliding_window_reports_time_until_next_slot():
+    entry, _ = _run(None, [59.0] * 10)
+    _entry, retry_after = sliding_window_hit(entry, 61.0, 10, 60)
+
+    # The previous window must decay to 9 requests: 1 - 9/10 of the new window.
+    assert retry_after == pytest.approx(5.0)
+    _, allowed = _run(entry, [66.01])
+    assert allowed == 1
+
+
+def test_memory_backend_evicts_idle_and_excess_keys():
+    store = OrderedDict()
+    backend = MemoryBackend(store, max_keys=3)
+
+    for index, key in enumerate(["a", "b", "c", "d"]):
+        backend.hit(key, float(index), 10, 60)
+    assert list(store) == ["b", "c", "d"]
+
+    backend.hit("b", 500.0, 10, 60)
+    assert list(store) == ["b"]
+
+
+def test_memory_backend_is_safe_under_concurrent_hits():
+    # Switch threads as often as possible to make interleavings likely.
+    previous = sys.getswitchinterval()
+    store = OrderedDict()
+    backend = MemoryBackend(store, max_keys=50)
+    errors = []
+
+    def worker(thread: int):
+        try:
+            for index in range(2_000):
+                # Far apart in time, so every hit also evicts idle keys.
+                backend.hit(f"key-{thread}-{index % 200}", float(index * 10), 10, 60)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(thread,)) for thread in range(8)]
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(previous)
+
+    assert errors == []
+    assert len(store) <= 50 + 8
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+
+    results = [backend.hit("key", 30.0, 3, 60) for backend in (first, second, first, second)]
+
+    assert results[:3] == [None, None, None]
+    assert results[3] is not None
+
+
+def test_rate_limit_dependency_raises_429_with_retry_after(monkeypatch):
+    rate_limiter._rate_limit_store.clear()
+    monkeypatch.setattr(rate_limiter, "REQUEST_LIMIT", 2)
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: 120.0)
+
+    rate_limiter.rate_limit_dependency("key")
+    rate_limiter.rate_limit_dependency("key")
+    with pytest.raises(HTTPException) as exc:
+        rate_limiter.rate_limit_dependency("key")
+    rate_limiter._rate_limit_store.clear()
+
+    assert exc.value.status_code == 429
+    # Two requests at the start of a window only decay enough halfway into the next.
+    assert exc.value.headers == {"Retry-After": "90"}
@@ -1,11 +1,20 @@
 import asyncio
+import random
+import time
 
 import httpx
 import pytest
 from fastapi import HTTPException
 
 import analytics_service.routers.analytics as analytics_router
+from analytics_service.cache import ValidatorCache
 from analytics_service.core.config import settings
+from analytics_service.resilience import CircuitBreaker, LatencyTracker, backoff_delay
+
+
+async def _fetch(transport: httpx.MockTransport):
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await analytics_router.fetch_orders(client)
 
 
 def test_fetch_orders_retries_with_exponential_backoff(monkeypatch):
@@ -23,6 +32,7 @@ def test_fetch_orders_retries_with_exponential_backoff(monkeypatch):
     monkeypatch.setattr(settings, "MAX_RETRIES", 4)
     monkeypatch.setattr(settings, "INITIAL_BACKOFF", 0.25)
     monkeypatch.setattr(analytics_router.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(analytics_router, "orders_breaker", CircuitBreaker(5, 30.0))
 
     client = httpx.AsyncClient(transport=httpx.MockTransport(failing_handler))
 
@@ -35,3 +45,179 @@ def test_fetch_orders_retries_with_exponential_backoff(monkeypatch):
     assert "Orders service network error" in exc.value.detail
     assert attempts["count"] == 4
     assert sleep_calls == [0.25, 0.5, 1.0]
+
+
+@pytest.fixture
+def clock():
+    now = [0.0]
+    return now
+
+
+def test_circuit_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=lambda: clock[0])
+
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED  # a success resets the count
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    assert breaker.retry_after == 10.0
+
+    clock[0] = 10.0
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.retry_after == 10.0
+
+    clock[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow() and breaker.allow()
+
+
+def test_disabled_circuit_breaker_always_allows():
+    breaker = CircuitBreaker(failure_threshold=0, reset_timeout=10.0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow() and breaker.state == CircuitBreaker.CLOSED
+
+
+def test_full_jitter_stays_within_the_backoff():
+    rng = random.Random(3)
+    delays = [backoff_delay(0.5, "full", rng) for _ in range(200)]
+
+    assert all(0 <= delay <= 0.5 for delay in delays)
+    assert len(set(delays)) > 100
+    assert backoff_delay(0.5, "none") == 0.5
+
+
+def test_jittered_retries_sleep_less_than_the_backoff(monkeypatch):
+    sleep_calls = []
+
+    async def fake_sleep(delay: float):
+        sleep_calls.append(delay)
+
+    def failing_handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    monkeypatch.setattr(settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(settings, "MAX_RETRIES", 4)
+    monkeypatch.setattr(settings, "INITIAL_BACKOFF", 0.25)
+    monkeypatch.setattr(settings, "BACKOFF_JITTER", "full")
+    monkeypatch.setattr(analytics_router, "orders_breaker", CircuitBreaker(0, 30.0))
+    monkeypatch.setattr(analytics_router.asyncio, "sleep", fake_sleep)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(_fetch(httpx.MockTransport(failing_handler)))
+
+    assert len(sleep_calls) == 3
+    assert all(0 <= delay <= cap for delay, cap in zip(sleep_calls, [0.25, 0.5, 1.0]))
+
+
+def test_slow_request_is_hedged_and_the_fast_reply_wins(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+            return httpx.Response(200, json=[{"id": "slow"}])
+        return httpx.Response(200, json=[{"id": "fast"}])
+
+    tracker = LatencyTracker()
+    for _ in range(20):
+        tracker.add(0.01)
+    monkeypatch.setattr(settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(settings, "HEDGE_REQUESTS", True)
+    monkeypatch.setattr(analytics_router, "upstream_latency", {"orders": tracker})
+    monkeypatch.setattr(analytics_router, "orders_breaker", CircuitBreaker(5, 30.0))
+
+    started = time.perf_counter()
+    assert asyncio.run(_fetch(httpx.MockTransport(handler))) == [{"id": "fast"}]
+    assert time.perf_counter() - started < 1
+    assert len(calls) == 2
+
+
+def test_hedging_waits_for_enough_samples(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_REQUESTS", True)
+    monkeypatch.setattr(analytics_router, "upstream_latency", {"orders": LatencyTracker()})
+
+    assert analytics_router._hedge_delay("orders") is None
+    for _ in range(settings.HEDGE_MIN_SAMPLES):
+        analytics_router.upstream_latency["orders"].add(0.2)
+    assert analytics_router._hedge_delay("orders") == 0.2
+
+
+def test_open_circuit_serves_last_good_body_or_fails_fast(monkeypatch, clock):
+    responses = {"status": 200}
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(responses["status"], json=[{"id": 1}], headers={"ETag": 'W/"orders-1-0"'})
+
+    async def no_sleep(delay: float):
+        pass
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0, clock=lambda: clock[0])
+    monkeypatch.setattr(settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(settings, "MAX_RETRIES", 2)
+    monkeypatch.setattr(analytics_router, "orders_breaker", breaker)
+    monkeypatch.setattr(analytics_router, "upstream_validators", ValidatorCache())
+    monkeypatch.setattr(analytics_router.asyncio, "sleep", no_sleep)
+    transport = httpx.MockTransport(handler)
+
+    assert asyncio.run(_fetch(transport)) == [{"id": 1}]
+    responses["status"] = 503
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(_fetch(transport))
+    assert exc.value.status_code == 502 and breaker.state == CircuitBreaker.OPEN
+    sent = len(calls)
+
+    # Open: the stored body is served without calling orders_service...
+    assert asyncio.run(_fetch(transport)) == [{"id": 1}]
+    # ...or, without stale serving, a 503 tells the caller when to come back.
+    monkeypatch.setattr(settings, "CIRCUIT_SERVE_STALE", False)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(_fetch(transport))
+    assert exc.value.status_code == 503 and exc.value.headers["Retry-After"] == "30"
+    assert len(calls) == sent
+
+    # After the reset timeout one probe goes through and closes the circuit.
+    clock[0] = 30.0
+    responses["status"] = 200
+    assert asyncio.run(_fetch(transport)) == [{"id": 1}]
+    assert breaker.state == CircuitBreaker.CLOSED and len(calls) == sent + 1
+
+
+def test_cancelled_half_open_probe_is_released(monkeypatch, clock):
+    started = asyncio.Event()
+
+    async def hanging_handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(60)
+        return httpx.Response(200, json=[])
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, clock=lambda: clock[0])
+    breaker.record_failure()
+    monkeypatch.setattr(settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_router, "orders_breaker", breaker)
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(_fetch(httpx.MockTransport(hanging_handler)))
+        await started.wait()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    clock[0] = 30.0
+    asyncio.run(cancel_probe())
+
+    # The abandoned probe counts as failed: open again, then probed later.
+    assert breaker.state == CircuitBreaker.OPEN and breaker.retry_after == 30.0
+    clock[0] = 100.0
+    assert asyncio.run(_fetch(httpx.MockTransport(lambda request: httpx.Response(200, json=[])))) == []
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+import analytics_service.cache as cache_module
+import analytics_service.routers.analytics as analytics_router
+from analytics_service.cache import SnapshotCache
+from analytics_service.core.config import settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_concurrent_misses_share_one_upstream_request(monkeypatch):
+    upstream_calls = {"count": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        upstream_calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[{"id": 1, "cost": 10.0}])
+
+    monkeypatch.setattr(settings, "ORDERS_API_URL", "http://orders.local/orders")
+    monkeypatch.setattr(analytics_router, "orders_cache", SnapshotCache(ttl=0))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.gather(
+                *(analytics_router.get_orders_snapshot(client) for _ in range(10))
+            )
+
+    results = asyncio.run(run())
+
+    assert upstream_calls["count"] == 1
+    assert all(result == [{"id": 1, "cost": 10.0}] for result in results)
+    assert analytics_router.orders_cache.counters["misses"] == 1
+    assert analytics_router.orders_cache.counters["coalesced"] == 9
+
+
+def test_cache_hits_until_ttl_then_refetches(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    cache = SnapshotCache(ttl=5)
+    loads = []
+
+    async def loader():
+        loads.append(clock.now)
+        return len(loads)
+
+    async def run():
+        first = await cache.get("orders", loader)
+        clock.now += 4
+        second = await cache.get("orders", loader)
+        clock.now += 2
+        third = await cache.get("orders", loader)
+        return first, second, third
+
+    assert asyncio.run(run()) == (1, 1, 2)
+    assert cache.counters["hits"] == 1
+    assert cache.counters["misses"] == 2
+
+
+def test_stale_entry_is_served_while_refreshing(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    cache = SnapshotCache(ttl=5, stale_ttl=30)
+    loads = []
+
+    async def loader():
+        loads.append(clock.now)
+        return len(loads)
+
+    async def run():
+        await cache.get("orders", loader)
+        clock.now += 10
+        stale = await cache.get("orders", loader)
+        await asyncio.sleep(0)
+        refreshed = await cache.get("orders", loader)
+        return stale, refreshed
+
+    assert asyncio.run(run()) == (1, 2)
+    assert cache.counters["stale_hits"] == 1
+    assert cache.counters["hits"] == 1
+    assert len(loads) == 2
+
+
+def test_cache_evicts_least_recently_used_key():
+    cache = SnapshotCache(ttl=60, max_entries=2)
+
+    async def run():
+        for key in ("a", "b", "a", "c"):
+            await cache.get(key, lambda key=key: asyncio.sleep(0, result=key))
+
+    asyncio.run(run())
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.counters["evictions"] == 1
@@ -0,0 +1,25 @@
+from benchmarks.suite import build_cases, compare, run_suite, synthetic_orders
+
+
+def _results(**cases) -> dict:
+    return {"results": {key: {"seconds": seconds, "peak_bytes": peak} for key, (seconds, peak) in cases.items()}}
+
+
+def test_compare_flags_time_and_memory_regressions_above_noise_floor():
+    baseline = _results(slow=(0.10, 1000), fat=(0.10, 1000), noisy=(0.0001, 1000), steady=(0.10, 1000))
+    current = _results(slow=(0.12, 1000), fat=(0.10, 1300), noisy=(0.0005, 1000), steady=(0.105, 1000), new=(1, 1))
+
+    rows = {row["case"]: row for row in compare(baseline, current, threshold=0.10)}
+
+    assert rows.keys() == {"slow", "fat", "noisy", "steady"}
+    assert rows["slow"]["regressed"] and rows["fat"]["regressed"]
+    assert not rows["noisy"]["regressed"] and not rows["steady"]["regressed"]
+
+
+def test_suite_runs_every_case_deterministically():
+    assert synthetic_orders(50, seed=4) == synthetic_orders(50, seed=4)
+
+    results = run_suite([200], repeat=1)["results"]
+
+    assert set(results) == {f"{name}@200" for name in build_cases(synthetic_orders(10))}
+    assert all(result["rows"] == 200 and result["peak_bytes"] > 0 for result in results.values())
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from analytics_service.calculations import (
+    average_cost,
+    average_delivery_time,
+    status_breakdown,
+    top_locations,
+    top_locations_with_counts,
+)
+from analytics_service.columnar import OrderBatch
+
+
+def _synthetic_orders(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    locations = ["Birmingham", "Hoover", "Homewood", "Pelham", "", None]
+    statuses = ["delivered", "pending", "cancelled", None]
+    return [
+        {
+            "id": i,
+            "item_name": f"Item {i}",
+            "location": rng.choice(locations),
+            "cost": round(rng.uniform(10, 500), 2),
+            "delivery_time": rng.randint(15, 120),
+            "status": rng.choice(statuses),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 2_000])
+def test_order_batch_matches_reference_functions(n):
+    orders = _synthetic_orders(n)
+    batch = OrderBatch.from_orders(orders)
+
+    assert len(batch) == n
+    assert batch.average_delivery_time() == pytest.approx(average_delivery_time(orders))
+    assert batch.average_cost() == pytest.approx(average_cost(orders))
+    assert batch.status_breakdown() == status_breakdown(orders)
+    assert list(batch.status_breakdown()) == list(status_breakdown(orders))
+    for top_n in (1, 3, 10):
+        assert batch.top_locations(top_n) == top_locations(orders, top_n)
+        assert batch.top_locations_with_counts(top_n) == top_locations_with_counts(orders, top_n)
+
+
+def test_order_batch_breaks_ties_in_first_seen_order():
+    orders = [
+        {"location": "Dallas", "status": "pending", "cost": 1, "delivery_time": 1},
+        {"location": "Austin", "status": "delivered", "cost": 1, "delivery_time": 1},
+        {"location": "Austin", "status": "delivered", "cost": 1, "delivery_time": 1},
+        {"location": "Dallas", "status": "pending", "cost": 1, "delivery_time": 1},
+    ]
+    batch = OrderBatch.from_orders(orders)
+
+    assert batch.top_locations(2) == top_locations(orders, 2) == ["Dallas", "Austin"]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from analytics_service.columnar import OrderBatch, concat_order_columns, decode_order_arrow, decode_order_columns
+from orders_service.columnar_wire import encode_order_arrow, encode_order_columns
+from orders_service.fast_json import ORDER_READ_FIELDS
+
+ORDERS = [
+    {"id": 1, "item_name": "Lamp", "location": "Hoover", "cost": 12.5, "delivery_time": 30, "status": "pending"},
+    {"id": 2, "item_name": "Desk", "location": "Pelham", "cost": 99.0, "delivery_time": 45, "status": "delivered"},
+    {"id": 5, "item_name": "Lamp", "location": "Hoover", "cost": 7.25, "delivery_time": 20, "status": "delivered"},
+    {"id": 9, "item_name": "Chair", "location": "Birmingham", "cost": 40.0, "delivery_time": 60, "status": "pending"},
+]
+ROWS = [tuple(order[field] for field in ORDER_READ_FIELDS) for order in ORDERS]
+
+
+def _summary(batch: OrderBatch) -> tuple:
+    return (
+        batch.average_cost(),
+        batch.average_delivery_time(),
+        batch.top_locations_with_counts(top_n=5),
+        batch.status_breakdown(),
+        batch.distribution.report(),
+    )
+
+
+def test_struct_packed_columns_are_aligned_views_of_the_body():
+    body = encode_order_columns(ROWS)
+    columns = decode_order_columns(body)
+
+    assert columns["id"].tolist() == [1, 2, 5, 9]
+    assert columns["location"] == ["Hoover", "Pelham", "Birmingham"]
+    assert columns["location_codes"].tolist() == [0, 1, 0, 2]
+    assert columns["item_name"] == ["Lamp", "Desk", "Chair"]
+    # Zero-copy: the arrays are views into the body, at 8-byte aligned offsets.
+    base = np.frombuffer(body, np.uint8)
+    for name in ("id", "cost", "delivery_time", "item_name_codes", "location_codes", "status_codes"):
+        assert np.shares_memory(columns[name], base)
+        assert (columns[name].ctypes.data - base.ctypes.data) % 8 == 0
+
+
+def test_batches_from_every_format_match_json_rows():
+    expected = _summary(OrderBatch.from_orders(ORDERS))
+
+    assert _summary(OrderBatch.from_columns(decode_order_columns(encode_order_columns(ROWS)))) == expected
+    approximate = OrderBatch.from_columns(decode_order_columns(encode_order_columns(ROWS)), location_capacity=2)
+    assert approximate.top_locations_with_counts(top_n=1) == (
+        OrderBatch.from_orders(ORDERS, location_capacity=2).top_locations_with_counts(top_n=1)
+    )
+
+    pytest.importorskip("pyarrow")
+    assert _summary(OrderBatch.from_columns(decode_order_arrow(encode_order_arrow(ROWS)))) == expected
+
+
+def test_empty_and_malformed_bodies():
+    empty = decode_order_columns(encode_order_columns([]))
+    assert len(OrderBatch.from_columns(empty)) == 0
+    assert empty["location"] == []
+
+    body = encode_order_columns(ROWS)
+    with pytest.raises(ValueError):
+        decode_order_columns(body[:-8])
+    with pytest.raises(ValueError):
+        decode_order_columns(body[:10])
+    with pytest.raises(ValueError):
+        decode_order_columns(b"JSON" + body[4:])
+
+
+def test_concatenated_partitions_equal_the_whole_body():
+    whole = decode_order_columns(encode_order_columns(ROWS))
+    parts = [decode_order_columns(encode_order_columns(rows)) for rows in (ROWS[:1], [], ROWS[1:3], ROWS[3:])]
+    merged = concat_order_columns(parts)
+
+    assert merged.keys() == whole.keys()
+    for name, column in whole.items():
+        assert (merged[name] if isinstance(column, list) else merged[name].tolist()) == (
+            column if isinstance(column, list) else column.tolist()
+        )
+    assert _summary(OrderBatch.from_columns(merged)) == _summary(OrderBatch.from_columns(whole))
+    assert len(OrderBatch.from_columns(concat_order_columns([]))) == 0
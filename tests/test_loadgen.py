@@ -0,0 +1,49 @@
+import pytest
+
+import analytics_service.rate_limiter as rate_limiter
+from analytics_service.core.config import settings as analytics_settings
+from benchmarks.loadgen import latency_percentiles, parse_mix, run_load_test
+
+
+def test_parse_mix_reads_weights_and_query_strings():
+    targets = parse_mix("analytics:/analytics/summary=3, orders:/orders?limit=10=0.5,orders:/orders")
+
+    assert [(t.service, t.path, t.weight) for t in targets] == [
+        ("analytics", "/analytics/summary", 3.0),
+        ("orders", "/orders?limit=10", 0.5),
+        ("orders", "/orders", 1.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_mix("gateway:/orders=1")
+
+
+def test_latency_percentiles_in_milliseconds():
+    result = latency_percentiles([i / 1000 for i in range(1, 101)])
+
+    assert result["p50_ms"] == pytest.approx(50.5)
+    assert result["p99_ms"] == pytest.approx(99.01)
+    assert result["max_ms"] == pytest.approx(100)
+
+
+def test_reports_rate_limited_and_upstream_failures_per_endpoint():
+    url, limit = analytics_settings.ORDERS_API_URL, rate_limiter.REQUEST_LIMIT
+    mix = "analytics:/analytics/summary=1,orders:/orders?limit=5=1"
+
+    limited = run_load_test(rows=200, requests=40, concurrency=4, mix=mix, rate_limit=10)
+    failing = run_load_test(
+        rows=200, requests=20, concurrency=4, mix=mix, upstream_error_rate=1.0, max_retries=1
+    )
+
+    summary, orders = "analytics /analytics/summary", "orders /orders?limit=5"
+    assert limited["total"]["requests"] == 40
+    assert limited["endpoints"][summary]["statuses"].get("200") == 10
+    assert limited["endpoints"][summary]["statuses"]["429"] == limited["endpoints"][summary]["requests"] - 10
+    assert limited["endpoints"][orders]["error_rate"] == 0.0
+    # Once the circuit opens, failing fetches turn from 502s into fast 503s.
+    failed = failing["endpoints"][summary]
+    assert failed["upstream_error_rate"] + failed["circuit_open_rate"] == pytest.approx(1.0)
+    assert failed["circuit_open_rate"] > 0 and failing["circuit"]["state"] == "open"
+    assert failing["endpoints"][orders]["statuses"] == {"200": failing["endpoints"][orders]["requests"]}
+    assert limited["total"]["p50_ms"] <= limited["total"]["p99_ms"]
+    # Module state is put back for the rest of the process.
+    assert (analytics_settings.ORDERS_API_URL, rate_limiter.REQUEST_LIMIT) == (url, limit)
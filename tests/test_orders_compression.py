@@ -0,0 +1,86 @@
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from orders_service.compression import COMPRESSORS, CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = b'{"location": "Birmingham", "status": "delivered"}' * 100
+
+
+def _client(encodings=("zstd", "br", "gzip"), minimum_size=1024) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=list(encodings),
+        minimum_size=minimum_size,
+        levels={"gzip": 1, "zstd": 3, "br": 4},
+    )
+
+    @app.get("/big")
+    def big():
+        return Response(PAYLOAD, media_type="application/json", headers={"ETag": 'W/"v1"'})
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((PAYLOAD for _ in range(3)), media_type="application/x-ndjson")
+
+    @app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": 'W/"v1"'})
+
+    return TestClient(app)
+
+
+def test_negotiation_honours_q_values_then_server_preference():
+    encodings = ["zstd", "br", "gzip"]
+
+    assert negotiate_encoding("gzip, br", encodings) == "br"
+    assert negotiate_encoding("zstd;q=0.5, gzip", encodings) == "gzip"
+    assert negotiate_encoding("*;q=0.1, gzip;q=0", encodings) == "zstd"
+    assert negotiate_encoding("identity", encodings) is None
+    assert negotiate_encoding("", encodings) is None
+
+
+def test_large_bodies_are_compressed_and_small_ones_left_alone():
+    client = _client(encodings=["gzip"])
+
+    raw = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.headers["vary"] == "Accept-Encoding"
+    assert raw.headers["etag"] == 'W/"v1"'
+    assert int(raw.headers["content-length"]) < len(PAYLOAD)
+    assert raw.content == PAYLOAD  # decoded by httpx
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ok": True}
+
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    assert client.get("/not-modified", headers={"Accept-Encoding": "gzip"}).status_code == 304
+
+
+@pytest.mark.parametrize("encoding", sorted(COMPRESSORS))
+def test_streamed_bodies_decode_with_every_available_encoding(encoding):
+    response = _client().get("/stream", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert "content-length" not in response.headers
+    assert response.content == PAYLOAD * 3
+
+
+def test_streamed_gzip_chunks_flush_complete_lines():
+    compressor = COMPRESSORS["gzip"](1)
+    first = compressor.compress(PAYLOAD, final=False)
+
+    # Everything sent so far decodes without waiting for the end of the stream.
+    assert zlib.decompressobj(31).decompress(first) == PAYLOAD
+    rest = compressor.compress(b"", final=True)
+    assert httpx.Response(200, headers={"Content-Encoding": "gzip"}, content=first + rest).content == PAYLOAD
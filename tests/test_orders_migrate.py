@@ -0,0 +1,48 @@
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+from orders_service.changes import read_changes
+from orders_service.migrate import migrate_orders
+from orders_service.models import Order, OrderChangeCounter
+
+
+def _legacy_engine(tmp_path):
+    # The orders table as the first release created it.
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, item_name VARCHAR NOT NULL, location VARCHAR, "
+            "cost FLOAT, delivery_time INTEGER, status VARCHAR, created_at DATETIME)"
+        )
+        for order_id in (3, 1, 2):
+            conn.exec_driver_sql(
+                "INSERT INTO orders VALUES (?, 'Widget', 'Austin', 10.0, 30, 'pending', '2024-05-01 12:00:00')",
+                (order_id,),
+            )
+    return engine
+
+
+def test_migrate_versions_existing_orders_for_the_change_feed(tmp_path):
+    engine = _legacy_engine(tmp_path)
+
+    first = migrate_orders(engine)
+    second = migrate_orders(engine)
+
+    assert first["columns"] == ["orders.updated_at", "orders.version"]
+    assert "ix_orders_version" in first["indexes"] and "ix_orders_created_at" in first["indexes"]
+    assert (first["versioned"], first["updated_at"]) == (3, 3)
+    assert second == {"columns": [], "indexes": [], "versioned": 0, "updated_at": 0}
+    assert {column["name"] for column in inspect(engine).get_columns("orders")} >= {"version", "updated_at"}
+
+    with Session(engine) as session:
+        assert session.execute(select(Order.id, Order.version).order_by(Order.id)).all() == [(1, 1), (2, 2), (3, 3)]
+        assert session.scalar(select(OrderChangeCounter.version)) == 3
+        assert all(order.updated_at == order.created_at for order in session.scalars(select(Order)))
+
+        feed = read_changes(session, since=0, limit=10)
+        assert [order.id for order in feed["changes"]] == [1, 2, 3]
+
+        session.add(Order(item_name="Gadget", location="Dallas", cost=5.0, delivery_time=20))
+        session.commit()
+        assert session.scalar(select(Order.version).where(Order.item_name == "Gadget")) == 4
+    engine.dispose()
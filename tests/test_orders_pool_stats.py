@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import orders_service.main as orders_main
+from orders_service.core.config import settings as orders_settings
+from orders_service.db import pool_options
+from orders_service.pool_stats import InstrumentedQueuePool, PoolStats
+
+
+def test_pool_options_come_from_settings(monkeypatch):
+    monkeypatch.setattr(orders_settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(orders_settings, "DB_POOL_PRE_PING", True)
+
+    options = pool_options("postgresql+psycopg2://postgres:secret@db/ordersdb", InstrumentedQueuePool)
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert pool_options("sqlite://", InstrumentedQueuePool) == {}
+
+
+def test_pool_stats_record_checkouts_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    stats = PoolStats("test")
+    stats.attach(engine)
+
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    during = stats.snapshot()
+    held.close()
+    after = stats.snapshot()
+    engine.dispose()
+
+    assert during["checked_out"] == 1
+    assert during["pool_size"] == 1
+    assert during["timeouts"] == 1
+    assert during["checkout_wait"]["count"] == 2
+    assert during["checkout_wait"]["max"] >= 0.05
+    assert during["checkout_wait"]["buckets"]["+Inf"] == 2
+    assert after["checked_out"] == 0
+    assert after["checkouts"] == 1
+    assert after["connects"] == 1
+
+
+def test_pool_stats_endpoint_reports_sync_pool(monkeypatch):
+    monkeypatch.setattr(orders_settings, "ORDERS_API_KEY", "test-key")
+
+    with TestClient(orders_main.app) as client:
+        response = client.get("/internal/pool-stats", headers={"X-API-Key": "test-key"})
+
+    assert response.status_code == 200
+    assert [pool["name"] for pool in response.json()["pools"]] == ["sync"]
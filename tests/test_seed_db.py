@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import create_engine, func, select
+
+from orders_service.db import Base
+from orders_service.models import Order, OrderChangeCounter
+from orders_service.seed_db import (
+    ALABAMA_LOCATIONS,
+    PRODUCT_NAMES,
+    STATUSES,
+    bulk_seed_orders,
+    generate_order_columns,
+)
+
+
+def test_generate_order_columns_is_deterministic_and_in_range():
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    first = generate_order_columns(1_000, np.random.default_rng(42), now=now)
+    second = generate_order_columns(1_000, np.random.default_rng(42), now=now)
+
+    for name in first:
+        assert np.array_equal(first[name], second[name])
+    assert set(first["item_name"]) <= set(PRODUCT_NAMES)
+    assert set(first["location"]) <= set(ALABAMA_LOCATIONS)
+    assert set(first["status"]) <= set(STATUSES)
+    assert first["cost"].min() >= 10 and first["cost"].max() <= 500
+    assert first["delivery_time"].min() >= 15 and first["delivery_time"].max() <= 120
+    assert first["created_at"].max() <= np.datetime64("2026-01-01T00:00:00")
+
+
+def test_bulk_seed_is_identical_for_any_worker_count(tmp_path):
+    snapshots = []
+    for workers in (1, 2):
+        engine = create_engine(f"sqlite:///{tmp_path / f'seed-{workers}.db'}")
+        Base.metadata.create_all(bind=engine)
+
+        bulk_seed_orders(250, chunk_size=60, seed=7, workers=workers, bind=engine)
+
+        with engine.connect() as conn:
+            assert conn.scalar(select(func.count(Order.id))) == 250
+            assert conn.scalar(select(func.count(func.distinct(Order.version)))) == 250
+            assert conn.scalar(select(func.max(Order.version))) == conn.scalar(select(OrderChangeCounter.version))
+            assert conn.scalar(select(func.count()).where(Order.updated_at.is_(None))) == 0
+            snapshots.append(
+                sorted(conn.execute(select(Order.item_name, Order.location, Order.cost, Order.status)).all())
+            )
+        engine.dispose()
+
+    assert snapshots[0] == snapshots[1]